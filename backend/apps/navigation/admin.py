@@ -1,16 +1,25 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
 from django.utils.html import format_html
 from django.db.models import Count
-from .models import NavigationMenu, MenuItem, SiteSetting, MediaFile
+from .models import (
+    NavigationMenu, MenuItem, SiteSetting, MediaFile, GeocodeResult, ShippingRate, Depot, ConfigChange
+)
+from .caching import invalidate_menus
+from .services.config_changes import record_menu_changes
+from .services.menu_reorder import reorder_menu
+from .services.menu_tree import MenuTree
 import json
 
 @admin.register(NavigationMenu)
 class NavigationMenuAdmin(admin.ModelAdmin):
-    list_display = ['name', 'location', 'item_count', 'is_active', 'updated_at']
+    list_display = ['name', 'location', 'item_count', 'is_active', 'updated_at', 'reorder_link']
     list_filter = ['location', 'is_active', 'created_at']
     search_fields = ['name', 'description']
     list_editable = ['is_active']
-    actions = ['activate_menus', 'deactivate_menus']
+    actions = ['activate_menus', 'deactivate_menus', 'reorder_items']
     
     fieldsets = (
         ('Basic Information', {
@@ -36,18 +45,76 @@ class NavigationMenuAdmin(admin.ModelAdmin):
     @admin.action(description="Activate selected menus")
     def activate_menus(self, request, queryset):
         updated = queryset.update(is_active=True)
+        # queryset.update() tidak memicu signals, invalidate manual
+        record_menu_changes(queryset)
+        invalidate_menus(queryset)
         self.message_user(request, f"{updated} menu(s) activated.")
     
     @admin.action(description="Deactivate selected menus")
     def deactivate_menus(self, request, queryset):
         updated = queryset.update(is_active=False)
+        record_menu_changes(queryset)
+        invalidate_menus(queryset)
         self.message_user(request, f"{updated} menu(s) deactivated.")
+    
+    @admin.action(description="Reorder items (drag & drop)")
+    def reorder_items(self, request, queryset):
+        if queryset.count() != 1:
+            self.message_user(request, "Pilih tepat satu menu untuk reorder.", messages.WARNING)
+            return None
+        return redirect('admin:navigation_navigationmenu_reorder', queryset.first().pk)
+    
+    def reorder_link(self, obj):
+        url = reverse('admin:navigation_navigationmenu_reorder', args=[obj.pk])
+        return format_html('<a href="{}">↕ Reorder</a>', url)
+    reorder_link.short_description = 'Items'
+    
+    def get_urls(self):
+        urls = [
+            path('<int:menu_id>/reorder/', self.admin_site.admin_view(self.reorder_view),
+                 name='navigation_navigationmenu_reorder'),
+        ]
+        return urls + super().get_urls()
+    
+    def reorder_view(self, request, menu_id):
+        """Drag & drop seluruh tree; simpan = satu transaction + satu invalidation."""
+        menu = get_object_or_404(NavigationMenu, pk=menu_id)
+        if not self.has_change_permission(request, menu):
+            return redirect('admin:navigation_navigationmenu_changelist')
+        
+        if request.method == 'POST':
+            try:
+                layout = json.loads(request.POST.get('layout', ''))
+                if not isinstance(layout, list):
+                    raise ValueError('Layout harus berupa list')
+                updated = reorder_menu(menu, layout=layout)
+            except ValueError as e:
+                # json.JSONDecodeError juga turunan ValueError
+                self.message_user(request, f"Layout tidak disimpan: {e}", messages.ERROR)
+            else:
+                self.message_user(request, f"{updated} item diperbarui.")
+            return redirect('admin:navigation_navigationmenu_reorder', menu.pk)
+        
+        # Semua item (termasuk non-aktif) supaya bisa ikut dipindah
+        tree = MenuTree(menu.items.order_by('order_index', 'title'))
+        
+        def nodes(items):
+            return [{'item': item, 'children': nodes(tree.children_of(item))} for item in items]
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'title': f'Reorder: {menu.name}',
+            'opts': self.model._meta,
+            'original': menu,
+            'tree': nodes(tree.roots()),
+        }
+        return TemplateResponse(request, 'admin/navigation/navigationmenu/reorder.html', context)
 
 @admin.register(MenuItem)
 class MenuItemAdmin(admin.ModelAdmin):
     list_display = ['title', 'menu_display', 'parent_display', 'url_display', 
                     'icon_display', 'order_index', 'is_active']
-    list_filter = ['menu', 'is_active', 'is_external', 'requires_auth']
+    list_filter = ['menu', 'is_active', 'is_external', 'requires_auth', 'requires_staff']
     search_fields = ['title', 'url', 'description']
     list_editable = ['order_index', 'is_active']
     autocomplete_fields = ['parent']
@@ -57,19 +124,19 @@ class MenuItemAdmin(admin.ModelAdmin):
             'fields': ('menu', 'parent', 'title', 'url', 'description')
         }),
         ('Display Settings', {
-            'fields': ('icon', 'order_index', 'is_external', 'requires_auth', 'is_active')
+            'fields': ('icon', 'order_index', 'is_external', 'requires_auth', 'requires_staff', 'is_active')
         }),
         ('Badge/Notification', {
             'fields': ('badge_text', 'badge_color'),
             'classes': ('collapse',)
         }),
         ('Metadata', {
-            'fields': ('created_at', 'updated_at'),
+            'fields': ('path', 'depth', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
     
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['path', 'depth', 'created_at', 'updated_at']
     
     def menu_display(self, obj):
         return obj.menu.name if obj.menu else '-'
@@ -241,3 +308,48 @@ class MediaFileAdmin(admin.ModelAdmin):
         if not obj.pk:
             obj.uploaded_by = request.user
         super().save_model(request, obj, form, change)
+
+@admin.register(GeocodeResult)
+class GeocodeResultAdmin(admin.ModelAdmin):
+    list_display = ['normalized_address', 'found', 'latitude', 'longitude', 'score', 'updated_at']
+    list_filter = ['found']
+    search_fields = ['normalized_address', 'address']
+    readonly_fields = ['address_key', 'created_at', 'updated_at']
+
+
+@admin.register(ShippingRate)
+class ShippingRateAdmin(admin.ModelAdmin):
+    list_display = ['service_type', 'name', 'rate_per_km', 'base_fee', 'rate_per_kg',
+                    'free_weight_kg', 'min_charge', 'is_default', 'is_active', 'updated_at']
+    list_filter = ['is_active', 'is_default']
+    list_editable = ['rate_per_km', 'is_active']
+    search_fields = ['service_type', 'name']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(Depot)
+class DepotAdmin(admin.ModelAdmin):
+    list_display = ['code', 'name', 'latitude', 'longitude', 'coverage_radius_km', 'has_polygon',
+                    'is_active', 'updated_at']
+    list_filter = ['is_active']
+    search_fields = ['code', 'name', 'address']
+    readonly_fields = ['created_at', 'updated_at']
+    
+    def has_polygon(self, obj):
+        return bool(obj.coverage_polygon)
+    has_polygon.boolean = True
+    has_polygon.short_description = 'Polygon'
+
+
+@admin.register(ConfigChange)
+class ConfigChangeAdmin(admin.ModelAdmin):
+    """Change log delta sync; read-only (ditulis oleh signals)"""
+    list_display = ['version', 'resource', 'action', 'object_id', 'object_key', 'location', 'created_at']
+    list_filter = ['resource', 'action', 'location']
+    search_fields = ['object_key']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
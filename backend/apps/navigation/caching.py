@@ -0,0 +1,573 @@
+"""
+Cache keys dan invalidation untuk aplikasi Navigation.
+File location: backend/apps/navigation/caching.py
+
+Semua cache key yang dipakai views didefinisikan di sini, lengkap dengan
+dependency-nya ke model. Signals memanggil helper `keys_for_*` untuk
+menghapus tepat key yang terdampak oleh perubahan satu row.
+
+`get_or_build` melindungi key dari cache stampede: rebuild single-flight
+(lock per key), refresh probabilistik sebelum expiry, dan stale data tetap
+dilayani selama rebuild berjalan. `aget_or_build` adalah versi async-nya
+untuk ASGI views (views_async.py).
+
+Di depan Redis ada local LRU tier per worker. Koherensi antar worker
+dijaga lewat version key di Redis yang di-bump setiap invalidation dan
+dicek maksimal sekali per `version_check_interval`.
+"""
+
+import asyncio
+import logging
+import math
+import pickle
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import NavigationMenu
+from .services.menu_tree import ANONYMOUS, AUDIENCES
+
+logger = logging.getLogger(__name__)
+
+# Semua location valid; hanya location ini yang di-cache oleh views
+MENU_LOCATIONS = [choice[0] for choice in NavigationMenu.LOCATION_CHOICES]
+
+SITE_SETTINGS_PUBLIC_KEY = 'site_settings_public'
+MEDIA_LOGOS_KEY = 'media_files_logos'
+
+# Fragment per resource untuk frontend config (services/frontend_config.py)
+CONFIG_SETTINGS_FRAGMENT_KEY = 'config_fragment_settings'
+CONFIG_LOGO_FRAGMENT_KEY = 'config_fragment_logo'
+# Version & waktu publish config terakhir (services/config_publisher.py)
+CONFIG_VERSION_KEY = 'config_version'
+
+
+# Key navigation/config berisi menu items, jadi ada satu variant per audience
+def nav_menu_key(location, audience=ANONYMOUS):
+    return f'nav_menu_{location}_{audience}'
+
+
+def nav_menu_all_key(audience=ANONYMOUS):
+    return f'nav_menu_all_{audience}'
+
+
+def site_settings_category_key(category):
+    return f'site_settings_category_{category}'
+
+
+def frontend_config_key(location, audience=ANONYMOUS):
+    return f'frontend_config_{location}_{audience}'
+
+
+def config_nav_fragment_key(location, audience=ANONYMOUS):
+    return f'config_fragment_nav_{location}_{audience}'
+
+
+def is_cacheable_location(location):
+    """Location di luar LOCATION_CHOICES tidak di-cache (tidak bisa di-invalidate)."""
+    return location in MENU_LOCATIONS
+
+
+# ============ DEPENDENCY MAPPING ============
+
+def keys_for_menu_locations(locations):
+    """Keys yang bergantung pada menu/items di location tertentu."""
+    keys = {nav_menu_all_key(audience) for audience in AUDIENCES}
+    for location in locations:
+        if location:
+            for audience in AUDIENCES:
+                keys.add(nav_menu_key(location, audience))
+                keys.add(frontend_config_key(location, audience))
+                keys.add(config_nav_fragment_key(location, audience))
+    return keys
+
+
+def all_frontend_config_keys():
+    return {frontend_config_key(location, audience) for location in MENU_LOCATIONS for audience in AUDIENCES}
+
+
+def keys_for_setting_categories(categories):
+    """Keys yang bergantung pada SiteSetting di category tertentu."""
+    keys = {SITE_SETTINGS_PUBLIC_KEY, CONFIG_SETTINGS_FRAGMENT_KEY}
+    for category in categories:
+        if category:
+            keys.add(site_settings_category_key(category))
+    # Semua frontend config berisi public settings
+    keys.update(all_frontend_config_keys())
+    return keys
+
+
+def keys_for_logos():
+    """Keys yang bergantung pada MediaFile dengan file_type='logo'."""
+    keys = {MEDIA_LOGOS_KEY, CONFIG_LOGO_FRAGMENT_KEY}
+    keys.update(all_frontend_config_keys())
+    return keys
+
+
+# ============ LOCAL TIER ============
+
+LOCAL_TIER = {
+    'max_entries': 256,
+    'max_bytes': 16 * 1024 * 1024,  # 16 MB per worker
+    'version_check_interval': 1.0,   # Detik; batas staleness antar worker
+    **getattr(settings, 'CACHE_LOCAL_TIER', {}),
+}
+
+
+class LocalLRU:
+    """LRU cache in-process dengan batas jumlah entry dan total bytes."""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            self._data.move_to_end(key)
+            return item[0]
+
+    def set(self, key, value, size=None):
+        if size is None:
+            size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                old = self._data.pop(key, None)
+                if old is not None:
+                    self._bytes -= old[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+class VersionStamp:
+    """
+    Version counter bersama di Redis.
+
+    `current()` membaca Redis maksimal sekali per check_interval, jadi hot
+    path cukup membaca nilai yang disimpan di process.
+    """
+
+    def __init__(self, name, check_interval):
+        self.key = f'version_{name}'
+        self.check_interval = check_interval
+        self._value = None
+        self._checked_at = 0.0
+
+    def current(self, force=False):
+        """force=True membaca Redis tanpa menunggu check_interval"""
+        now = time.monotonic()
+        if not force and self._value is not None and now - self._checked_at < self.check_interval:
+            return self._value
+
+        value = cache.get(self.key)
+        if value is None:
+            # Mulai dari epoch millis supaya tidak mundur jika key hilang dari Redis
+            cache.add(self.key, int(time.time() * 1000), None)
+            value = cache.get(self.key)
+
+        self._value, self._checked_at = value, now
+        return value
+
+    async def acurrent(self, force=False):
+        """Versi async current() untuk ASGI views"""
+        now = time.monotonic()
+        if not force and self._value is not None and now - self._checked_at < self.check_interval:
+            return self._value
+
+        value = await cache.aget(self.key)
+        if value is None:
+            await cache.aadd(self.key, int(time.time() * 1000), None)
+            value = await cache.aget(self.key)
+
+        self._value, self._checked_at = value, now
+        return value
+
+    def bump(self):
+        try:
+            value = cache.incr(self.key)
+        except ValueError:
+            value = int(time.time() * 1000)
+            cache.set(self.key, value, None)
+        self._value, self._checked_at = value, time.monotonic()
+        return value
+
+
+local_tier = LocalLRU(LOCAL_TIER['max_entries'], LOCAL_TIER['max_bytes'])
+navigation_version = VersionStamp('navigation', LOCAL_TIER['version_check_interval'])
+
+
+# ============ INVALIDATION ============
+
+def invalidate(keys):
+    """
+    Hapus cache keys setelah transaction commit.
+
+    Dijalankan on_commit supaya request lain tidak sempat mengisi ulang
+    cache dengan data lama sebelum perubahan tersimpan.
+    """
+    keys = sorted(set(keys))
+    if not keys:
+        return
+
+    def _purge():
+        local_tier.delete_many(keys)
+        try:
+            cache.delete_many(keys)
+            # Worker lain membuang local tier mereka saat melihat version baru
+            navigation_version.bump()
+            logger.debug("Cache invalidated: %s", ', '.join(keys))
+        except Exception as e:
+            logger.error(f"Cache invalidation error: {e}")
+
+    transaction.on_commit(_purge)
+
+
+def invalidate_menus(menus):
+    """
+    Invalidate cache untuk menus (queryset atau list), misal setelah bulk
+    update yang melewati signals; config frontend ikut di-publish ulang.
+    """
+    from .services.config_publisher import config_publisher
+
+    invalidate(keys_for_menu_locations({menu.location for menu in menus}))
+    config_publisher.schedule()
+
+
+# ============ STAMPEDE PROTECTION ============
+
+STAMPEDE = {
+    'lock_timeout': 30,   # Detik; lock dilepas otomatis jika worker mati
+    'lock_wait': 5,       # Detik menunggu rebuild worker lain saat cache kosong
+    'stale_grace': 300,   # Detik stale data tetap disimpan setelah expiry
+    'beta': 1.0,          # Agresivitas early refresh (XFetch)
+    **getattr(settings, 'CACHE_STAMPEDE', {}),
+}
+
+_local_locks = {}
+_local_locks_guard = threading.Lock()
+
+
+def _local_lock(key):
+    """Lock in-process per key supaya thread di worker yang sama tidak rebuild bersamaan."""
+    with _local_locks_guard:
+        lock = _local_locks.get(key)
+        if lock is None:
+            lock = _local_locks[key] = threading.Lock()
+        return lock
+
+
+def _lock_key(key):
+    return f'{key}:lock'
+
+
+def _acquire(key):
+    """Lock antar worker via cache.add (SET NX di Redis). Return token atau None."""
+    token = uuid.uuid4().hex
+    if cache.add(_lock_key(key), token, STAMPEDE['lock_timeout']):
+        return token
+    return None
+
+
+def _release(key, token):
+    if cache.get(_lock_key(key)) == token:
+        cache.delete(_lock_key(key))
+
+
+def _as_entry(value):
+    """
+    Value dari cache sebagai entry get_or_build, atau None (miss) jika
+    bukan format entry, misal value mentah yang ditulis kode lama dengan
+    key yang sama sebelum deploy.
+    """
+    if isinstance(value, dict) and 'value' in value and 'expires' in value:
+        return value
+    return None
+
+
+def _should_refresh(entry, now):
+    """
+    XFetch: makin dekat ke expiry dan makin lama rebuild (delta),
+    makin besar peluang satu request refresh lebih awal.
+    """
+    delta = entry.get('delta', 0)
+    jitter = delta * STAMPEDE['beta'] * -math.log(1.0 - random.random())
+    return now + jitter >= entry['expires']
+
+
+class BuildResult:
+    """
+    Return value builder yang ikut membawa cache entries lain (misal
+    fragment) untuk ditulis bersama entry utama dalam satu set_many.
+    """
+
+    def __init__(self, value, extra=None):
+        self.value = value
+        self.extra = extra or {}
+
+
+def _entries_to_store(key, result, timeout, delta):
+    if isinstance(result, BuildResult):
+        value, extra = result.value, result.extra
+    else:
+        value, extra = result, {}
+    entry = {'value': value, 'expires': time.time() + timeout, 'delta': delta}
+    return value, entry, {**extra, key: entry}
+
+
+def _build_and_store(key, builder, timeout, version):
+    """
+    Build lalu simpan. Jika invalidation commit selama build (version
+    berubah), builder mungkin membaca rows lama: value tetap dikembalikan
+    ke caller tapi tidak di-cache, supaya data lama tidak tertulis ulang
+    setelah purge dan bertahan sampai TTL.
+    """
+    start = time.monotonic()
+    result = builder()
+    value, entry, entries = _entries_to_store(key, result, timeout, time.monotonic() - start)
+    if navigation_version.current(force=True) != version:
+        logger.debug("Cache write %s dilewati (invalidated selama build)", key)
+        return value
+    cache.set_many(entries, timeout + STAMPEDE['stale_grace'])
+    local_tier.set(key, (version, entry))
+    return value
+
+
+def get_or_build(key, builder, timeout):
+    """
+    Ambil value dari cache atau rebuild dengan single-flight.
+
+    - Entry fresh di local tier (version sama): return tanpa network.
+    - Entry masih fresh di Redis: simpan ke local tier lalu return.
+    - Entry hampir/sudah expired: satu worker rebuild, yang lain dapat stale.
+    - Entry tidak ada: satu worker rebuild, yang lain menunggu hasilnya
+      (maksimal `lock_wait` detik sebelum rebuild sendiri).
+
+    Builder boleh return BuildResult untuk menulis entries tambahan
+    bersama entry utama. Exception dari builder diteruskan ke caller dan
+    tidak di-cache.
+    """
+    # Version dibaca sebelum Redis supaya entry lama tidak tersimpan
+    # dengan version baru jika invalidation terjadi di tengah jalan
+    version = navigation_version.current()
+
+    local = local_tier.get(key)
+    if local is not None and local[0] == version and not _should_refresh(local[1], time.time()):
+        return local[1]['value']
+
+    entry = _as_entry(cache.get(key))
+    if entry is not None and not _should_refresh(entry, time.time()):
+        local_tier.set(key, (version, entry))
+        return entry['value']
+
+    if entry is not None:
+        # Stale-while-revalidate: tanpa lock, layani stale data
+        token = _acquire(key)
+        if token is None:
+            return entry['value']
+        try:
+            # Worker lain mungkin baru saja selesai refresh
+            latest = _as_entry(cache.get(key))
+            if latest is not None and latest['expires'] > entry['expires']:
+                return latest['value']
+            return _build_and_store(key, builder, timeout, version)
+        finally:
+            _release(key, token)
+
+    with _local_lock(key):
+        # Thread lain di worker ini mungkin sudah selesai rebuild
+        entry = _as_entry(cache.get(key))
+        if entry is not None:
+            return entry['value']
+
+        token = _acquire(key)
+        if token is None:
+            entry = _wait_for(key)
+            if entry is not None:
+                return entry['value']
+            # Worker pemegang lock terlalu lama, rebuild sendiri
+            return _build_and_store(key, builder, timeout, version)
+
+        try:
+            return _build_and_store(key, builder, timeout, version)
+        finally:
+            _release(key, token)
+
+
+def _wait_for(key):
+    """Tunggu worker lain mengisi key (polling ringan)."""
+    deadline = time.monotonic() + STAMPEDE['lock_wait']
+    delay = 0.01
+    while time.monotonic() < deadline:
+        time.sleep(delay)
+        entry = _as_entry(cache.get(key))
+        if entry is not None:
+            return entry
+        delay = min(delay * 2, 0.2)
+    return None
+
+
+# ============ ASYNC (ASGI) ============
+
+# Rebuild yang sedang berjalan per (event loop, key); coroutine lain menunggu hasil yang sama
+_inflight = {}
+
+
+async def _aacquire(key):
+    token = uuid.uuid4().hex
+    if await cache.aadd(_lock_key(key), token, STAMPEDE['lock_timeout']):
+        return token
+    return None
+
+
+async def _arelease(key, token):
+    if await cache.aget(_lock_key(key)) == token:
+        await cache.adelete(_lock_key(key))
+
+
+async def _abuild_and_store(key, builder, timeout, version):
+    """Versi async _build_and_store (hasil build selama invalidation tidak di-cache)"""
+    start = time.monotonic()
+    result = await builder()
+    value, entry, entries = _entries_to_store(key, result, timeout, time.monotonic() - start)
+    if await navigation_version.acurrent(force=True) != version:
+        logger.debug("Cache write %s dilewati (invalidated selama build)", key)
+        return value
+    await cache.aset_many(entries, timeout + STAMPEDE['stale_grace'])
+    local_tier.set(key, (version, entry))
+    return value
+
+
+async def _await_for(key):
+    deadline = time.monotonic() + STAMPEDE['lock_wait']
+    delay = 0.01
+    while time.monotonic() < deadline:
+        await asyncio.sleep(delay)
+        entry = _as_entry(await cache.aget(key))
+        if entry is not None:
+            return entry
+        delay = min(delay * 2, 0.2)
+    return None
+
+
+async def _afill(key, builder, timeout, version):
+    """Isi key yang kosong; lock antar worker sama dengan get_or_build"""
+    entry = _as_entry(await cache.aget(key))
+    if entry is not None:
+        return entry['value']
+
+    token = await _aacquire(key)
+    if token is None:
+        entry = await _await_for(key)
+        if entry is not None:
+            return entry['value']
+        return await _abuild_and_store(key, builder, timeout, version)
+
+    try:
+        return await _abuild_and_store(key, builder, timeout, version)
+    finally:
+        await _arelease(key, token)
+
+
+async def aget_or_build(key, builder, timeout):
+    """
+    Versi async get_or_build untuk ASGI views; builder berupa coroutine function.
+
+    Format entry, lock dan local tier sama dengan get_or_build, jadi view
+    sync dan async saling berbagi cache. Local tier hit tidak melakukan I/O.
+    """
+    version = await navigation_version.acurrent()
+
+    local = local_tier.get(key)
+    if local is not None and local[0] == version and not _should_refresh(local[1], time.time()):
+        return local[1]['value']
+
+    entry = _as_entry(await cache.aget(key))
+    if entry is not None and not _should_refresh(entry, time.time()):
+        local_tier.set(key, (version, entry))
+        return entry['value']
+
+    if entry is not None:
+        token = await _aacquire(key)
+        if token is None:
+            return entry['value']
+        try:
+            latest = _as_entry(await cache.aget(key))
+            if latest is not None and latest['expires'] > entry['expires']:
+                return latest['value']
+            return await _abuild_and_store(key, builder, timeout, version)
+        finally:
+            await _arelease(key, token)
+
+    inflight_key = (id(asyncio.get_running_loop()), key)
+    task = _inflight.get(inflight_key)
+    if task is None:
+        task = asyncio.ensure_future(_afill(key, builder, timeout, version))
+        _inflight[inflight_key] = task
+        task.add_done_callback(lambda _: _inflight.pop(inflight_key, None))
+    # shield: request yang dibatalkan tidak membatalkan rebuild untuk request lain
+    return await asyncio.shield(task)
+
+
+def put_many(values, timeout, extra=None, version=None):
+    """
+    Tulis entries siap pakai (format get_or_build) untuk banyak key
+    sekaligus, plus key biasa di extra, dalam satu set_many. Worker lain
+    membuang local tier mereka lewat version bump.
+
+    version: navigation_version yang dibaca sebelum values di-build; jika
+    sudah berubah (invalidation di tengah build) tidak ada yang ditulis dan
+    return False. Tanpa values (hanya extra) version tidak di-bump, karena
+    local tier tidak menyimpan key biasa.
+    """
+    if version is not None and navigation_version.current(force=True) != version:
+        return False
+    now = time.time()
+    entries = {key: {'value': value, 'expires': now + timeout, 'delta': 0} for key, value in values.items()}
+    cache.set_many({**(extra or {}), **entries}, timeout + STAMPEDE['stale_grace'])
+    if not entries:
+        return True
+    version = navigation_version.bump()
+    for key, entry in entries.items():
+        local_tier.set(key, (version, entry))
+    return True
+
+
+def mark_stale(key):
+    """Tandai entry sebagai expired tanpa menghapusnya (request berikutnya refresh)."""
+    local_tier.delete_many([key])
+    entry = _as_entry(cache.get(key))
+    if entry is not None:
+        entry['expires'] = 0
+        cache.set(key, entry, STAMPEDE['stale_grace'])
@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+# Endpoint -> (path sync, path async)
+ENDPOINTS = {
+    'config': ('/api/v1/navigation/config/?nav_location=header',
+               '/api/v1/navigation/async/config/?nav_location=header'),
+    'compact': ('/api/v1/navigation/config/compact/',
+                '/api/v1/navigation/async/config/compact/'),
+    'nav': ('/api/v1/navigation/by_location/?location=header',
+            '/api/v1/navigation/async/by_location/?location=header'),
+    'health': ('/api/v1/navigation/health/',
+               '/api/v1/navigation/async/health/'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark throughput & latency deployment WSGI (view sync) vs ASGI (view async)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi-url', type=str, default='http://127.0.0.1:8000',
+                            help='Base URL server WSGI (gunicorn), kosong untuk skip')
+        parser.add_argument('--asgi-url', type=str, default='http://127.0.0.1:8001',
+                            help='Base URL server ASGI (uvicorn), kosong untuk skip')
+        parser.add_argument('--endpoints', type=str, default='config,compact,nav,health',
+                            help=f"Dipisahkan koma: {','.join(ENDPOINTS)}")
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=5000,
+                            help='Jumlah request per endpoint per server')
+        parser.add_argument('--warmup', type=int, default=100)
+        parser.add_argument('--timeout', type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        endpoints = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = set(endpoints) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"Endpoint tidak dikenal: {', '.join(sorted(unknown))}")
+
+        targets = [(label, url.rstrip('/'), index)
+                   for label, url, index in (('wsgi', options['wsgi_url'], 0), ('asgi', options['asgi_url'], 1))
+                   if url]
+        if not targets:
+            raise CommandError('Minimal satu dari --wsgi-url/--asgi-url harus diisi')
+
+        self.stdout.write(f"{options['requests']} request/endpoint, concurrency {options['concurrency']}")
+        self.stdout.write(
+            f"{'endpoint':<9} {'server':<6} {'req/s':>8} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'errors':>7}"
+        )
+        for name in endpoints:
+            for label, base_url, index in targets:
+                stats = asyncio.run(self._run(base_url + ENDPOINTS[name][index], options))
+                self.stdout.write(
+                    f"{name:<9} {label:<6} {stats['rps']:>8.0f} {stats['p50']:>8.1f} "
+                    f"{stats['p95']:>8.1f} {stats['p99']:>8.1f} {stats['errors']:>7}"
+                )
+
+    async def _run(self, url, options):
+        limits = httpx.Limits(max_connections=options['concurrency'],
+                              max_keepalive_connections=options['concurrency'])
+        async with httpx.AsyncClient(limits=limits, timeout=options['timeout']) as client:
+            try:
+                await client.get(url)
+            except httpx.HTTPError as e:
+                raise CommandError(f'{url} tidak bisa diakses: {e}')
+
+            # Warm up cache dan connection pool
+            await self._load(client, url, options['warmup'], options['concurrency'])
+
+            start = time.perf_counter()
+            latencies, errors = await self._load(client, url, options['requests'], options['concurrency'])
+            elapsed = time.perf_counter() - start
+
+        latencies.sort()
+
+        def percentile(p):
+            if not latencies:
+                return float('nan')
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+        return {
+            'rps': len(latencies) / elapsed if elapsed else 0.0,
+            'p50': percentile(0.50),
+            'p95': percentile(0.95),
+            'p99': percentile(0.99),
+            'errors': errors,
+        }
+
+    async def _load(self, client, url, total, concurrency):
+        """Kirim `total` request dengan maksimal `concurrency` in-flight"""
+        latencies = []
+        errors = 0
+        remaining = total
+
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+        return latencies, errors
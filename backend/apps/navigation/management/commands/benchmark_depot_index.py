@@ -0,0 +1,69 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from apps.navigation.services.depot_index import DepotIndex
+from apps.navigation.services.geo_services import GeoUtils
+
+
+class Command(BaseCommand):
+    help = 'Benchmark DepotIndex (nearest & coverage) vs loop GeoUtils.calculate_distance'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--depots', type=str, default='100,1000,10000,50000',
+                            help='Jumlah depot sintetis, dipisahkan koma')
+        parser.add_argument('--queries', type=int, default=2000)
+        parser.add_argument('--k', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+
+        self.stdout.write(
+            f"{'depots':>7} {'build_s':>8} {'nearest_us':>11} {'coverage_us':>12} {'loop_us':>10}"
+        )
+        for count in (int(value) for value in options['depots'].split(',') if value.strip()):
+            depots = self._depots(rng, count)
+            queries = np.column_stack([rng.uniform(-11, 6, options['queries']),
+                                       rng.uniform(95, 141, options['queries'])])
+
+            start = time.perf_counter()
+            index = DepotIndex(depots)
+            build_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for lat, lon in queries:
+                index.nearest(lat, lon, k=options['k'])
+            nearest_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+            start = time.perf_counter()
+            for lat, lon in queries:
+                index.covering(lat, lon)
+            coverage_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+            # Cara lama: calculate_distance ke semua depot (diukur untuk beberapa query saja)
+            sample = queries[:max(1, 20000 // count)]
+            start = time.perf_counter()
+            for lat, lon in sample:
+                sorted(GeoUtils.calculate_distance(lat, lon, depot['latitude'], depot['longitude'])
+                       for depot in depots)[:options['k']]
+            loop_us = (time.perf_counter() - start) / len(sample) * 1e6
+
+            self.stdout.write(
+                f"{count:>7} {build_s:>8.2f} {nearest_us:>11.1f} {coverage_us:>12.1f} {loop_us:>10.0f}"
+            )
+
+    def _depots(self, rng, count):
+        """Depot acak di Indonesia; separuh radius, separuh polygon kotak"""
+        depots = []
+        for i in range(count):
+            lat, lon = rng.uniform(-11, 6), rng.uniform(95, 141)
+            depot = {'id': i, 'latitude': lat, 'longitude': lon}
+            if i % 2:
+                depot['coverage_radius_km'] = float(rng.uniform(5, 30))
+            else:
+                size = rng.uniform(0.05, 0.2)
+                depot['coverage_polygon'] = [[lat - size, lon - size], [lat - size, lon + size],
+                                             [lat + size, lon + size], [lat + size, lon - size]]
+            depots.append(depot)
+        return depots
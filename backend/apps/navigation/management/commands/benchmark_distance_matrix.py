@@ -0,0 +1,61 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from apps.navigation.services.geo_services import GeoUtils
+from apps.navigation.services.geo_vector import geodesic_matrix, haversine_matrix
+
+
+class Command(BaseCommand):
+    help = 'Benchmark distance matrix vectorized vs loop GeoUtils.calculate_distance per pasangan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=str, default='10x100,50x1000,200x5000',
+                            help='Ukuran matrix origins x destinations, dipisahkan koma')
+        parser.add_argument('--loop-limit', type=int, default=50000,
+                            help='Maksimum pasangan yang diukur dengan loop (sisanya diekstrapolasi)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+
+        self.stdout.write(
+            f"{'size':>12} {'loop_s':>9} {'geodesic_s':>11} {'haversine_s':>12} "
+            f"{'speedup':>8} {'max_err_m':>10} {'hav_err_%':>10}"
+        )
+        for size in options['sizes'].split(','):
+            rows, columns = (int(part) for part in size.lower().split('x'))
+            origins = self._random_points(rng, rows)
+            destinations = self._random_points(rng, columns)
+            self._report(size, origins, destinations, options['loop_limit'])
+
+    def _random_points(self, rng, count):
+        """Koordinat acak dalam bounding box Indonesia"""
+        return np.column_stack([rng.uniform(-11.0, 6.0, count), rng.uniform(95.0, 141.0, count)])
+
+    def _report(self, size, origins, destinations, loop_limit):
+        start = time.perf_counter()
+        geodesic = geodesic_matrix(origins, destinations)
+        geodesic_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        haversine = haversine_matrix(origins, destinations)
+        haversine_s = time.perf_counter() - start
+
+        # Loop lama hanya untuk sebagian baris, lalu diekstrapolasi
+        loop_rows = max(1, min(len(origins), loop_limit // len(destinations)))
+        start = time.perf_counter()
+        reference = np.array([
+            [GeoUtils.calculate_distance(lat1, lon1, lat2, lon2) for lat2, lon2 in destinations]
+            for lat1, lon1 in origins[:loop_rows]
+        ])
+        loop_s = (time.perf_counter() - start) * len(origins) / loop_rows
+
+        max_error_m = np.abs(geodesic[:loop_rows] - reference).max() * 1000
+        haversine_error = np.max(np.abs(haversine[:loop_rows] - reference) / np.maximum(reference, 1e-9)) * 100
+
+        estimated = '' if loop_rows == len(origins) else '*'
+        self.stdout.write(
+            f"{size:>12} {loop_s:>8.2f}{estimated or ' '} {geodesic_s:>11.3f} {haversine_s:>12.3f} "
+            f"{loop_s / geodesic_s:>7.0f}x {max_error_m:>10.4f} {haversine_error:>10.3f}"
+        )
@@ -0,0 +1,99 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from apps.navigation.models import NavigationMenu, MenuItem
+from apps.navigation.serializers import NavigationMenuSerializer, MenuItemSerializer
+from apps.navigation.services.menu_tree import rebuild_paths
+
+
+class _Rollback(Exception):
+    """Dipakai untuk rollback data benchmark."""
+
+
+class Command(BaseCommand):
+    help = 'Benchmark jumlah query NavigationMenuSerializer untuk menu berbagai ukuran'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=str, default='5,20,50,200',
+                            help='Jumlah root items per menu, dipisahkan koma')
+        parser.add_argument('--children', type=int, default=4,
+                            help='Jumlah children per item (per level)')
+        parser.add_argument('--depth', type=int, default=3,
+                            help='Kedalaman menu (termasuk root)')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+
+        self.stdout.write(
+            f"{'roots':>6} {'items':>7} {'tree_q':>7} {'tree_ms':>9} {'legacy_q':>9} {'legacy_ms':>10} "
+            f"{'desc_q':>7} {'desc_ms':>8} {'desc_legacy_q':>14} {'desc_legacy_ms':>15}"
+        )
+        try:
+            with transaction.atomic():
+                for size in sizes:
+                    menu = self._build_menu(size, options['children'], options['depth'])
+                    self._report(menu, size)
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS('Benchmark selesai (data benchmark sudah di-rollback)'))
+
+    def _build_menu(self, roots, children, depth):
+        """Buat menu sintetis dengan bulk_create per level."""
+        menu = NavigationMenu.objects.create(
+            name=f'benchmark-{roots}-{time.monotonic_ns()}',
+            location='sidebar',
+        )
+
+        level = MenuItem.objects.bulk_create([
+            MenuItem(menu=menu, title=f'Root {i}', url=f'/r{i}', order_index=i)
+            for i in range(roots)
+        ])
+        for _ in range(depth - 1):
+            level = MenuItem.objects.bulk_create([
+                MenuItem(menu=menu, parent=parent, title=f'{parent.title}.{i}',
+                         url=f'{parent.url}/{i}', order_index=i)
+                for parent in level
+                for i in range(children)
+            ])
+        # bulk_create melewati save(), isi materialized path
+        rebuild_paths([menu])
+        return menu
+
+    def _report(self, menu, roots):
+        total = menu.items.count()
+
+        with CaptureQueriesContext(connection) as tree_queries:
+            start = time.perf_counter()
+            NavigationMenuSerializer(menu).data
+            tree_ms = (time.perf_counter() - start) * 1000
+
+        # Legacy: serialize tanpa menu_tree (query per node)
+        with CaptureQueriesContext(connection) as legacy_queries:
+            start = time.perf_counter()
+            root_items = menu.items.filter(parent=None, is_active=True).order_by('order_index')
+            MenuItemSerializer(root_items, many=True).data
+            legacy_ms = (time.perf_counter() - start) * 1000
+
+        # Subtree semua root: materialized path vs rekursi query per node
+        roots_list = list(menu.items.filter(parent=None))
+        with CaptureQueriesContext(connection) as desc_queries:
+            start = time.perf_counter()
+            for root in roots_list:
+                root.get_descendants()
+            desc_ms = (time.perf_counter() - start) * 1000
+
+        with CaptureQueriesContext(connection) as desc_legacy_queries:
+            start = time.perf_counter()
+            for root in roots_list:
+                root._get_descendants_recursive()
+            desc_legacy_ms = (time.perf_counter() - start) * 1000
+
+        self.stdout.write(
+            f"{roots:>6} {total:>7} {len(tree_queries):>7} {tree_ms:>9.1f} "
+            f"{len(legacy_queries):>9} {legacy_ms:>10.1f} "
+            f"{len(desc_queries):>7} {desc_ms:>8.1f} {len(desc_legacy_queries):>14} {desc_legacy_ms:>15.1f}"
+        )
@@ -0,0 +1,92 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from apps.navigation.services.route_optimizer import optimize_route, optimize_many
+
+# Depot sintetis (Jakarta Pusat)
+DEPOT = (-6.1754, 106.8272)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark route optimizer (NN seed + 2-opt/Or-opt) pada instance sintetis 50-2000 stop'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=str, default='50,100,200,500,1000,2000',
+                            help='Jumlah stop per instance, dipisahkan koma')
+        parser.add_argument('--capacity', type=float, default=None,
+                            help='Kapasitas truk per trip (demand stop acak 1-20)')
+        parser.add_argument('--time-windows', action='store_true',
+                            help='Tambah time window 2 jam acak dalam hari kerja 10 jam')
+        parser.add_argument('--time-limit', type=float, default=30.0,
+                            help='Batas waktu optimasi per instance (detik)')
+        parser.add_argument('--batch', type=int, default=8,
+                            help='Jumlah instance 100 stop untuk benchmark process pool (0 = skip)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Jumlah worker process pool (default: jumlah CPU)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+
+        self.stdout.write(
+            f"{'stops':>6} {'trips':>6} {'unassigned':>11} {'seed_min':>9} "
+            f"{'opt_min':>8} {'gain':>6} {'km':>8} {'time_s':>7}"
+        )
+        for size in sizes:
+            stops = self._instance(rng, size, options)
+            start = time.perf_counter()
+            result = optimize_route(DEPOT, stops, capacity=options['capacity'],
+                                    time_limit=options['time_limit'])
+            elapsed = time.perf_counter() - start
+            self._report(size, result, elapsed)
+
+        if options['batch']:
+            self._benchmark_pool(rng, options)
+
+    def _instance(self, rng, size, options):
+        """Stop acak di sekitar depot (radius ~20 km)"""
+        stops = []
+        for i in range(size):
+            stop = {
+                'id': i,
+                'lat': DEPOT[0] + rng.normal(0, 0.08),
+                'lon': DEPOT[1] + rng.normal(0, 0.08),
+                'demand': float(rng.integers(1, 21)),
+                'service': 300,
+            }
+            if options['time_windows']:
+                stop['ready'] = float(rng.uniform(0, 8 * 3600))
+                stop['due'] = stop['ready'] + 2 * 3600
+            stops.append(stop)
+        return stops
+
+    def _report(self, size, result, elapsed):
+        seed = result['initial_travel_time_s']
+        optimized = result['travel_time_s']
+        gain = 1 - optimized / seed if seed else 0.0
+        self.stdout.write(
+            f"{size:>6} {len(result['trips']):>6} {len(result['unassigned']):>11} {seed / 60:>9.0f} "
+            f"{optimized / 60:>8.0f} {gain:>6.1%} {result['distance_km']:>8.1f} {elapsed:>7.2f}"
+        )
+
+    def _benchmark_pool(self, rng, options):
+        problems = [
+            {'depot': DEPOT, 'stops': self._instance(rng, 100, options), 'capacity': options['capacity']}
+            for _ in range(options['batch'])
+        ]
+        time_limit = min(options['time_limit'], 5.0)
+
+        start = time.perf_counter()
+        optimize_many(problems, workers=1, time_limit=time_limit)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        optimize_many(problems, workers=options['workers'], time_limit=time_limit)
+        pooled = time.perf_counter() - start
+
+        self.stdout.write(
+            f"\nBatch {len(problems)} x 100 stop: sequential {sequential:.2f}s, "
+            f"process pool {pooled:.2f}s ({sequential / pooled:.1f}x)"
+        )
@@ -0,0 +1,46 @@
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.navigation.services.tomtom_async import geocode_batch
+
+
+class Command(BaseCommand):
+    help = 'Batch geocode address (satu address per baris) secara concurrent via TOMTOM'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', type=str, help="File berisi address, '-' untuk stdin")
+        parser.add_argument('--concurrency', type=int, default=10,
+                            help='Maksimal request paralel')
+        parser.add_argument('--base-url', type=str, default=None,
+                            help='Override TOMTOM base URL (misal mock server lokal)')
+        parser.add_argument('--api-key', type=str, default=None,
+                            help='Override TOMTOM_API_KEY')
+
+    def handle(self, *args, **options):
+        try:
+            stream = sys.stdin if options['file'] == '-' else open(options['file'], encoding='utf-8')
+        except OSError as e:
+            raise CommandError(str(e))
+
+        with stream:
+            addresses = [line.strip() for line in stream if line.strip()]
+
+        client_kwargs = {'max_concurrency': options['concurrency']}
+        if options['base_url']:
+            client_kwargs['base_url'] = options['base_url']
+        if options['api_key']:
+            client_kwargs['api_key'] = options['api_key']
+
+        start = time.perf_counter()
+        results = geocode_batch(addresses, **client_kwargs)
+        elapsed = time.perf_counter() - start
+
+        for address, result in zip(addresses, results):
+            self.stdout.write(json.dumps({'query': address, 'result': result}, ensure_ascii=False))
+
+        found = sum(1 for result in results if result)
+        self.stderr.write(
+            f"{found}/{len(addresses)} address ditemukan dalam {elapsed:.2f}s"
+        )
@@ -0,0 +1,79 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.navigation.services.geo_services import build_session
+from apps.navigation.services.regions import dataset_path, write_dataset
+
+
+# Job offline: error sementara di-retry (session request worker tidak retry)
+http_session = build_session(retries=2)
+
+
+class Command(BaseCommand):
+    help = 'Import hierarki wilayah Indonesia (EMSIFA) ke dataset lokal untuk lookup offline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', type=str, default=None,
+                            help='Base URL EMSIFA API atau folder lokal hasil clone '
+                                 '(default: EMSIFA_API_BASE_URL)')
+        parser.add_argument('--output', type=str, default=None,
+                            help='Path file dataset (default: REGIONS_DATA_FILE)')
+        parser.add_argument('--workers', type=int, default=16,
+                            help='Jumlah request paralel saat import via HTTP')
+
+    def handle(self, *args, **options):
+        source = options['source'] or settings.EMSIFA_API_BASE_URL
+        output = Path(options['output']) if options['output'] else dataset_path()
+        self._local_root = None if source.startswith(('http://', 'https://')) else Path(source)
+        self._base_url = source.rstrip('/')
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            self._pool = pool
+
+            provinces = self._fetch('provinces.json')
+            self.stdout.write(f'{len(provinces)} provinsi')
+
+            regencies = self._fetch_children('regencies', provinces)
+            self.stdout.write(f'{len(regencies)} kabupaten/kota')
+
+            districts = self._fetch_children('districts', regencies)
+            self.stdout.write(f'{len(districts)} kecamatan')
+
+            villages = self._fetch_children('villages', districts)
+            self.stdout.write(f'{len(villages)} kelurahan/desa')
+
+        write_dataset(output, provinces, regencies, districts, villages)
+
+        elapsed = time.perf_counter() - start
+        size_kb = output.stat().st_size / 1024
+        self.stdout.write(self.style.SUCCESS(
+            f'Dataset tersimpan di {output} ({size_kb:.0f} KB) dalam {elapsed:.1f}s'
+        ))
+
+    def _fetch(self, path):
+        if self._local_root is not None:
+            try:
+                with open(self._local_root / path, encoding='utf-8') as f:
+                    return json.load(f)
+            except OSError as e:
+                raise CommandError(f'Gagal membaca {path}: {e}')
+
+        try:
+            response = http_session.get(f'{self._base_url}/{path}', timeout=30)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            raise CommandError(f'Gagal fetch {path}: {e}')
+
+    def _fetch_children(self, level, parents):
+        """Fetch semua child level untuk setiap parent secara paralel (urutan dipertahankan)."""
+        paths = [f"{level}/{parent['id']}.json" for parent in parents]
+        rows = []
+        for chunk in self._pool.map(self._fetch, paths):
+            rows.extend(chunk)
+        return rows
@@ -0,0 +1,100 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from apps.navigation.caching import (
+    SITE_SETTINGS_PUBLIC_KEY,
+    MEDIA_LOGOS_KEY,
+    nav_menu_key,
+    nav_menu_all_key,
+    site_settings_category_key,
+    frontend_config_key,
+    mark_stale,
+)
+
+# Endpoint -> (url name, query string, cache key)
+ENDPOINTS = {
+    'config': ('config', '?nav_location=header', frontend_config_key('header')),
+    'nav': ('navigation-by-location', '?location=header', nav_menu_key('header')),
+    'nav_all': ('navigation-all', '', nav_menu_all_key()),
+    'settings': ('settings-list', '', SITE_SETTINGS_PUBLIC_KEY),
+    'settings_category': ('settings-by-category', '?category=branding', site_settings_category_key('branding')),
+    'logos': ('media-logos', '', MEDIA_LOGOS_KEY),
+}
+
+
+class Command(BaseCommand):
+    help = 'Load test cache stampede: hitung DB queries per cache expiry dengan request paralel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='config')
+        parser.add_argument('--threads', type=int, default=50,
+                            help='Jumlah request paralel per expiry')
+        parser.add_argument('--rounds', type=int, default=3,
+                            help='Berapa kali key di-expire')
+        parser.add_argument('--mode', choices=['cold', 'stale'], default='cold',
+                            help='cold: key dihapus, stale: key ditandai expired')
+        parser.add_argument('--host', type=str, default='localhost',
+                            help='HTTP Host header (harus ada di ALLOWED_HOSTS)')
+
+    def handle(self, *args, **options):
+        url_name, query, cache_key = ENDPOINTS[options['endpoint']]
+        url = reverse(url_name) + query
+
+        # Warm up supaya mode stale punya entry
+        response = Client(HTTP_HOST=options['host']).get(url)
+        if response.status_code != 200:
+            raise CommandError(f'{url} return status {response.status_code}')
+
+        self.stdout.write(f"Endpoint: {url} (key: {cache_key}), {options['threads']} threads, mode={options['mode']}")
+        self.stdout.write(f"{'round':>5} {'queries':>8} {'rebuilds':>9} {'errors':>7} {'wall_ms':>8}")
+
+        for round_no in range(1, options['rounds'] + 1):
+            if options['mode'] == 'cold':
+                cache.delete(cache_key)
+            else:
+                mark_stale(cache_key)
+
+            queries, rebuilds, errors, wall_ms = self._run_round(url, options['threads'], options['host'])
+            self.stdout.write(f"{round_no:>5} {queries:>8} {rebuilds:>9} {errors:>7} {wall_ms:>8.1f}")
+
+        self.stdout.write(self.style.SUCCESS('Load test selesai'))
+
+    def _run_round(self, url, threads, host):
+        barrier = threading.Barrier(threads)
+        lock = threading.Lock()
+        stats = {'queries': 0, 'rebuilds': 0, 'errors': 0}
+
+        def worker():
+            client = Client(HTTP_HOST=host)
+            executed = []
+
+            def count(execute, sql, params, many, context):
+                executed.append(sql)
+                return execute(sql, params, many, context)
+
+            try:
+                with connection.execute_wrapper(count):
+                    barrier.wait()
+                    response = client.get(url)
+            finally:
+                connection.close()
+
+            with lock:
+                stats['queries'] += len(executed)
+                stats['rebuilds'] += 1 if executed else 0
+                stats['errors'] += 0 if response.status_code == 200 else 1
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        return stats['queries'], stats['rebuilds'], stats['errors'], wall_ms
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import resource
+import time
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.navigation.services.config_publisher import config_publisher
+
+EVENTS_PATH = '/api/v1/navigation/async/events/'
+
+
+class Command(BaseCommand):
+    help = 'Load test koneksi SSE idle (/async/events/) dan latency fan-out notifikasi config'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', type=str, default='http://127.0.0.1:8001',
+                            help='Base URL server ASGI (uvicorn)')
+        parser.add_argument('--connections', type=int, default=2000)
+        parser.add_argument('--ramp', type=int, default=500,
+                            help='Koneksi baru per detik')
+        parser.add_argument('--hold', type=float, default=20.0,
+                            help='Detik koneksi dibiarkan idle sebelum trigger')
+        parser.add_argument('--trigger', action='store_true',
+                            help='Publish config dari proses ini lalu ukur latency fan-out '
+                                 '(server harus memakai CONFIG_EVENTS backend redis)')
+        parser.add_argument('--wait', type=float, default=10.0,
+                            help='Detik maksimum menunggu event setelah trigger')
+
+    def handle(self, *args, **options):
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if options['connections'] + 100 > soft:
+            raise CommandError(f"ulimit -n ({soft}) terlalu kecil untuk {options['connections']} koneksi")
+
+        stats = asyncio.run(self._run(options['url'].rstrip('/') + EVENTS_PATH, options))
+
+        self.stdout.write(f"{options['connections']} koneksi ke {options['url']}")
+        self.stdout.write(f"  connected      {stats['connected']}")
+        self.stdout.write(f"  failed         {stats['failed']}  {stats['errors']}")
+        self.stdout.write(f"  dropped (idle) {stats['dropped']}")
+        self.stdout.write(f"  connect p50/p99  {stats['connect_p50']:.1f} / {stats['connect_p99']:.1f} ms")
+        self.stdout.write(f"  keepalive diterima {stats['keepalives']}")
+        if options['trigger']:
+            self.stdout.write(f"  publish v{stats['version']}: event diterima {stats['received']}/{stats['alive']}")
+            self.stdout.write(f"  fan-out p50/p99/max  {stats['fanout_p50']:.1f} / {stats['fanout_p99']:.1f} / "
+                              f"{stats['fanout_max']:.1f} ms")
+
+    async def _run(self, url, options):
+        total = options['connections']
+        limits = httpx.Limits(max_connections=total, max_keepalive_connections=0)
+        timeout = httpx.Timeout(30.0, read=None)
+
+        connect_latencies, fanout, errors = [], [], {}
+        state = {'keepalives': 0, 'dropped': 0, 'trigger_at': None, 'version': None}
+        connected = asyncio.Event()
+        pending = total
+
+        def done_connecting():
+            nonlocal pending
+            pending -= 1
+            if pending == 0:
+                connected.set()
+
+        async def client_task(client):
+            start = time.perf_counter()
+            is_connected = False
+            initial = None
+            try:
+                async with client.stream('GET', url) as response:
+                    if response.status_code != 200:
+                        raise httpx.HTTPStatusError(str(response.status_code), request=response.request,
+                                                    response=response)
+                    connect_latencies.append(time.perf_counter() - start)
+                    is_connected = True
+                    done_connecting()
+
+                    async for line in response.aiter_lines():
+                        if line.startswith(':'):
+                            state['keepalives'] += 1
+                        elif line.startswith('data:'):
+                            # Event pertama = version terakhir saat connect
+                            version = json.loads(line[5:])['version']
+                            if state['trigger_at'] is None:
+                                initial = version
+                            elif version != initial:
+                                fanout.append(time.perf_counter() - state['trigger_at'])
+                                return True
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                name = type(e).__name__
+                errors[name] = errors.get(name, 0) + 1
+                if is_connected:
+                    state['dropped'] += 1
+                else:
+                    done_connecting()
+            return False
+
+        async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+            tasks = []
+            batch = max(1, options['ramp'] // 10)
+            for i in range(0, total, batch):
+                tasks.extend(asyncio.create_task(client_task(client)) for _ in range(min(batch, total - i)))
+                await asyncio.sleep(0.1)
+
+            try:
+                await asyncio.wait_for(connected.wait(), 60)
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.sleep(options['hold'])
+            alive = sum(1 for task in tasks if not task.done())
+
+            if options['trigger']:
+                state['trigger_at'] = time.perf_counter()
+                meta = await asyncio.to_thread(config_publisher.publish)
+                if meta is None:
+                    raise CommandError('Publish dilewati (ada publish lebih baru atau cache di-invalidate selama build)')
+                state['version'] = meta['version']
+                waiting = [task for task in tasks if not task.done()]
+                if waiting:
+                    await asyncio.wait(waiting, timeout=options['wait'])
+
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        connect_latencies.sort()
+        fanout.sort()
+
+        def percentile(values, p):
+            if not values:
+                return float('nan')
+            return values[min(len(values) - 1, int(p * len(values)))] * 1000
+
+        return {
+            'connected': len(connect_latencies),
+            'failed': total - len(connect_latencies),
+            'errors': errors,
+            'dropped': state['dropped'],
+            'alive': alive,
+            'connect_p50': percentile(connect_latencies, 0.50),
+            'connect_p99': percentile(connect_latencies, 0.99),
+            'keepalives': state['keepalives'],
+            'version': state['version'],
+            'received': len(fanout),
+            'fanout_p50': percentile(fanout, 0.50),
+            'fanout_p99': percentile(fanout, 0.99),
+            'fanout_max': fanout[-1] * 1000 if fanout else float('nan'),
+        }
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from apps.navigation.services.config_changes import CONFIG_CHANGES, prune
+
+
+class Command(BaseCommand):
+    help = 'Hapus change log delta sync yang lebih lama dari retention'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=CONFIG_CHANGES['retention_days'],
+                            help='Retention dalam hari (default CONFIG_CHANGES retention_days)')
+
+    def handle(self, *args, **options):
+        deleted = prune(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'{deleted} change record dihapus'))
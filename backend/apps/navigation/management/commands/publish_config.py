@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.navigation.services.config_publisher import config_publisher, CONFIG_PUBLISH
+
+
+class Command(BaseCommand):
+    help = 'Publish snapshot frontend config (cache + static JSON), misal setelah deploy'
+
+    def handle(self, *args, **options):
+        meta = config_publisher.publish()
+        if meta is None:
+            raise CommandError('Publish dilewati (ada publish lebih baru atau cache di-invalidate selama build)')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Config v{meta['version']} published {meta['published_at']}"
+            + (f" -> {CONFIG_PUBLISH['root']}" if CONFIG_PUBLISH['write_files'] else '')
+        ))
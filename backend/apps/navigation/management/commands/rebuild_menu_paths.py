@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.navigation.models import NavigationMenu
+from apps.navigation.services.menu_tree import rebuild_paths
+
+
+class Command(BaseCommand):
+    help = 'Backfill/hitung ulang MenuItem.path dan depth (materialized path)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--menu', type=str, action='append',
+                            help='Nama menu (boleh berulang); default semua menu')
+
+    def handle(self, *args, **options):
+        menus = None
+        if options['menu']:
+            menus = list(NavigationMenu.objects.filter(name__in=options['menu']))
+
+        with transaction.atomic():
+            updated = rebuild_paths(menus)
+
+        self.stdout.write(self.style.SUCCESS(f'{updated} menu item diperbarui'))
@@ -4,6 +4,9 @@ File location: backend/apps/navigation/models.py
 """
 
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
 from django.contrib.auth import get_user_model  # Tambah ini
 import json
@@ -50,7 +53,15 @@ class MenuItem(models.Model):
     """
     Model untuk item menu individual.
     Mendukung nested/hierarchical structure dengan parent-child relationship.
+
+    Hierarki juga disimpan sebagai materialized path ('1/5/12/': pk semua
+    ancestor + diri sendiri) dan depth (root = 0), di-sync otomatis di
+    save(). Subtree = satu query `path__startswith` (indexed), ancestors =
+    satu query `pk__in`. Update massal yang melewati save() (bulk_create,
+    QuerySet.update) perlu `python manage.py rebuild_menu_paths`.
     """
+    PATH_SEPARATOR = '/'
+
     menu = models.ForeignKey(NavigationMenu, on_delete=models.CASCADE, 
                             related_name='items', null=True, blank=True)  # Tambah null=True
     
@@ -73,6 +84,8 @@ class MenuItem(models.Model):
     is_active = models.BooleanField(default=True)
     requires_auth = models.BooleanField(default=False, 
                                        help_text="Hanya tampil untuk user yang login")
+    requires_staff = models.BooleanField(default=False,
+                                         help_text="Hanya tampil untuk staff")
     
     # Badge/notifikasi
     badge_text = models.CharField(max_length=20, blank=True, 
@@ -85,6 +98,12 @@ class MenuItem(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Hierarki (di-maintain oleh save)
+    path = models.CharField(max_length=255, blank=True, default='', db_index=True, editable=False,
+                            help_text="Materialized path: pk ancestors + diri sendiri, contoh 1/5/12/")
+    depth = models.PositiveSmallIntegerField(default=0, editable=False,
+                                             help_text="Kedalaman item (root = 0)")
+    
     class Meta:
         verbose_name = 'Menu Item'
         verbose_name_plural = 'Menu Items'
@@ -109,17 +128,109 @@ class MenuItem(models.Model):
             return f"https://{self.url}"
         return self.url
     
+    # ============ HIERARCHY ============
+    
+    def _parent_path(self):
+        """Path parent dari DB (bukan instance parent yang mungkin stale)."""
+        if self.parent_id is None:
+            return ''
+        path = MenuItem.objects.filter(pk=self.parent_id).values_list('path', flat=True).first()
+        if path:
+            return path
+        # Parent belum di-backfill: susun dari rantai parent
+        return ''.join(f'{pk}{self.PATH_SEPARATOR}' for pk in reversed(self.parent._ancestor_ids()))
+    
+    def _ancestor_ids(self):
+        """pk diri sendiri + ancestors (dari bawah) lewat rantai parent."""
+        ids, node = [], self
+        while node is not None and node.pk not in ids:
+            ids.append(node.pk)
+            node = node.parent
+        return ids
+    
+    def clean(self):
+        super().clean()
+        if self.pk and self.parent_id:
+            if self.parent_id == self.pk or self.parent_id in self._descendant_ids():
+                raise ValidationError({'parent': 'Parent tidak boleh item ini sendiri atau sub-item-nya.'})
+    
+    def _descendant_ids(self):
+        if not self.path:
+            return {item.pk for item in self._get_descendants_recursive(active_only=False)}
+        return set(MenuItem.objects.filter(path__startswith=self.path)
+                   .exclude(pk=self.pk).values_list('pk', flat=True))
+    
+    def save(self, *args, **kwargs):
+        """Save + sync path/depth item ini dan semua descendants-nya."""
+        old_path, old_depth = self.path, self.depth
+        parent_path = self._parent_path()
+        if self.pk and old_path and parent_path.startswith(old_path):
+            raise ValueError(f"MenuItem {self.pk}: parent tidak boleh sub-item sendiri")
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'parent' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'path', 'depth'}
+        
+        is_new = self.pk is None
+        if not is_new:
+            self.path = f'{parent_path}{self.pk}{self.PATH_SEPARATOR}'
+            self.depth = parent_path.count(self.PATH_SEPARATOR)
+        super().save(*args, **kwargs)
+        
+        if is_new:
+            # pk baru ada setelah INSERT
+            self.path = f'{parent_path}{self.pk}{self.PATH_SEPARATOR}'
+            self.depth = parent_path.count(self.PATH_SEPARATOR)
+            MenuItem.objects.filter(pk=self.pk).update(path=self.path, depth=self.depth)
+        elif old_path and old_path != self.path:
+            # Pindah parent: geser prefix path seluruh subtree dalam satu UPDATE
+            MenuItem.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(self.path), Substr('path', len(old_path) + 1)),
+                depth=F('depth') + (self.depth - old_depth),
+            )
+    
     def get_descendants(self, include_self=False):
-        """Get semua descendants item ini."""
-        descendants = []
-        if include_self:
-            descendants.append(self)
+        """
+        Get semua active descendants item ini (pre-order, urut order_index).
         
-        for child in self.children.filter(is_active=True).order_by('order_index'):
-            descendants.append(child)
-            descendants.extend(child.get_descendants())
+        Satu query subtree via path; item non-aktif beserta sub-itemnya
+        tidak disertakan.
+        """
+        if not self.path:
+            return self._get_descendants_recursive(include_self)
         
+        from .services.menu_tree import MenuTree
+        
+        tree = MenuTree(
+            MenuItem.objects.filter(path__startswith=self.path, depth__gt=self.depth, is_active=True)
+            .order_by('order_index', 'title')
+        )
+        descendants = [self] if include_self else []
+        stack = list(reversed(tree.children_of(self)))
+        while stack:
+            item = stack.pop()
+            descendants.append(item)
+            stack.extend(reversed(tree.children_of(item)))
+        return descendants
+    
+    def _get_descendants_recursive(self, include_self=False, active_only=True):
+        """Fallback untuk row yang belum punya path (query per node)."""
+        descendants = [self] if include_self else []
+        children = self.children.filter(is_active=True) if active_only else self.children.all()
+        for child in children.order_by('order_index'):
+            descendants.append(child)
+            descendants.extend(child._get_descendants_recursive(active_only=active_only))
         return descendants
+    
+    def get_ancestors(self, include_self=False):
+        """Ancestors dari root ke parent (breadcrumb), satu query via path."""
+        if self.path:
+            ids = [int(pk) for pk in self.path.split(self.PATH_SEPARATOR) if pk][:-1]
+        else:
+            ids = self._ancestor_ids()[:0:-1]
+        by_pk = MenuItem.objects.in_bulk(ids)
+        ancestors = [by_pk[pk] for pk in ids if pk in by_pk]
+        return ancestors + [self] if include_self else ancestors
 
 
 class SiteSetting(models.Model):
@@ -201,12 +312,14 @@ class SiteSetting(models.Model):
     
     @classmethod
     def get_setting(cls, key, default=None):
-        """Helper method untuk get setting value by key."""
-        try:
-            setting = cls.objects.get(setting_key=key)
-            return setting.get_value()
-        except cls.DoesNotExist:
-            return default
+        """
+        Helper method untuk get setting value by key.
+        
+        Dibaca dari settings registry (sudah di-parse, tanpa query DB);
+        registry reload otomatis saat ada SiteSetting yang berubah.
+        """
+        from .services.settings_registry import settings_registry
+        return settings_registry.get(key, default)
 
 
 class MediaFile(models.Model):
@@ -274,3 +387,150 @@ class MediaFile(models.Model):
         if self.file:
             return self.file.name.split('.')[-1].lower() if '.' in self.file.name else ""
         return ""
+
+
+class GeocodeResult(models.Model):
+    """
+    Long-term cache hasil geocoding TOMTOM.
+    Key berupa hash dari address yang sudah dinormalisasi, termasuk
+    hasil negatif (address tidak ditemukan).
+    """
+    address_key = models.CharField(max_length=64, unique=True,
+                                   help_text="SHA-256 dari normalized address")
+    normalized_address = models.TextField()
+    found = models.BooleanField(default=True)
+    
+    # Hasil geocoding (kosong jika found=False)
+    address = models.CharField(max_length=500, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    score = models.FloatField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Geocode Result'
+        verbose_name_plural = 'Geocode Results'
+        ordering = ['-updated_at']
+    
+    def __str__(self):
+        return f"{self.normalized_address} → {self.latitude},{self.longitude}"
+    
+    def as_result(self):
+        """Format sama dengan TomTomService.geocode (None jika tidak ditemukan)."""
+        if not self.found:
+            return None
+        return {
+            'address': self.address,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'score': self.score
+        }
+
+
+class ShippingRate(models.Model):
+    """
+    Tarif pengiriman per service type.
+    Dipakai oleh quote engine (services/shipping_quotes.py); jika tabel
+    kosong, dipakai tarif default yang sama dengan sebelumnya.
+    """
+    service_type = models.CharField(max_length=30, unique=True,
+                                    help_text="Kode service, misal: regular, express, same_day")
+    name = models.CharField(max_length=100, blank=True)
+    
+    # Komponen tarif (Rupiah)
+    rate_per_km = models.PositiveIntegerField(help_text="Tarif per km")
+    base_fee = models.PositiveIntegerField(default=0, help_text="Biaya tetap per pengiriman")
+    rate_per_kg = models.PositiveIntegerField(default=2000, help_text="Tarif per kg tambahan")
+    free_weight_kg = models.FloatField(default=1, help_text="Berat yang sudah termasuk tarif dasar")
+    min_charge = models.PositiveIntegerField(default=0, help_text="Biaya minimum per pengiriman")
+    
+    is_default = models.BooleanField(default=False,
+                                     help_text="Dipakai untuk service type yang tidak dikenal")
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Shipping Rate'
+        verbose_name_plural = 'Shipping Rates'
+        ordering = ['rate_per_km']
+    
+    def __str__(self):
+        return f"{self.service_type} (Rp {self.rate_per_km}/km)"
+
+
+class Depot(models.Model):
+    """
+    Depot/gudang pengiriman beserta area jangkauannya.
+    Area jangkauan berupa polygon [[lat, lon], ...] dan/atau radius dari depot.
+    """
+    code = models.CharField(max_length=30, unique=True)
+    name = models.CharField(max_length=200)
+    address = models.TextField(blank=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    
+    # Jangkauan pengiriman
+    coverage_polygon = models.JSONField(default=list, blank=True,
+                                        help_text="List titik [lat, lon] batas area jangkauan")
+    coverage_radius_km = models.FloatField(null=True, blank=True,
+                                           help_text="Radius jangkauan dari depot (km)")
+    
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Depot'
+        verbose_name_plural = 'Depots'
+        ordering = ['code']
+        indexes = [
+            models.Index(fields=['is_active']),
+        ]
+    
+    def __str__(self):
+        return f"{self.code} - {self.name}"
+
+
+class ConfigChange(models.Model):
+    """
+    Change log NavigationMenu/MenuItem/SiteSetting untuk delta sync
+    (GET /api/v1/navigation/changes/?since=<version>).
+    
+    Primary key (auto increment) adalah version yang dipakai client.
+    Record ditulis oleh signals setelah transaction commit, jadi urutan
+    version mengikuti urutan commit. Isi record hanya identitas object;
+    data terbaru dibaca saat delta dirakit (services/config_changes.py).
+    """
+    RESOURCE_CHOICES = [
+        ('menu', 'Navigation Menu'),
+        ('menu_item', 'Menu Item'),
+        ('setting', 'Site Setting'),
+    ]
+    
+    ACTION_CHOICES = [
+        ('create', 'Create'),
+        ('update', 'Update'),
+        ('delete', 'Delete'),
+    ]
+    
+    version = models.BigAutoField(primary_key=True)
+    resource = models.CharField(max_length=20, choices=RESOURCE_CHOICES)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    object_id = models.BigIntegerField(null=True, blank=True)
+    # setting_key untuk SiteSetting (client mengindex settings berdasarkan key)
+    object_key = models.CharField(max_length=100, blank=True)
+    # Location menu saat perubahan terjadi (kosong untuk settings)
+    location = models.CharField(max_length=20, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        verbose_name = 'Config Change'
+        verbose_name_plural = 'Config Changes'
+        ordering = ['-version']
+    
+    def __str__(self):
+        target = self.object_key or self.object_id
+        return f"v{self.version} {self.action} {self.resource} {target}"
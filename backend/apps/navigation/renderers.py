@@ -0,0 +1,124 @@
+"""
+Pre-rendered JSON responses untuk aplikasi Navigation.
+File location: backend/apps/navigation/renderers.py
+
+Cached payload disimpan sebagai bytes JSON final (plus varian gzip/brotli)
+dengan ETag dari content hash. Cache hit tidak perlu JSONRenderer lagi, dan
+request dengan If-None-Match yang cocok dijawab 304 tanpa body.
+"""
+
+import gzip
+import hashlib
+
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+
+from .services.menu_tree import ANONYMOUS
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Payload kecil tidak perlu dikompres
+COMPRESS_MIN_SIZE = 1024
+
+
+def prerender(data):
+    """
+    Render data ke payload siap kirim.
+
+    Returns dict yang aman di-pickle ke cache:
+    - body: JSON bytes (identik dengan output JSONRenderer)
+    - gzip / br: versi terkompresi (None jika tidak dibuat)
+    - etag: weak ETag dari hash body
+    """
+    body = JSONRenderer().render(data)
+    payload = {
+        'body': body,
+        'gzip': None,
+        'br': None,
+        'etag': 'W/"%s"' % hashlib.sha256(body).hexdigest()[:32],
+    }
+
+    if len(body) >= COMPRESS_MIN_SIZE:
+        payload['gzip'] = gzip.compress(body, compresslevel=6, mtime=0)
+        if brotli is not None:
+            payload['br'] = brotli.compress(body)
+
+    return payload
+
+
+def _etag_matches(if_none_match, etag):
+    """Weak comparison sesuai RFC 9110 (W/ prefix diabaikan)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(
+        candidate.strip().removeprefix('W/') == opaque
+        for candidate in if_none_match.split(',')
+    )
+
+
+def _accepted_encodings(accept_encoding):
+    """Parse Accept-Encoding; encoding dengan q=0 dianggap ditolak."""
+    accepted = set()
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+def _preferred_encoding(accept_encoding, payload):
+    accepted = _accepted_encodings(accept_encoding)
+    if payload['br'] is not None and 'br' in accepted:
+        return 'br'
+    if payload['gzip'] is not None and 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def prerendered_response(request, payload, status=200):
+    """
+    Build HttpResponse dari payload prerender().
+
+    Bisa langsung di-return dari DRF view (APIView menerima HttpResponse).
+    """
+    etag = payload['etag']
+
+    if _etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+        response = HttpResponseNotModified()
+    else:
+        encoding = _preferred_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), payload)
+        body = payload[encoding] if encoding else payload['body']
+        response = HttpResponse(body, status=status, content_type='application/json')
+        if encoding:
+            response['Content-Encoding'] = encoding
+
+    response['ETag'] = etag
+    # Client boleh simpan, tapi wajib revalidate (304 murah karena tanpa body)
+    response['Cache-Control'] = 'no-cache'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def vary_by_audience(response, audience):
+    """
+    Response yang isinya bergantung audience (menu requires_auth/staff):
+    shared cache (CDN/proxy) wajib membedakan per credential, dan variant
+    non-anonymous tidak boleh disimpan shared cache sama sekali.
+    """
+    patch_vary_headers(response, ['Authorization', 'Cookie'])
+    if audience != ANONYMOUS:
+        patch_cache_control(response, private=True)
+    return response
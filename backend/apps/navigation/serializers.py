@@ -3,14 +3,23 @@ Serializers untuk aplikasi Navigation.
 File location: backend/apps/navigation/serializers.py
 """
 
+from urllib.parse import urljoin
+
+from django.conf import settings
 from rest_framework import serializers
 from .models import NavigationMenu, MenuItem, SiteSetting, MediaFile
+from .services.menu_tree import MenuTree, is_visible
 
 
 class MenuItemSerializer(serializers.ModelSerializer):
-    """Serializer untuk MenuItem dengan nested children."""
+    """
+    Serializer untuk MenuItem dengan nested children.
+    
+    Jika context berisi 'menu_tree' (MenuTree), children dan has_children
+    diambil dari index in-memory tanpa query tambahan.
+    """
     children = serializers.SerializerMethodField()
-    has_children = serializers.BooleanField(read_only=True)
+    has_children = serializers.SerializerMethodField()
     
     class Meta:
         model = MenuItem
@@ -25,6 +34,7 @@ class MenuItemSerializer(serializers.ModelSerializer):
             'badge_text',
             'badge_color',
             'requires_auth',
+            'requires_staff',
             'description',
             'order_index',
             'has_children',
@@ -32,8 +42,22 @@ class MenuItemSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['full_url', 'has_children']
     
+    def get_has_children(self, obj):
+        """Cek submenu via tree jika tersedia."""
+        tree = self.context.get('menu_tree')
+        if tree is not None:
+            return tree.has_children(obj)
+        return obj.has_children
+    
     def get_children(self, obj):
         """Get active children ordered by order_index."""
+        tree = self.context.get('menu_tree')
+        if tree is not None:
+            children = tree.children_of(obj)
+            if children:
+                return MenuItemSerializer(children, many=True, context=self.context).data
+            return []
+        
         children = obj.children.filter(is_active=True).order_by('order_index')
         if children.exists():
             return MenuItemSerializer(children, many=True, context=self.context).data
@@ -52,9 +76,20 @@ class NavigationMenuSerializer(serializers.ModelSerializer):
         read_only_fields = ['location_display', 'created_at']
     
     def get_items(self, obj):
-        """Get root items (items without parent) yang aktif."""
-        root_items = obj.items.filter(parent=None, is_active=True).order_by('order_index')
-        return MenuItemSerializer(root_items, many=True, context=self.context).data
+        """
+        Get root items (items without parent) yang aktif.
+        
+        Semua active items di-load sekali lewat MenuTree, jadi jumlah query
+        tetap konstan berapapun ukuran dan kedalaman menu. Caller boleh
+        mengirim MenuTree yang sudah di-load lewat context 'menu_tree'
+        (misal dari async view) sehingga serializer tidak query sama sekali.
+        Context 'audience' memfilter items requires_auth/requires_staff.
+        """
+        tree = self.context.get('menu_tree')
+        if tree is None:
+            tree = MenuTree.for_menu(obj, self.context.get('audience'))
+        context = {**self.context, 'menu_tree': tree}
+        return MenuItemSerializer(tree.roots(), many=True, context=context).data
 
 
 class SiteSettingSerializer(serializers.ModelSerializer):
@@ -88,11 +123,14 @@ class MediaFileSerializer(serializers.ModelSerializer):
                            'file_size', 'file_extension']
     
     def get_file_url(self, obj):
-        """Get absolute file URL."""
+        """Get absolute file URL (BACKEND_URL jika tanpa request, misal config publish)."""
+        if not obj.file:
+            return None
         request = self.context.get('request')
-        if request and obj.file:
+        if request:
             return request.build_absolute_uri(obj.file.url)
-        return obj.file.url if obj.file else None
+        backend_url = getattr(settings, 'BACKEND_URL', '')
+        return urljoin(backend_url + '/', obj.file.url) if backend_url else obj.file.url
 
 
 # Compact serializers untuk API response yang lebih kecil
@@ -114,7 +152,11 @@ class CompactNavigationSerializer(serializers.ModelSerializer):
     
     def get_items(self, obj):
         """Get only active root items tanpa children yang dalam."""
-        root_items = obj.items.filter(parent=None, is_active=True).order_by('order_index')
+        root_items = self.context.get('root_items')
+        if root_items is None:
+            root_items = obj.items.filter(parent=None, is_active=True).order_by('order_index')
+        audience = self.context.get('audience')
+        root_items = [item for item in root_items if is_visible(item, audience)]
         return CompactMenuItemSerializer(root_items, many=True).data
 
 
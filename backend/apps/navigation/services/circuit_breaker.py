@@ -0,0 +1,185 @@
+# apps/navigation/services/circuit_breaker.py
+"""
+Circuit breaker per upstream API (TOMTOM, EMSIFA).
+
+State:
+- closed: request diteruskan; outcome dicatat dalam sliding window
+- open: failure rate >= threshold (minimal min_calls) -> request langsung
+  ditolak (CircuitOpenError) tanpa menunggu timeout, caller memakai fallback
+- half_open: setelah open_timeout, sejumlah kecil request percobaan
+  diteruskan; sukses -> closed, gagal -> open lagi. Slot percobaan yang
+  tidak pernah di-record (misal request di-cancel) kedaluwarsa setelah
+  open_timeout supaya breaker tidak macet di half_open
+
+State disimpan per process (setiap worker belajar sendiri, tanpa round
+trip ke Redis). Request yang lebih lambat dari slow_call dihitung gagal.
+"""
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+CIRCUIT_BREAKER = {
+    'failure_rate': 0.5,   # Rasio gagal dalam window untuk membuka breaker
+    'min_calls': 5,        # Minimum request dalam window sebelum rasio dihitung
+    'window': 60,          # Detik sliding window
+    'open_timeout': 30,    # Detik breaker open sebelum half-open
+    'half_open_calls': 1,  # Request percobaan saat half-open
+    'slow_call': 5.0,      # Detik; request lebih lambat dianggap gagal
+}
+CIRCUIT_BREAKER.update(getattr(settings, 'CIRCUIT_BREAKER', {}))
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Request ditolak karena circuit breaker upstream sedang open"""
+
+    def __init__(self, name):
+        super().__init__(f"Circuit breaker '{name}' open")
+        self.name = name
+
+
+def is_failure(error):
+    """Error client (4xx selain 429) tidak menandakan upstream bermasalah"""
+    status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+    return not (status_code is not None and 400 <= status_code < 500 and status_code != 429)
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker dengan sliding window waktu"""
+
+    def __init__(self, name, failure_rate=None, min_calls=None, window=None,
+                 open_timeout=None, half_open_calls=None, slow_call=None):
+        self.name = name
+        self.failure_rate = failure_rate or CIRCUIT_BREAKER['failure_rate']
+        self.min_calls = min_calls or CIRCUIT_BREAKER['min_calls']
+        self.window = window or CIRCUIT_BREAKER['window']
+        self.open_timeout = open_timeout or CIRCUIT_BREAKER['open_timeout']
+        self.half_open_calls = half_open_calls or CIRCUIT_BREAKER['half_open_calls']
+        self.slow_call = CIRCUIT_BREAKER['slow_call'] if slow_call is None else slow_call
+
+        self._lock = threading.Lock()
+        self._calls = deque()  # (timestamp, ok, latency)
+        self._state = CLOSED
+        self._opened_at = None
+        self._probes = 0
+        self._probe_at = None
+        self._rejected = 0
+        self._last_error = None
+
+    def _trim(self, now):
+        while self._calls and self._calls[0][0] < now - self.window:
+            self._calls.popleft()
+
+    def _open(self, now):
+        self._state = OPEN
+        self._opened_at = now
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """True jika request boleh diteruskan ke upstream"""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == OPEN:
+                if now - self._opened_at < self.open_timeout:
+                    self._rejected += 1
+                    return False
+                self._state, self._probes = HALF_OPEN, 0
+            if self._state == HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    if now - self._probe_at < self.open_timeout:
+                        self._rejected += 1
+                        return False
+                    # Probe sebelumnya tidak pernah record(); anggap hilang
+                    self._probes = 0
+                self._probes += 1
+                self._probe_at = now
+            return True
+
+    def record(self, ok, latency, error=None):
+        """Catat outcome request yang sudah di-allow"""
+        with self._lock:
+            now = time.monotonic()
+            if ok and self.slow_call and latency > self.slow_call:
+                ok, error = False, f'slow call {latency:.1f}s'
+            if not ok:
+                self._last_error = (str(error) or type(error).__name__)[:200] if error else 'error'
+
+            if self._state == HALF_OPEN:
+                if ok:
+                    self._state = CLOSED
+                    self._calls.clear()
+                else:
+                    self._open(now)
+                self._calls.append((now, ok, latency))
+                return
+
+            self._calls.append((now, ok, latency))
+            self._trim(now)
+            if self._state == CLOSED and len(self._calls) >= self.min_calls:
+                failures = sum(1 for _, success, _ in self._calls if not success)
+                if failures / len(self._calls) >= self.failure_rate:
+                    self._open(now)
+
+    def call(self, func, *args, **kwargs):
+        """Jalankan func lewat breaker; raise CircuitOpenError jika open"""
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        start = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self.record(not is_failure(e), time.monotonic() - start, e)
+            raise
+        self.record(True, time.monotonic() - start)
+        return result
+
+    def snapshot(self):
+        """State dan statistik latency untuk health check"""
+        state = self.state
+        with self._lock:
+            self._trim(time.monotonic())
+            calls = list(self._calls)
+            rejected, last_error = self._rejected, self._last_error
+
+        latencies = sorted(latency for _, _, latency in calls)
+        failures = sum(1 for _, ok, _ in calls if not ok)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1)
+
+        return {
+            'state': state,
+            'calls': len(calls),
+            'failure_rate': round(failures / len(calls), 3) if calls else 0.0,
+            'latency_ms': {'p50': percentile(0.5), 'p95': percentile(0.95)},
+            'rejected': rejected,
+            'last_error': last_error,
+        }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """Breaker per upstream (dibuat sekali per process)"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(name, CircuitBreaker(name))
+    return breaker
+
+
+def all_breakers():
+    return dict(_breakers)
@@ -0,0 +1,198 @@
+# apps/navigation/services/config_changes.py
+"""
+Delta sync frontend config berbasis change log (ConfigChange).
+
+Signals (dan operasi bulk seperti reorder_menu) mencatat identitas object
+yang berubah setelah transaction commit. Client yang sudah memegang
+config (field change_version) cukup polling
+GET /changes/?since=<version> dan menerima:
+- navigation: item yang added/changed (lengkap dengan subtree, karena
+  item yang muncul kembali membawa children-nya) dan id yang removed
+- settings: key public yang added/changed dan key yang removed
+
+Delta dirakit dari data terbaru di DB (bukan dari isi log), dengan filter
+active/audience yang sama dengan /config/, jadi hasil patch client sama
+dengan config lengkap. Jika delta tidak bisa dipercaya (since terlalu lama
+sudah di-prune, since dari DB lain, terlalu banyak perubahan, atau menu
+location berubah) response berisi reset=true dan client fetch ulang
+/config/.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .menu_tree import ANONYMOUS, MenuTree
+
+logger = logging.getLogger(__name__)
+
+CONFIG_CHANGES = {
+    'retention_days': 7,  # Change log lebih lama di-prune (prune_config_changes)
+    'max_changes': 500,   # Lebih dari ini client lebih murah fetch ulang config
+}
+CONFIG_CHANGES.update(getattr(settings, 'CONFIG_CHANGES', {}))
+
+
+# ============ RECORDING ============
+
+def record_changes(changes):
+    """
+    Tulis ConfigChange (unsaved) setelah transaction commit.
+
+    Setelah commit supaya urutan version = urutan commit: client yang sudah
+    melihat version N tidak akan kehilangan perubahan dari transaction yang
+    commit belakangan dengan version lebih kecil. Callback di savepoint yang
+    di-rollback otomatis dibuang oleh Django.
+    """
+    from ..models import ConfigChange
+
+    changes = list(changes)
+    if not changes:
+        return
+
+    def _write():
+        try:
+            ConfigChange.objects.bulk_create(changes)
+        except Exception as e:
+            # Client tetap konsisten lewat reset saat fetch config berikutnya
+            logger.error(f"Config change log error: {e}")
+
+    transaction.on_commit(_write)
+
+
+def record_menu_changes(menus, action='update'):
+    """Untuk queryset.update() pada NavigationMenu (tidak memicu signals)"""
+    from ..models import ConfigChange
+
+    record_changes(ConfigChange(resource='menu', action=action, object_id=menu.pk, location=menu.location)
+                   for menu in menus)
+
+
+def latest_version():
+    """Version change log terbaru (0 jika kosong)"""
+    from ..models import ConfigChange
+
+    return ConfigChange.objects.aggregate(version=Max('version'))['version'] or 0
+
+
+def prune(days=None):
+    """Hapus change log lebih lama dari retention; record terbaru selalu disisakan"""
+    from ..models import ConfigChange
+
+    days = CONFIG_CHANGES['retention_days'] if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = ConfigChange.objects.filter(
+        created_at__lt=cutoff, version__lt=latest_version()
+    ).delete()
+    return deleted
+
+
+# ============ DELTA ============
+
+def _first_actions(records, resource, field):
+    """{object: action pertama dalam window} (create = belum dimiliki client)"""
+    actions = {}
+    for record in records:
+        if record.resource == resource:
+            actions.setdefault(getattr(record, field), record.action)
+    return actions
+
+
+def _navigation_delta(actions, location, audience):
+    from ..models import NavigationMenu
+    from ..serializers import MenuItemSerializer
+
+    delta = {'added': [], 'changed': [], 'removed': []}
+    if not actions:
+        return delta
+
+    menu = NavigationMenu.objects.filter(location=location, is_active=True).first()
+    tree = MenuTree.for_menu(menu, audience) if menu else None
+
+    # Item yang tampil di config: active, visible, dan semua ancestor juga tampil
+    visible = {}
+    stack = list(tree.roots()) if tree else []
+    while stack:
+        item = stack.pop()
+        visible[item.pk] = item
+        stack.extend(tree.children_of(item))
+
+    upserted = {pk for pk in actions if pk in visible}
+    context = {'menu_tree': tree, 'audience': audience}
+    for pk in sorted(upserted, key=lambda pk: visible[pk].path):
+        item = visible[pk]
+        # Sudah terkirim sebagai bagian subtree ancestor
+        parent_id = item.parent_id
+        while parent_id is not None and parent_id not in upserted:
+            parent_id = visible[parent_id].parent_id
+        if parent_id is not None:
+            continue
+        data = {**MenuItemSerializer(item, context=context).data, 'parent': item.parent_id}
+        delta['added' if actions[pk] == 'create' else 'changed'].append(data)
+
+    # Dibuat lalu dihapus dalam window: client tidak pernah memilikinya
+    delta['removed'] = sorted(pk for pk, action in actions.items()
+                              if pk not in visible and action != 'create')
+    return delta
+
+
+def _settings_delta(actions):
+    from ..models import SiteSetting
+
+    delta = {'added': {}, 'changed': {}, 'removed': []}
+    if not actions:
+        return delta
+
+    current = {
+        setting.setting_key: setting.get_value()
+        for setting in SiteSetting.objects.filter(setting_key__in=list(actions), is_public=True)
+    }
+    for key, action in sorted(actions.items()):
+        if key in current:
+            delta['added' if action == 'create' else 'changed'][key] = current[key]
+        elif action != 'create':
+            delta['removed'].append(key)
+    return delta
+
+
+def changes_since(since, location='header', audience=ANONYMOUS):
+    """
+    Delta config untuk client yang memegang version `since`.
+
+    Return {'version', 'reset'} + 'navigation'/'settings' jika reset False.
+    Client menyimpan `version` untuk polling berikutnya. Tanpa perubahan
+    hanya satu query (MAX pada primary key).
+    """
+    from ..models import ConfigChange
+
+    latest = latest_version()
+    reset = {'version': latest, 'reset': True}
+    if since is None or since > latest:
+        return reset
+
+    records = []
+    if since < latest:
+        oldest = ConfigChange.objects.order_by('version').values_list('version', flat=True).first()
+        if oldest is not None and oldest > since + 1:
+            # Perubahan setelah since sebagian sudah di-prune
+            return reset
+
+        limit = CONFIG_CHANGES['max_changes']
+        records = list(
+            ConfigChange.objects.filter(version__gt=since, version__lte=latest)
+            .filter(Q(resource='setting') | Q(location=location))
+            .order_by('version')[:limit + 1]
+        )
+        # Perubahan menu (active/location/nama) mengganti seluruh navigation
+        if len(records) > limit or any(record.resource == 'menu' for record in records):
+            return reset
+
+    return {
+        'version': latest,
+        'reset': False,
+        'navigation': _navigation_delta(_first_actions(records, 'menu_item', 'object_id'), location, audience),
+        'settings': _settings_delta(_first_actions(records, 'setting', 'object_key')),
+    }
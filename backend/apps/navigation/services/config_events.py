@@ -0,0 +1,179 @@
+# apps/navigation/services/config_events.py
+"""
+Server push notifikasi perubahan config (Server-Sent Events).
+
+Setiap config selesai di-publish (services/config_publisher.py, sekali per
+transaction yang mengubah navigation/settings/logo) meta
+{'version', 'published_at', 'change_version'} di-broadcast ke semua
+koneksi SSE (AsyncConfigEventsView). Client membandingkan dengan version
+yang dipegang:
+- change_version berubah -> GET /changes/?since=... (delta)
+- hanya version berubah (misal logo) -> fetch ulang /config/
+
+Broker:
+- LocalBroker: fan-out in-process, cukup untuk satu worker / development
+- RedisBroker: publish lewat Redis pub/sub; setiap worker ASGI memegang
+  satu koneksi subscriber yang di-fan-out ke koneksi SSE lokal, jadi
+  koneksi Redis tidak bertambah dengan jumlah client
+
+Koneksi SSE idle hanya berupa satu coroutine + asyncio.Queue kecil;
+publish di-fan-out dengan satu call_soon_threadsafe per event loop.
+Queue client yang lambat hanya menyimpan event terbaru (event lama
+dibuang), karena client cukup tahu version terakhir.
+"""
+import asyncio
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import redis
+    from redis import asyncio as aioredis
+except ImportError:
+    redis = aioredis = None
+
+logger = logging.getLogger(__name__)
+
+CONFIG_EVENTS = {
+    'backend': 'local',       # 'redis' untuk lebih dari satu worker/server
+    'redis_url': 'redis://localhost:6379/1',
+    'channel': 'config_events',
+    'queue_size': 4,          # Event pending per koneksi sebelum event lama dibuang
+    'keepalive': 15,          # Detik antar komentar keepalive (proxy idle timeout)
+    'retry': 5000,            # ms, jeda reconnect EventSource
+    'max_connections': 10000, # Per worker; lebih dari ini dijawab 503
+}
+CONFIG_EVENTS.update(getattr(settings, 'CONFIG_EVENTS', {}))
+
+
+def _deliver(queues, event):
+    """Jalan di event loop pemilik queues"""
+    for queue in queues:
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+
+def format_sse(event):
+    """Event meta config -> frame SSE (id = version untuk Last-Event-ID)"""
+    return f"id: {event['version']}\nevent: config\ndata: {json.dumps(event)}\n\n"
+
+
+class LocalBroker:
+    """Fan-out in-process ke subscriber di semua event loop worker ini"""
+
+    def __init__(self, queue_size=4):
+        self.queue_size = queue_size
+        self._subscribers = {}  # event loop -> set(asyncio.Queue)
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """Dipanggil dari coroutine; return queue event. Wajib unsubscribe."""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(loop, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            queues = self._subscribers.get(loop)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[loop]
+
+    def connection_count(self):
+        with self._lock:
+            return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(self, event):
+        """Thread-safe; dipanggil dari thread sync (publisher) maupun event loop"""
+        self._fanout(event)
+
+    def _fanout(self, event):
+        with self._lock:
+            targets = [(loop, list(queues)) for loop, queues in self._subscribers.items()]
+        for loop, queues in targets:
+            try:
+                loop.call_soon_threadsafe(_deliver, queues, event)
+            except RuntimeError:
+                # Event loop sudah ditutup (worker shutdown)
+                pass
+
+
+class RedisBroker(LocalBroker):
+    """Publish lewat Redis pub/sub; satu listener per event loop worker"""
+
+    def __init__(self, url, channel, queue_size=4):
+        if redis is None:
+            raise ImproperlyConfigured("CONFIG_EVENTS backend 'redis' membutuhkan package redis")
+        super().__init__(queue_size)
+        self.url = url
+        self.channel = channel
+        self._client = None
+        self._listeners = {}  # event loop -> asyncio.Task
+
+    def publish(self, event):
+        """Semua worker (termasuk worker ini) menerima event lewat listener"""
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(self.channel, json.dumps(event))
+
+    def subscribe(self):
+        queue = super().subscribe()
+        loop = asyncio.get_running_loop()
+        task = self._listeners.get(loop)
+        if task is None or task.done():
+            self._listeners[loop] = loop.create_task(self._listen())
+        return queue
+
+    async def _listen(self):
+        from django.core.cache import cache
+        from ..caching import CONFIG_VERSION_KEY
+
+        delay, reconnect = 1, False
+        while True:
+            try:
+                async with aioredis.from_url(self.url) as client, client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    delay = 1
+                    if reconnect:
+                        # Event selama terputus hilang; kirim version terakhir supaya client resync
+                        meta = await cache.aget(CONFIG_VERSION_KEY)
+                        if meta:
+                            self._fanout(meta)
+                    async for message in pubsub.listen():
+                        if message['type'] == 'message':
+                            self._fanout(json.loads(message['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Config events Redis listener error: {e}; reconnect dalam {delay}s")
+                await asyncio.sleep(delay)
+                delay, reconnect = min(delay * 2, 30), True
+
+
+def _create_broker():
+    backend = CONFIG_EVENTS['backend']
+    if backend == 'local':
+        return LocalBroker(CONFIG_EVENTS['queue_size'])
+    if backend == 'redis':
+        return RedisBroker(CONFIG_EVENTS['redis_url'], CONFIG_EVENTS['channel'], CONFIG_EVENTS['queue_size'])
+    raise ImproperlyConfigured(f"CONFIG_EVENTS backend tidak dikenal: '{backend}'")
+
+
+config_events = _create_broker()
+
+
+def broadcast(meta):
+    """Broadcast meta config yang baru di-publish; gagal tidak menggagalkan publish"""
+    try:
+        config_events.publish(meta)
+    except Exception as e:
+        # Client tetap konsisten lewat polling /changes/
+        logger.error(f"Config event broadcast error: {e}")
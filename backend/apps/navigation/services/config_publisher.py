@@ -0,0 +1,172 @@
+# apps/navigation/services/config_publisher.py
+"""
+Publish snapshot frontend config setiap kali data berubah.
+
+Signals NavigationMenu/MenuItem/SiteSetting/MediaFile memanggil
+`config_publisher.schedule()`. Setelah transaction commit (satu kali per
+transaction) publisher:
+1. mengambil version baru yang monoton naik (incr di Redis)
+2. build ulang semua fragment dari DB lalu config semua location x
+   audience (fan-out, frontend_config.py); tidak membaca fragment dari
+   cache (maupun settings_registry tanpa reload) karena invalidation lain
+   di transaction yang sama mungkin belum dijalankan
+3. menulis semua entry frontend_config_<location>_<audience> dalam satu
+   set_many
+4. menulis config-<location>.json (variant anonymous saja, karena file
+   publik) dan manifest.json ke CONFIG_PUBLISH['root'] secara atomic (tulis
+   file sementara lalu os.replace) untuk nginx/CDN
+5. broadcast meta version ke client SSE (services/config_events.py)
+
+Publish yang version-nya sudah dilangkahi publish lain sebelum sempat
+menulis dilewati, supaya hasil yang lebih baru tidak tertimpa. Begitu
+juga jika cache di-invalidate selama build (fragment mungkin dari rows
+lama); invalidation itu selalu diikuti publish berikutnya.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from ..caching import (
+    MENU_LOCATIONS,
+    CONFIG_VERSION_KEY,
+    LOCAL_TIER,
+    VersionStamp,
+    navigation_version,
+    frontend_config_key,
+    put_many,
+)
+from ..renderers import prerender
+from .config_changes import latest_version
+from .config_events import broadcast
+from .frontend_config import CACHE_TIMEOUT, config_fragment_builders, config_document, fetch_fragments
+from .menu_tree import ANONYMOUS, AUDIENCES
+from .settings_registry import settings_registry
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PUBLISH = {
+    'root': Path(settings.MEDIA_ROOT) / 'config',
+    'write_files': True,
+}
+CONFIG_PUBLISH.update(getattr(settings, 'CONFIG_PUBLISH', {}))
+
+config_version = VersionStamp('config_publish', LOCAL_TIER['version_check_interval'])
+
+
+def _write_atomic(path, data):
+    """Reader (nginx/CDN) tidak pernah melihat file setengah jadi"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class ConfigPublisher:
+    """Build & publish config semua location setelah transaction commit"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def schedule(self):
+        """
+        Publish setelah transaction commit. Dipanggil berkali-kali dalam satu
+        transaction (misal admin menyimpan menu + inline items), hanya
+        callback pertama yang dijalankan setelah commit yang publish.
+
+        Setiap panggilan mendaftarkan callback sendiri, jadi callback yang
+        dibuang Django karena savepoint-nya di-rollback tidak membatalkan
+        publish untuk perubahan yang tetap commit. Flag pending tidak ikut
+        di-rollback; paling buruk ada satu publish ekstra (idempotent).
+        """
+        self._local.pending = True
+        transaction.on_commit(self._run_pending)
+
+    def _run_pending(self):
+        if not getattr(self._local, 'pending', False):
+            return
+        self._local.pending = False
+        try:
+            self.publish()
+        except Exception as e:
+            # Config tetap di-build lazy oleh ConfigAPIView
+            logger.error(f"Config publish error: {e}")
+
+    def publish(self):
+        """
+        Publish sekarang; return meta {'version', 'published_at',
+        'change_version'} atau None jika kalah.
+        """
+        version = config_version.bump()
+        cache_version = navigation_version.current(force=True)
+        # Dibaca sebelum build: snapshot memuat minimal semua perubahan s/d change_version
+        meta = {'version': version, 'published_at': timezone.now().isoformat(),
+                'change_version': latest_version()}
+
+        # Stamp settings dari transaction ini mungkin belum di-bump (callback-nya setelah publish)
+        settings_registry.reload()
+
+        variants = [(location, audience) for location in MENU_LOCATIONS for audience in AUDIENCES]
+        builders = {}
+        for location, audience in variants:
+            builders.update(config_fragment_builders(location, audience))
+        fragments, built = fetch_fragments(builders, refresh=True)
+
+        payloads = {
+            (location, audience): prerender(config_document(location, fragments, meta, audience))
+            for location, audience in variants
+        }
+
+        # Publish lain yang dimulai setelah ini sudah/akan menulis data lebih baru
+        if cache.get(config_version.key) != version:
+            logger.info(f"Config publish v{version} dilewati (ada version lebih baru)")
+            return None
+
+        written = put_many(
+            {frontend_config_key(*variant): payload for variant, payload in payloads.items()},
+            CACHE_TIMEOUT.get('config', 300),
+            extra=built,
+            version=cache_version,
+        )
+        if not written:
+            logger.info(f"Config publish v{version} dilewati (cache di-invalidate selama build)")
+            return None
+        # Meta tanpa expiry: rebuild lazy setelah entry config expired tetap memakai version ini
+        cache.set(CONFIG_VERSION_KEY, meta, None)
+        if CONFIG_PUBLISH['write_files']:
+            self._write_files({location: payload for (location, audience), payload in payloads.items()
+                               if audience == ANONYMOUS}, meta)
+        # Terakhir: client yang menerima event langsung mendapat config/file baru
+        broadcast(meta)
+
+        logger.info(f"Config v{version} published ({len(payloads)} variant)")
+        return meta
+
+    def _write_files(self, payloads, meta):
+        root = Path(CONFIG_PUBLISH['root'])
+        root.mkdir(parents=True, exist_ok=True)
+        files = {}
+        for location, payload in payloads.items():
+            name = f'config-{location}.json'
+            _write_atomic(root / name, payload['body'])
+            if payload['gzip']:
+                # Untuk nginx gzip_static
+                _write_atomic(root / f'{name}.gz', payload['gzip'])
+            files[location] = name
+        # Manifest terakhir: reader yang melihat version baru pasti menemukan file baru
+        _write_atomic(root / 'manifest.json', json.dumps({**meta, 'files': files}).encode())
+
+
+config_publisher = ConfigPublisher()
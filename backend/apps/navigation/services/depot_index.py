@@ -0,0 +1,241 @@
+# apps/navigation/services/depot_index.py
+"""
+Spatial index depot untuk query "depot terdekat" dan "depot mana yang
+menjangkau koordinat ini".
+
+Index berupa grid lat/lon (cell CELL_DEG derajat):
+- nearest: cari di cell query lalu ring cell di sekitarnya; berhenti jika
+  jarak ke-k sudah lebih kecil dari jarak minimum ke ring berikutnya
+- coverage: tiap cell menyimpan depot yang bounding box jangkauannya
+  (polygon/radius) menyentuh cell tersebut, lalu dicek exact dengan
+  ray casting (polygon) atau haversine (radius)
+
+Index di-build sekali per process dan reload saat version stamp 'depots'
+berubah (di-bump oleh signals Depot).
+"""
+import math
+import threading
+
+import numpy as np
+from django.db import transaction
+
+from ..caching import VersionStamp, LOCAL_TIER
+from .geo_vector import EARTH_RADIUS_KM
+
+depots_version = VersionStamp('depots', LOCAL_TIER['version_check_interval'])
+
+# Ukuran cell grid (derajat, ~28 km di ekuator)
+CELL_DEG = 0.25
+
+# Di bawah jumlah ini nearest dihitung brute force (lebih cepat dari grid)
+BRUTE_FORCE_LIMIT = 256
+
+# Faktor aman lower bound jarak antar ring (pendekatan bidang datar pada bola)
+RING_BOUND_FACTOR = 0.98
+
+KM_PER_DEG = math.pi * EARTH_RADIUS_KM / 180
+
+
+def _haversine(lat, lon, lats, lons):
+    """Jarak (km) dari satu titik ke array titik (derajat)"""
+    lat, lon = math.radians(lat), math.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = (np.sin((lats - lat) / 2) ** 2
+         + math.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def point_in_polygon(lat, lon, polygon):
+    """Ray casting vectorized; polygon array (N, 2) [lat, lon]"""
+    y, x = polygon[:, 0], polygon[:, 1]
+    y_next, x_next = np.roll(y, -1), np.roll(x, -1)
+    crosses = (y > lat) != (y_next > lat)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = x + (lat - y) * (x_next - x) / (y_next - y)
+    return bool(np.count_nonzero(crosses & (lon < x_cross)) % 2)
+
+
+class DepotIndex:
+    """Grid index immutable atas list depot (dict dengan latitude/longitude)"""
+
+    def __init__(self, depots, cell_deg=CELL_DEG):
+        self.depots = list(depots)
+        self.cell_deg = cell_deg
+        self.lats = np.array([depot['latitude'] for depot in self.depots], dtype=np.float64)
+        self.lons = np.array([depot['longitude'] for depot in self.depots], dtype=np.float64)
+
+        # Grid titik depot
+        self._cells = {}
+        for i, (lat, lon) in enumerate(zip(self.lats, self.lons)):
+            self._cells.setdefault(self._cell(lat, lon), []).append(i)
+        self._cells = {cell: np.array(ids, dtype=np.intp) for cell, ids in self._cells.items()}
+        if self._cells:
+            rows = [cell[0] for cell in self._cells]
+            cols = [cell[1] for cell in self._cells]
+            self._extent = (min(rows), max(rows), min(cols), max(cols))
+            # Lebar cell terkecil (km) di latitude paling ekstrem, untuk lower bound jarak
+            max_lat = min(89.0, float(np.abs(self.lats).max()) + cell_deg)
+            self._cell_km = cell_deg * KM_PER_DEG * math.cos(math.radians(max_lat)) * RING_BOUND_FACTOR
+
+        # Grid area jangkauan (bounding box polygon/radius)
+        self._polygons = {}
+        self._coverage_cells = {}
+        for i, depot in enumerate(self.depots):
+            boxes = []
+            if depot.get('coverage_polygon'):
+                polygon = np.asarray(depot['coverage_polygon'], dtype=np.float64)
+                self._polygons[i] = polygon
+                boxes.append((polygon[:, 0].min(), polygon[:, 0].max(),
+                              polygon[:, 1].min(), polygon[:, 1].max()))
+            if depot.get('coverage_radius_km'):
+                dlat = depot['coverage_radius_km'] / KM_PER_DEG
+                dlon = dlat / max(math.cos(math.radians(abs(self.lats[i]) + dlat)), 1e-6)
+                boxes.append((self.lats[i] - dlat, self.lats[i] + dlat,
+                              self.lons[i] - dlon, self.lons[i] + dlon))
+            for min_lat, max_lat, min_lon, max_lon in boxes:
+                (row_start, col_start) = self._cell(min_lat, min_lon)
+                (row_end, col_end) = self._cell(max_lat, max_lon)
+                for row in range(row_start, row_end + 1):
+                    for col in range(col_start, col_end + 1):
+                        self._coverage_cells.setdefault((row, col), set()).add(i)
+
+    def __len__(self):
+        return len(self.depots)
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def _ring(self, center, radius):
+        """Cell berisi depot pada jarak Chebyshev tepat `radius` dari center"""
+        row, col = center
+        row_min, row_max, col_min, col_max = self._extent
+        cols = range(max(col - radius, col_min), min(col + radius, col_max) + 1)
+        rows = range(max(row - radius + 1, row_min), min(row + radius - 1, row_max) + 1)
+
+        cells = [(row - radius, c) for c in cols]
+        if radius:
+            cells += [(row + radius, c) for c in cols]
+            cells += [(r, col - radius) for r in rows] + [(r, col + radius) for r in rows]
+        return [self._cells[cell] for cell in cells if cell in self._cells]
+
+    def nearest(self, lat, lon, k=1, max_distance_km=None):
+        """k depot terdekat: list (index, distance_km) terurut"""
+        if not self.depots:
+            return []
+        k = min(k, len(self.depots))
+
+        if len(self.depots) <= BRUTE_FORCE_LIMIT or not self._in_extent(lat, lon):
+            ids = np.arange(len(self.depots))
+            best = _haversine(lat, lon, self.lats, self.lons)
+            found_ids = [ids]
+        else:
+            found_ids, best = self._grid_search(lat, lon, k, max_distance_km)
+
+        if not found_ids:
+            return []
+        ids = np.concatenate(found_ids)
+        order = np.argsort(best, kind='stable')[:k]
+        result = [(int(ids[i]), float(best[i])) for i in order]
+        if max_distance_km is not None:
+            result = [(i, distance) for i, distance in result if distance <= max_distance_km]
+        return result
+
+    def _in_extent(self, lat, lon):
+        """Query di luar area depot dihitung brute force (lower bound ring tidak akurat)"""
+        row, col = self._cell(lat, lon)
+        row_min, row_max, col_min, col_max = self._extent
+        return row_min <= row <= row_max and col_min <= col <= col_max
+
+    def _grid_search(self, lat, lon, k, max_distance_km):
+        """Ring search; return (list array id, array jarak) yang pasti memuat k terdekat"""
+        center = self._cell(lat, lon)
+        row_min, row_max, col_min, col_max = self._extent
+        last = max(abs(center[0] - row_min), abs(center[0] - row_max),
+                   abs(center[1] - col_min), abs(center[1] - col_max))
+
+        found_ids, found_distances = [], []
+        best = np.empty(0)
+        for radius in range(last + 1):
+            ids = self._ring(center, radius)
+            if ids:
+                ids = np.concatenate(ids)
+                found_ids.append(ids)
+                found_distances.append(_haversine(lat, lon, self.lats[ids], self.lons[ids]))
+                best = np.concatenate(found_distances)
+
+            # Depot di luar ring ini minimal berjarak radius cell dari titik query
+            bound = radius * self._cell_km
+            if max_distance_km is not None and bound > max_distance_km:
+                break
+            if best.size >= k and np.partition(best, k - 1)[k - 1] <= bound:
+                break
+        return found_ids, best
+
+    def covering(self, lat, lon):
+        """Depot yang area jangkauannya mencakup titik: list (index, distance_km) terurut jarak"""
+        candidates = self._coverage_cells.get(self._cell(lat, lon))
+        if not candidates:
+            return []
+
+        ids = np.fromiter(candidates, dtype=np.intp)
+        distances = _haversine(lat, lon, self.lats[ids], self.lons[ids])
+        result = []
+        for i, distance in zip(ids.tolist(), distances.tolist()):
+            depot = self.depots[i]
+            radius = depot.get('coverage_radius_km')
+            if (radius and distance <= radius) or (
+                    i in self._polygons and point_in_polygon(lat, lon, self._polygons[i])):
+                result.append((i, distance))
+        result.sort(key=lambda item: item[1])
+        return result
+
+
+class DepotRegistry:
+    """DepotIndex per process, di-build ulang saat data depot berubah"""
+
+    FIELDS = ('id', 'code', 'name', 'address', 'latitude', 'longitude',
+              'coverage_polygon', 'coverage_radius_km')
+
+    def __init__(self):
+        self._version = None
+        self._index = None
+        self._lock = threading.Lock()
+
+    def _load(self, version):
+        from ..models import Depot
+
+        self._index = DepotIndex(Depot.objects.filter(is_active=True).values(*self.FIELDS))
+        self._version = version
+
+    def index(self):
+        version = depots_version.current()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._load(version)
+        return self._index
+
+    def invalidate(self):
+        """Rebuild di semua worker setelah transaction commit."""
+        transaction.on_commit(self._bump)
+
+    def _bump(self):
+        depots_version.bump()
+        self._version = None
+
+
+depot_registry = DepotRegistry()
+
+
+def format_depot(index, i, distance_km):
+    """Representasi depot untuk API response"""
+    depot = index.depots[i]
+    return {
+        'id': depot['id'],
+        'code': depot['code'],
+        'name': depot['name'],
+        'address': depot['address'],
+        'latitude': depot['latitude'],
+        'longitude': depot['longitude'],
+        'distance_km': round(distance_km, 3),
+    }
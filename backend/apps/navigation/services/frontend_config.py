@@ -0,0 +1,274 @@
+# apps/navigation/services/frontend_config.py
+"""
+Payload frontend config (ConfigAPIView) yang dirakit dari fragment per
+resource:
+- navigation per location & audience (config_fragment_nav_<location>_<audience>)
+- public settings (config_fragment_settings)
+- logo utama (config_fragment_logo)
+
+Saat cache miss, semua fragment + version config (config_version) dibaca
+dengan satu get_many. Fragment yang kosong di-build concurrent di thread pool (query
+independen, masing-masing koneksi DB sendiri), lalu semua hasilnya
+ditulis bersama entry config dalam satu set_many (lihat BuildResult).
+Fragment di-invalidate oleh signals lewat keys_for_*.
+
+Config lengkap normalnya sudah di-publish oleh services/config_publisher.py
+saat data berubah; build di sini hanya fallback jika entry hilang.
+`partial_config` merakit response parsial (?include=...&fields=...)
+langsung dari fragment, hanya untuk section yang diminta.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from ..caching import (
+    CONFIG_SETTINGS_FRAGMENT_KEY,
+    CONFIG_LOGO_FRAGMENT_KEY,
+    CONFIG_VERSION_KEY,
+    config_nav_fragment_key,
+    frontend_config_key,
+    is_cacheable_location,
+    get_or_build,
+    put_many,
+    navigation_version,
+    BuildResult,
+)
+from ..renderers import prerender
+from .settings_registry import settings_registry
+from .menu_tree import ANONYMOUS
+
+CACHE_TIMEOUT = getattr(settings, 'CACHE_TIMEOUT', {})
+
+CONFIG_FANOUT = {
+    'max_workers': 4,  # Thread per process untuk query fragment
+}
+CONFIG_FANOUT.update(getattr(settings, 'CONFIG_FANOUT', {}))
+
+_executor = ThreadPoolExecutor(max_workers=CONFIG_FANOUT['max_workers'],
+                               thread_name_prefix='config-fanout')
+
+
+# ============ FRAGMENT BUILDERS ============
+
+def build_navigation(location, audience=ANONYMOUS):
+    from ..models import NavigationMenu
+    from ..serializers import NavigationMenuSerializer
+
+    menu = NavigationMenu.objects.filter(location=location, is_active=True).first()
+    if not menu:
+        return {'items': []}
+    return dict(NavigationMenuSerializer(menu, context={'audience': audience}).data)
+
+
+def build_settings():
+    return dict(settings_registry.public(fresh=True))
+
+
+def build_logo():
+    """
+    {} jika tidak ada logo (get_many django-redis membuang value None).
+    Tanpa request: URL file absolut dari settings.BACKEND_URL, jadi sama
+    untuk semua request yang berbagi fragment.
+    """
+    from ..models import MediaFile
+    from ..serializers import MediaFileSerializer
+
+    logo = MediaFile.objects.filter(file_type='logo').first()
+    return dict(MediaFileSerializer(logo).data) if logo else {}
+
+
+def _in_thread(func, *args):
+    """Thread pool tidak melewati request_finished, jadi koneksi DB dirawat manual"""
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+def fetch_fragments(builders, also=(), refresh=False):
+    """
+    builders: {cache key: (func, args)}; also: key lain yang ikut dibaca.
+
+    Satu get_many untuk semua key; fragment yang miss di-build concurrent
+    (satu di thread caller). refresh=True build semua fragment tanpa
+    membaca cache. Return (semua value, value yang baru di-build).
+    """
+    if refresh:
+        found = cache.get_many(list(also)) if also else {}
+    else:
+        found = cache.get_many([*builders, *also])
+    missing = [key for key in builders if key not in found]
+
+    built = {}
+    if missing:
+        *pooled, inline = missing
+        futures = {}
+        for key in pooled:
+            func, args = builders[key]
+            futures[key] = _executor.submit(_in_thread, func, *args)
+        func, args = builders[inline]
+        built[inline] = func(*args)
+        for key, future in futures.items():
+            built[key] = future.result()
+
+    return {**found, **built}, built
+
+
+# ============ CONFIG PAYLOAD ============
+
+def config_fragment_builders(location, audience=ANONYMOUS):
+    """Fragment yang membentuk config untuk location (nav hanya jika bisa di-invalidate)"""
+    builders = {
+        CONFIG_SETTINGS_FRAGMENT_KEY: (build_settings, ()),
+        CONFIG_LOGO_FRAGMENT_KEY: (build_logo, ()),
+    }
+    if is_cacheable_location(location):
+        builders[config_nav_fragment_key(location, audience)] = (build_navigation, (location, audience))
+    return builders
+
+
+# Config yang dibangun sebelum publish pertama
+UNPUBLISHED = {'version': None, 'published_at': None, 'change_version': None}
+
+
+def config_document(location, fragments, meta, audience=ANONYMOUS):
+    """
+    Dict config lengkap dari fragment + meta version {'version',
+    'published_at', 'change_version'}
+    """
+    if is_cacheable_location(location):
+        navigation = fragments[config_nav_fragment_key(location, audience)]
+    else:
+        navigation = build_navigation(location, audience)
+
+    return {
+        'navigation': navigation,
+        'settings': fragments[CONFIG_SETTINGS_FRAGMENT_KEY],
+        'logo': fragments[CONFIG_LOGO_FRAGMENT_KEY] or None,
+        'version': meta['version'],
+        'published_at': meta['published_at'],
+        # since untuk delta sync (/changes/); None sebelum publish pertama
+        'change_version': meta.get('change_version'),
+    }
+
+
+def build_config(location, audience=ANONYMOUS):
+    """
+    Build payload config (prerender) dari fragment dengan version
+    publish terakhir.
+
+    Return BuildResult: fragment yang baru di-build ikut ditulis bersama
+    entry config oleh get_or_build.
+    """
+    fragments, built = fetch_fragments(config_fragment_builders(location, audience), also=[CONFIG_VERSION_KEY])
+    meta = fragments.get(CONFIG_VERSION_KEY) or UNPUBLISHED
+    return BuildResult(prerender(config_document(location, fragments, meta, audience)), built)
+
+
+def config_payload(location, audience=ANONYMOUS):
+    """Payload config untuk ConfigAPIView (location tidak valid tidak di-cache)"""
+    timeout = CACHE_TIMEOUT.get('config', 300)
+    if not is_cacheable_location(location):
+        # Fragment tidak ditulis jika invalidation commit selama build
+        version = navigation_version.current()
+        result = build_config(location, audience)
+        if result.extra:
+            put_many({}, timeout, extra=result.extra, version=version)
+        return result.value
+    return get_or_build(frontend_config_key(location, audience),
+                        lambda: build_config(location, audience), timeout)
+
+
+# ============ PARTIAL CONFIG ============
+
+CONFIG_SECTIONS = ('navigation', 'settings', 'logo')
+
+
+def parse_selectors(include=None, fields=None):
+    """
+    Parse query ?include=navigation,settings.branding&fields=id,title,url.
+
+    Return (sections, setting_categories, item_fields):
+    - sections: set section top-level yang diminta
+    - setting_categories: None (semua public settings) atau set category
+    - item_fields: None (semua field) atau tuple field menu item
+    Raise ValueError jika section tidak dikenal.
+    """
+    sections, categories = set(), set()
+    whole_settings = False
+    for part in (include or ','.join(CONFIG_SECTIONS)).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        section, _, category = part.partition('.')
+        if section not in CONFIG_SECTIONS or (category and section != 'settings'):
+            raise ValueError(f"Section tidak dikenal: '{part}'")
+        sections.add(section)
+        if section == 'settings':
+            if category:
+                categories.add(category)
+            else:
+                whole_settings = True
+    if not sections:
+        raise ValueError('Parameter include kosong')
+
+    item_fields = tuple(dict.fromkeys(f.strip() for f in fields.split(',') if f.strip())) if fields else None
+    return sections, (None if whole_settings else categories), item_fields or None
+
+
+def select_item_fields(items, fields):
+    """Filter field setiap menu item; children tetap disertakan supaya struktur tree terjaga"""
+    result = []
+    for item in items:
+        selected = {field: item[field] for field in fields if field in item}
+        if item.get('children'):
+            selected['children'] = select_item_fields(item['children'], fields)
+        result.append(selected)
+    return result
+
+
+def partial_config(location, sections, setting_categories=None, item_fields=None, audience=ANONYMOUS):
+    """
+    Payload config parsial; hanya fragment section yang diminta dibaca/di-build.
+
+    Fragment yang miss ditulis dengan satu set_many (dilewati jika
+    invalidation commit selama build). Settings per category diambil dari
+    settings_registry (in-process) tanpa round trip cache.
+    """
+    builders = {}
+    cacheable = is_cacheable_location(location)
+    if 'navigation' in sections and cacheable:
+        builders[config_nav_fragment_key(location, audience)] = (build_navigation, (location, audience))
+    if 'settings' in sections and setting_categories is None:
+        builders[CONFIG_SETTINGS_FRAGMENT_KEY] = (build_settings, ())
+    if 'logo' in sections:
+        builders[CONFIG_LOGO_FRAGMENT_KEY] = (build_logo, ())
+
+    version = navigation_version.current()
+    fragments, built = fetch_fragments(builders) if builders else ({}, {})
+    if built:
+        put_many({}, CACHE_TIMEOUT.get('config', 300), extra=built, version=version)
+
+    result = {}
+    if 'navigation' in sections:
+        if cacheable:
+            navigation = fragments[config_nav_fragment_key(location, audience)]
+        else:
+            navigation = build_navigation(location, audience)
+        if item_fields:
+            navigation = {**navigation, 'items': select_item_fields(navigation.get('items', []), item_fields)}
+        result['navigation'] = navigation
+    if 'settings' in sections:
+        if setting_categories is None:
+            result['settings'] = fragments[CONFIG_SETTINGS_FRAGMENT_KEY]
+        else:
+            result['settings'] = {}
+            for category in sorted(setting_categories):
+                result['settings'].update(settings_registry.category(category))
+    if 'logo' in sections:
+        result['logo'] = fragments[CONFIG_LOGO_FRAGMENT_KEY] or None
+
+    return prerender(result)
@@ -1,11 +1,94 @@
 # apps/navigation/services/geo_services.py
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from django.conf import settings
 from geopy.distance import geodesic
 import logging
 
+from .circuit_breaker import get_breaker, CircuitOpenError
+
 logger = logging.getLogger(__name__)
 
+# Breaker per upstream; saat open, request langsung memakai fallback
+tomtom_breaker = get_breaker('tomtom')
+emsifa_breaker = get_breaker('emsifa')
+
+# Estimasi route garis lurus saat TOMTOM tidak tersedia
+ROUTE_DETOUR_FACTOR = 1.3   # Jarak jalan ~1.3x jarak garis lurus
+ROUTE_FALLBACK_SPEED_KMH = 40
+
+def build_session(retries=0):
+    """
+    Session dengan connection pooling (keep-alive). Default tanpa retry:
+    request dari worker dibatasi satu timeout, kegagalan ditangani circuit
+    breaker + fallback. Retry hanya untuk job batch (misal import_regions).
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=('GET',),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# Satu session per process, dipakai bersama semua service instance
+http_session = build_session()
+
+def breaker_get(breaker, url, **kwargs):
+    """GET lewat circuit breaker; HTTP error status ikut dihitung sebagai outcome"""
+    def fetch():
+        response = http_session.get(url, **kwargs)
+        response.raise_for_status()
+        return response
+    return breaker.call(fetch)
+
+def parse_geocode(data):
+    """Ambil hasil pertama dari response TOMTOM geocode"""
+    if data.get('results'):
+        result = data['results'][0]
+        return {
+            'address': result['address']['freeformAddress'],
+            'latitude': result['position']['lat'],
+            'longitude': result['position']['lon'],
+            'score': result['score']
+        }
+    return None
+
+def parse_route(data):
+    """Ambil summary route pertama dari response TOMTOM routing"""
+    if data.get('routes'):
+        route = data['routes'][0]
+        return {
+            'distance': route['summary']['lengthInMeters'],
+            'duration': route['summary']['travelTimeInSeconds'],
+            'traffic_delay': route['summary']['trafficDelayInSeconds']
+        }
+    return None
+
+def estimate_route(origin, destination):
+    """
+    Estimasi route dari jarak garis lurus (fallback saat TOMTOM gagal/open).
+    Format sama dengan parse_route, ditambah 'estimated': True.
+    """
+    try:
+        lat1, lon1 = (float(part) for part in str(origin).split(','))
+        lat2, lon2 = (float(part) for part in str(destination).split(','))
+    except ValueError:
+        return None
+    distance_km = GeoUtils.calculate_distance(lat1, lon1, lat2, lon2) * ROUTE_DETOUR_FACTOR
+    return {
+        'distance': round(distance_km * 1000),
+        'duration': round(distance_km / ROUTE_FALLBACK_SPEED_KMH * 3600),
+        'traffic_delay': 0,
+        'estimated': True
+    }
+
 class TomTomService:
     """Service untuk TOMTOM Geocoding & Routing API"""
     
@@ -14,12 +97,34 @@ class TomTomService:
         self.base_url = settings.TOMTOM_API_BASE_URL
         self.version = settings.TOMTOM_VERSION_NUMBER
         
-    def geocode(self, address):
-        """Convert address to coordinates"""
+    def geocode(self, address, use_cache=True):
+        """Convert address to coordinates (cached by normalized address)"""
+        from .geocode_cache import geocode_cache, MISS
+        
+        if use_cache:
+            cached = geocode_cache.get(address, MISS)
+            if cached is not MISS:
+                return cached
+        
         if not self.api_key:
             logger.warning("TOMTOM_API_KEY tidak di-set")
             return None
-            
+        
+        try:
+            result = tomtom_breaker.call(self._fetch_geocode, address)
+        except CircuitOpenError:
+            return geocode_cache_last_known(address)
+        except Exception as e:
+            # Error jaringan/API tidak di-cache; pakai hasil terakhir yang pernah diketahui
+            logger.error(f"TOMTOM Geocoding error: {e}")
+            return geocode_cache_last_known(address)
+        
+        if use_cache:
+            geocode_cache.set(address, result)
+        return result
+    
+    def _fetch_geocode(self, address):
+        """Request geocode ke TOMTOM; raise jika request gagal"""
         url = f"{self.base_url}/search/{self.version}/geocode/{address}.json"
         params = {
             'key': self.api_key,
@@ -27,26 +132,17 @@ class TomTomService:
             'limit': 1
         }
         
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get('results'):
-                result = data['results'][0]
-                return {
-                    'address': result['address']['freeformAddress'],
-                    'latitude': result['position']['lat'],
-                    'longitude': result['position']['lon'],
-                    'score': result['score']
-                }
-        except Exception as e:
-            logger.error(f"TOMTOM Geocoding error: {e}")
-            
-        return None
+        response = http_session.get(url, params=params, timeout=10)
+        response.raise_for_status()
+        return parse_geocode(response.json())
     
-    def calculate_route(self, origin, destination, travel_mode='car'):
-        """Calculate route between two points"""
+    def calculate_route(self, origin, destination, travel_mode='car', fallback=True):
+        """
+        Calculate route between two points.
+        
+        Jika TOMTOM gagal atau breaker open dan fallback=True, return
+        estimasi garis lurus (estimate_route) dengan 'estimated': True.
+        """
         if not self.api_key:
             return None
             
@@ -59,68 +155,102 @@ class TomTomService:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get('routes'):
-                route = data['routes'][0]
-                return {
-                    'distance': route['summary']['lengthInMeters'],
-                    'duration': route['summary']['travelTimeInSeconds'],
-                    'traffic_delay': route['summary']['trafficDelayInSeconds']
-                }
+            response = breaker_get(tomtom_breaker, url, params=params, timeout=10)
+            return parse_route(response.json())
+        except CircuitOpenError:
+            pass
         except Exception as e:
             logger.error(f"TOMTOM Routing error: {e}")
             
-        return None
+        return estimate_route(origin, destination) if fallback else None
+    
+    def route_matrix(self, origins, destinations=None, travel_mode='car', when=None):
+        """Route matrix origins x destinations (cached, concurrent); lihat route_matrix.py"""
+        from .route_matrix import route_matrix
+        return route_matrix(origins, destinations, travel_mode=travel_mode, when=when)
+    
+    def geocode_many(self, addresses, max_concurrency=10):
+        """Geocode banyak address secara concurrent (urutan hasil = urutan input)"""
+        from .tomtom_async import geocode_batch
+        return geocode_batch(addresses, max_concurrency=max_concurrency)
 
 class EmsifaService:
-    """Service untuk EMSIFA Indonesia Regions API"""
+    """
+    Service untuk EMSIFA Indonesia Regions API.
     
-    def __init__(self):
+    Jika dataset lokal tersedia (manage.py import_regions), lookup dilayani
+    dari index in-memory tanpa HTTP request.
+    """
+    
+    def __init__(self, use_local=True):
         self.base_url = settings.EMSIFA_API_BASE_URL
+        self.local = None
+        if use_local:
+            from .regions import region_index, LocalRegionService
+            if region_index.available():
+                self.local = LocalRegionService(region_index)
         
     def get_provinces(self):
         """Get semua provinsi Indonesia"""
+        if self.local:
+            return self.local.get_provinces()
         try:
-            response = requests.get(f"{self.base_url}/provinces.json", timeout=10)
-            response.raise_for_status()
+            response = breaker_get(emsifa_breaker, f"{self.base_url}/provinces.json", timeout=10)
             return response.json()
+        except CircuitOpenError:
+            return []
         except Exception as e:
             logger.error(f"EMSIFA Provinces error: {e}")
             return []
     
     def get_regencies(self, province_id):
         """Get kabupaten/kota berdasarkan provinsi"""
+        if self.local:
+            return self.local.get_regencies(province_id)
         try:
-            response = requests.get(f"{self.base_url}/regencies/{province_id}.json", timeout=10)
-            response.raise_for_status()
+            response = breaker_get(emsifa_breaker, f"{self.base_url}/regencies/{province_id}.json", timeout=10)
             return response.json()
+        except CircuitOpenError:
+            return []
         except Exception as e:
             logger.error(f"EMSIFA Regencies error: {e}")
             return []
     
     def get_districts(self, regency_id):
         """Get kecamatan berdasarkan kabupaten"""
+        if self.local:
+            return self.local.get_districts(regency_id)
         try:
-            response = requests.get(f"{self.base_url}/districts/{regency_id}.json", timeout=10)
-            response.raise_for_status()
+            response = breaker_get(emsifa_breaker, f"{self.base_url}/districts/{regency_id}.json", timeout=10)
             return response.json()
+        except CircuitOpenError:
+            return []
         except Exception as e:
             logger.error(f"EMSIFA Districts error: {e}")
             return []
     
     def get_villages(self, district_id):
         """Get kelurahan/desa berdasarkan kecamatan"""
+        if self.local:
+            return self.local.get_villages(district_id)
         try:
-            response = requests.get(f"{self.base_url}/villages/{district_id}.json", timeout=10)
-            response.raise_for_status()
+            response = breaker_get(emsifa_breaker, f"{self.base_url}/villages/{district_id}.json", timeout=10)
             return response.json()
+        except CircuitOpenError:
+            return []
         except Exception as e:
             logger.error(f"EMSIFA Villages error: {e}")
             return []
 
+def geocode_cache_last_known(address):
+    """Fallback geocode: hasil terakhir yang pernah tersimpan (tanpa melihat umur)"""
+    from .geocode_cache import geocode_cache
+    try:
+        return geocode_cache.last_known(address)
+    except Exception as e:
+        logger.error(f"Geocode fallback error: {e}")
+        return None
+
 class GeoUtils:
     """Utility functions untuk geospatial calculations"""
     
@@ -131,20 +261,23 @@ class GeoUtils:
         coord2 = (lat2, lon2)
         return geodesic(coord1, coord2).kilometers
     
+    @staticmethod
+    def distance_matrix(origins, destinations, method='geodesic'):
+        """
+        Distance matrix (km) antara list koordinat (lat, lon), vectorized.
+        method: 'geodesic' (WGS-84, sama dengan calculate_distance) atau 'haversine'
+        """
+        from .geo_vector import distance_matrix
+        return distance_matrix(origins, destinations, method=method)
+    
     @staticmethod
     def estimate_shipping_cost(distance_km, weight_kg, service_type='regular'):
-        """Estimate biaya pengiriman berdasarkan jarak dan berat"""
-        # Base rates (bisa diambil dari database nanti)
-        base_rates = {
-            'regular': 5000,  # Rp 5,000 per km
-            'express': 8000,  # Rp 8,000 per km
-            'same_day': 12000, # Rp 12,000 per km
-        }
-        
-        rate = base_rates.get(service_type, 5000)
-        base_cost = distance_km * rate
-        
-        # Tambah berdasarkan berat
-        weight_cost = max(0, (weight_kg - 1)) * 2000  # Rp 2,000 per kg tambahan
-        
-        return base_cost + weight_cost
+        """Estimate biaya pengiriman berdasarkan jarak dan berat (tarif dari ShippingRate)"""
+        from .shipping_quotes import quote_batch
+        return float(quote_batch([distance_km], [weight_kg], [service_type])[0])
+    
+    @staticmethod
+    def estimate_shipping_costs(distances_km, weights_kg, service_types='regular'):
+        """Batch version estimate_shipping_cost; return numpy array (Rupiah)"""
+        from .shipping_quotes import quote_batch
+        return quote_batch(distances_km, weights_kg, service_types)
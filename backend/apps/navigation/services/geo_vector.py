@@ -0,0 +1,170 @@
+# apps/navigation/services/geo_vector.py
+"""
+Distance matrix vectorized (NumPy) untuk banyak koordinat sekaligus.
+
+- haversine_matrix: great-circle (bola, R=6371.0088 km), cepat, error ~0.5%
+- geodesic_matrix: Vincenty inverse di ellipsoid WGS-84 (akurasi mm, sama
+  dengan geopy.geodesic); pasangan yang tidak konvergen (hampir antipodal)
+  dihitung ulang dengan geopy (Karney)
+
+Input berupa array (N, 2) [lat, lon] dalam derajat. Output matrix (N, M)
+dalam km. Perhitungan dipecah per blok baris supaya memory tetap terbatas
+untuk input besar.
+"""
+import numpy as np
+from geopy.distance import geodesic
+
+EARTH_RADIUS_KM = 6371.0088
+
+# WGS-84
+WGS84_A = 6378.137
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+
+# Jumlah maksimum elemen matrix per blok (~8 MB per array float64)
+CHUNK_ELEMENTS = 1_000_000
+
+VINCENTY_TOLERANCE = 1e-12
+VINCENTY_MAX_ITERATIONS = 200
+
+
+def as_coordinates(points):
+    """Konversi list (lat, lon) / array ke array float64 shape (N, 2)"""
+    array = np.asarray(points, dtype=np.float64)
+    if array.size == 0:
+        return array.reshape(0, 2)
+    if array.ndim != 2 or array.shape[1] != 2:
+        raise ValueError('Koordinat harus berbentuk (N, 2) [lat, lon]')
+    return array
+
+
+def _chunks(rows, columns, chunk_elements):
+    """Yield slice baris sehingga rows_per_chunk * columns <= chunk_elements"""
+    step = max(1, chunk_elements // max(columns, 1))
+    for start in range(0, rows, step):
+        yield slice(start, min(start + step, rows))
+
+
+def _haversine_block(lat1, lon1, lat2, lon2):
+    """Semua argumen dalam radian; lat1/lon1 shape (n, 1), lat2/lon2 shape (1, m)"""
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _vincenty_block(lat1, lon1, lat2, lon2):
+    """
+    Vincenty inverse formula, vectorized. Argumen dalam radian (broadcast).
+
+    Returns (distance_km, converged) — pasangan dengan converged=False
+    harus dihitung ulang dengan metode lain.
+    """
+    f = WGS84_F
+    u1 = np.arctan((1 - f) * np.tan(lat1))
+    u2 = np.arctan((1 - f) * np.tan(lat2))
+    sin_u1, cos_u1 = np.sin(u1), np.cos(u1)
+    sin_u2, cos_u2 = np.sin(u2), np.cos(u2)
+
+    big_l = np.broadcast_to(lon2 - lon1, np.broadcast_shapes(u1.shape, u2.shape))
+    lam = big_l.copy()
+    active = np.ones(lam.shape, dtype=bool)
+
+    for _ in range(VINCENTY_MAX_ITERATIONS):
+        sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+        sin_sigma = np.hypot(cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)
+        cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+        sigma = np.arctan2(sin_sigma, cos_sigma)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sin_alpha = np.where(sin_sigma == 0, 0.0, cos_u1 * cos_u2 * sin_lam / sin_sigma)
+            cos2_alpha = 1 - sin_alpha ** 2
+            # Garis ekuator: cos2_alpha = 0
+            cos_2sigma_m = np.where(cos2_alpha == 0, 0.0, cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha)
+
+        c = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+        lam_next = big_l + (1 - c) * f * sin_alpha * (
+            sigma + c * sin_sigma * (cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2))
+        )
+        active = np.abs(lam_next - lam) > VINCENTY_TOLERANCE
+        lam = lam_next
+        if not active.any():
+            break
+
+    u_sq = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+    delta_sigma = big_b * sin_sigma * (
+        cos_2sigma_m + big_b / 4 * (
+            cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+            - big_b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sigma_m ** 2)
+        )
+    )
+    distance = WGS84_B * big_a * (sigma - delta_sigma)
+    converged = ~active & np.isfinite(distance)
+    return np.where(converged, distance, np.nan), converged
+
+
+def haversine_matrix(origins, destinations, chunk_elements=CHUNK_ELEMENTS):
+    """Great-circle distance matrix (km), shape (len(origins), len(destinations))"""
+    origins = np.radians(as_coordinates(origins))
+    destinations = np.radians(as_coordinates(destinations))
+    result = np.empty((len(origins), len(destinations)), dtype=np.float64)
+
+    lat2, lon2 = destinations[:, 0][None, :], destinations[:, 1][None, :]
+    for rows in _chunks(len(origins), len(destinations), chunk_elements):
+        block = origins[rows]
+        result[rows] = _haversine_block(block[:, 0][:, None], block[:, 1][:, None], lat2, lon2)
+    return result
+
+
+def geodesic_matrix(origins, destinations, chunk_elements=CHUNK_ELEMENTS):
+    """
+    Ellipsoidal (WGS-84) distance matrix (km), hasil setara geopy.geodesic.
+
+    Vincenty dihitung vectorized per blok; pasangan yang tidak konvergen
+    (hampir antipodal, jarang untuk data Indonesia) di-fallback ke geopy.
+    """
+    origins_deg = as_coordinates(origins)
+    destinations_deg = as_coordinates(destinations)
+    origins = np.radians(origins_deg)
+    destinations = np.radians(destinations_deg)
+    result = np.empty((len(origins), len(destinations)), dtype=np.float64)
+
+    lat2, lon2 = destinations[:, 0][None, :], destinations[:, 1][None, :]
+    for rows in _chunks(len(origins), len(destinations), chunk_elements):
+        block = origins[rows]
+        distance, converged = _vincenty_block(block[:, 0][:, None], block[:, 1][:, None], lat2, lon2)
+        for i, j in zip(*np.nonzero(~converged)):
+            distance[i, j] = geodesic(origins_deg[rows][i], destinations_deg[j]).kilometers
+        result[rows] = distance
+    return result
+
+
+def distance_matrix(origins, destinations, method='geodesic', chunk_elements=CHUNK_ELEMENTS):
+    """Distance matrix (km); method 'geodesic' (akurat) atau 'haversine' (cepat)"""
+    if method == 'geodesic':
+        return geodesic_matrix(origins, destinations, chunk_elements)
+    if method == 'haversine':
+        return haversine_matrix(origins, destinations, chunk_elements)
+    raise ValueError(f'Method tidak dikenal: {method}')
+
+
+def pairwise_distances(origins, destinations, method='geodesic'):
+    """Jarak elemen-per-elemen origins[i] -> destinations[i] (km), shape (N,)"""
+    origins = as_coordinates(origins)
+    destinations = as_coordinates(destinations)
+    if origins.shape != destinations.shape:
+        raise ValueError('origins dan destinations harus sama panjang')
+
+    lat1, lon1 = np.radians(origins[:, 0]), np.radians(origins[:, 1])
+    lat2, lon2 = np.radians(destinations[:, 0]), np.radians(destinations[:, 1])
+    if method == 'haversine':
+        return _haversine_block(lat1, lon1, lat2, lon2)
+    if method != 'geodesic':
+        raise ValueError(f'Method tidak dikenal: {method}')
+
+    distance, converged = _vincenty_block(lat1, lon1, lat2, lon2)
+    for i in np.flatnonzero(~converged):
+        distance[i] = geodesic(origins[i], destinations[i]).kilometers
+    return distance
@@ -0,0 +1,202 @@
+# apps/navigation/services/geocode_cache.py
+"""
+Cache hasil geocoding dengan key dari address yang dinormalisasi.
+
+Tier:
+1. Local LRU per process (repeat lookup tidak keluar process)
+2. Django cache / Redis (CACHE_TIMEOUT['geo_data'])
+3. Tabel GeocodeResult (long-term)
+
+Hasil negatif (address tidak ditemukan) juga di-cache, dengan TTL lebih
+pendek (CACHE_TIMEOUT['geo_negative']). Error jaringan tidak di-cache.
+Negatif tidak menimpa row yang sudah pernah ditemukan: row itu tetap jadi
+fallback last_known, negatifnya hanya disimpan di tier 1 dan 2.
+"""
+import hashlib
+import re
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from ..caching import LocalLRU
+
+CACHE_TIMEOUT = getattr(settings, 'CACHE_TIMEOUT', {})
+
+# Singkatan umum di alamat Indonesia -> bentuk lengkap
+ABBREVIATIONS = {
+    'jl': 'jalan',
+    'jln': 'jalan',
+    'gg': 'gang',
+    'kab': 'kabupaten',
+    'kec': 'kecamatan',
+    'kel': 'kelurahan',
+    'ds': 'desa',
+    'prov': 'provinsi',
+    'prop': 'provinsi',
+    'no': 'nomor',
+    'komp': 'komplek',
+    'perum': 'perumahan',
+    'kp': 'kampung',
+    'jkt': 'jakarta',
+    'jak': 'jakarta',
+    'jabar': 'jawa barat',
+    'jateng': 'jawa tengah',
+    'jatim': 'jawa timur',
+}
+
+_SEPARATORS = re.compile(r'[.,;:/\\()\-]+')
+_WHITESPACE = re.compile(r'\s+')
+
+# Sentinel untuk cache miss (None berarti negative hit)
+MISS = object()
+
+
+def normalize_address(address):
+    """
+    Normalisasi address untuk cache key.
+
+    'Jl. Sudirman  No.1, Kab. Bogor' -> 'jalan sudirman nomor 1 kabupaten bogor'
+    """
+    text = _SEPARATORS.sub(' ', address.casefold())
+    tokens = []
+    for token in _WHITESPACE.split(text):
+        if not token:
+            continue
+        # 'no1' / 'no12a' -> 'nomor 1' / 'nomor 12a'
+        match = re.fullmatch(r'(no|jl|gg)(\d\w*)', token)
+        if match:
+            tokens.extend([ABBREVIATIONS[match.group(1)], match.group(2)])
+            continue
+        tokens.append(ABBREVIATIONS.get(token, token))
+    return ' '.join(tokens)
+
+
+def address_key(address):
+    return hashlib.sha256(normalize_address(address).encode('utf-8')).hexdigest()
+
+
+def _cache_key(key):
+    return f'geo_geocode_{key}'
+
+
+class GeocodeCache:
+    """Three-tier cache untuk hasil geocoding"""
+
+    def __init__(self, max_entries=4096, max_bytes=4 * 1024 * 1024):
+        self.local = LocalLRU(max_entries, max_bytes)
+        self.positive_ttl = CACHE_TIMEOUT.get('geo_data', 86400)
+        self.negative_ttl = CACHE_TIMEOUT.get('geo_negative', 3600)
+
+    def _remember_local(self, key, result):
+        ttl = self.positive_ttl if result else self.negative_ttl
+        self.local.set(key, (time.monotonic() + ttl, result), size=256)
+
+    def _from_local(self, key):
+        item = self.local.get(key)
+        if item is None or item[0] < time.monotonic():
+            return MISS
+        return item[1]
+
+    def get_many(self, addresses):
+        """
+        Lookup banyak address sekaligus.
+
+        Returns dict {address: result} hanya untuk address yang ada di cache
+        (result bisa None untuk negative hit).
+        """
+        from ..models import GeocodeResult
+
+        keys = {address: address_key(address) for address in addresses}
+        found = {}
+
+        # Tier 1: local
+        pending = {}
+        for address, key in keys.items():
+            result = self._from_local(key)
+            if result is MISS:
+                pending.setdefault(key, []).append(address)
+            else:
+                found[address] = result
+        if not pending:
+            return found
+
+        # Tier 2: Redis (satu round trip)
+        cached = cache.get_many([_cache_key(key) for key in pending])
+        for key in list(pending):
+            entry = cached.get(_cache_key(key))
+            if entry is not None:
+                result = entry['result']
+                self._remember_local(key, result)
+                for address in pending.pop(key):
+                    found[address] = result
+        if not pending:
+            return found
+
+        # Tier 3: database (negatif hanya valid selama negative_ttl)
+        negative_cutoff = timezone.now() - timedelta(seconds=self.negative_ttl)
+        refill = {True: {}, False: {}}
+        for row in GeocodeResult.objects.filter(address_key__in=list(pending)):
+            if not row.found and row.updated_at < negative_cutoff:
+                continue
+            result = row.as_result()
+            self._remember_local(row.address_key, result)
+            refill[row.found][_cache_key(row.address_key)] = {'result': result}
+            for address in pending.pop(row.address_key):
+                found[address] = result
+
+        if refill[True]:
+            cache.set_many(refill[True], self.positive_ttl)
+        if refill[False]:
+            cache.set_many(refill[False], self.negative_ttl)
+        return found
+
+    def get(self, address, default=None):
+        """
+        Lookup satu address; return default jika tidak ada di cache.
+
+        Negative hit return None, jadi pakai default=MISS untuk membedakan.
+        """
+        return self.get_many([address]).get(address, default)
+
+    def last_known(self, address):
+        """
+        Hasil positif terakhir untuk address tanpa melihat TTL (fallback saat
+        TOMTOM tidak tersedia). None jika belum pernah berhasil di-geocode.
+        """
+        from ..models import GeocodeResult
+
+        result = self.get(address, MISS)
+        if result is not MISS and result is not None:
+            return result
+        row = GeocodeResult.objects.filter(address_key=address_key(address), found=True).first()
+        return row.as_result() if row else None
+
+    def set(self, address, result):
+        """Simpan hasil geocoding (None = tidak ditemukan) ke semua tier"""
+        from ..models import GeocodeResult
+
+        key = address_key(address)
+        ttl = self.positive_ttl if result else self.negative_ttl
+
+        self._remember_local(key, result)
+        cache.set(_cache_key(key), {'result': result}, ttl)
+
+        if not result and GeocodeResult.objects.filter(address_key=key, found=True).exists():
+            # "Tidak ditemukan" sesekali jangan menghapus hasil positif terakhir
+            return
+
+        defaults = {
+            'normalized_address': normalize_address(address),
+            'found': bool(result),
+            'address': (result or {}).get('address', ''),
+            'latitude': (result or {}).get('latitude'),
+            'longitude': (result or {}).get('longitude'),
+            'score': (result or {}).get('score'),
+        }
+        GeocodeResult.objects.update_or_create(address_key=key, defaults=defaults)
+
+
+geocode_cache = GeocodeCache()
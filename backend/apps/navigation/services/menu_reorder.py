@@ -0,0 +1,115 @@
+# apps/navigation/services/menu_reorder.py
+"""
+Bulk reorder/move MenuItem satu menu (drag-and-drop admin & API).
+
+Layout diterima dalam dua format:
+- nested (hasil drag-and-drop): [{"id": 1, "children": [{"id": 5}, ...]}, ...]
+  urutan dalam list = order_index, nesting = parent
+- flat: [{"id": 5, "parent": 1, "order_index": 0}, ...]
+
+Semua perubahan parent/order_index divalidasi (item & parent harus milik
+menu, id tidak boleh duplikat, tidak boleh ada siklus), lalu diterapkan
+dalam satu transaction dengan bulk_update. Karena bulk_update melewati
+signals, path di-rebuild, change log dicatat dan cache menu di-invalidate
+tepat satu kali.
+"""
+from django.db import transaction
+
+from ..caching import invalidate_menus
+from .config_changes import record_changes
+from .menu_tree import rebuild_paths
+
+
+def flatten_layout(layout):
+    """Nested layout -> list move {'id', 'parent', 'order_index'}"""
+    moves = []
+    stack = [(None, layout)]
+    while stack:
+        parent, nodes = stack.pop()
+        if not isinstance(nodes, list):
+            raise ValueError('children harus berupa list')
+        for index, node in enumerate(nodes):
+            if not isinstance(node, dict) or 'id' not in node:
+                raise ValueError('Setiap node layout harus object dengan id')
+            moves.append({'id': node['id'], 'parent': parent, 'order_index': index})
+            stack.append((node['id'], node.get('children') or []))
+    return moves
+
+
+def _parse_moves(moves):
+    """Validasi bentuk move; return {id: (parent_id, order_index)}"""
+    parsed = {}
+    for move in moves:
+        if not isinstance(move, dict):
+            raise ValueError('Setiap move harus object {id, parent, order_index}')
+        try:
+            item_id = int(move['id'])
+            parent_id = None if move.get('parent') is None else int(move['parent'])
+            order_index = int(move.get('order_index', 0))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f'Move tidak valid: {move}')
+        if item_id in parsed:
+            raise ValueError(f'Item {item_id} muncul lebih dari sekali')
+        parsed[item_id] = (parent_id, order_index)
+    return parsed
+
+
+def _check_cycles(parents):
+    """parents: {id: parent_id} final semua item menu; raise ValueError jika ada siklus"""
+    done = set()
+    for start in parents:
+        path = []
+        on_path = set()
+        node = start
+        while node is not None and node not in done:
+            if node in on_path:
+                raise ValueError(f'Layout membentuk siklus pada item {node}')
+            on_path.add(node)
+            path.append(node)
+            node = parents.get(node)
+        done.update(path)
+
+
+def reorder_menu(menu, layout=None, moves=None):
+    """
+    Terapkan layout/moves ke menu. Return jumlah item yang berubah.
+
+    Item yang tidak disebut tetap di posisinya. Raise ValueError jika
+    input tidak valid (tidak ada perubahan yang disimpan).
+    """
+    from ..models import MenuItem, ConfigChange
+
+    if layout is not None:
+        moves = flatten_layout(layout)
+    parsed = _parse_moves(moves or [])
+    if not parsed:
+        return 0
+
+    with transaction.atomic():
+        items = {item.pk: item for item in
+                 MenuItem.objects.select_for_update().filter(menu=menu)
+                 .only('id', 'menu_id', 'parent_id', 'order_index', 'path', 'depth')}
+
+        unknown = sorted(item_id for item_id, (parent_id, _) in parsed.items()
+                         if item_id not in items or (parent_id is not None and parent_id not in items))
+        if unknown:
+            raise ValueError(f'Item/parent bukan milik menu {menu.pk}: {unknown[:20]}')
+
+        parents = {pk: item.parent_id for pk, item in items.items()}
+        parents.update({item_id: parent_id for item_id, (parent_id, _) in parsed.items()})
+        _check_cycles(parents)
+
+        changed = []
+        for item_id, (parent_id, order_index) in parsed.items():
+            item = items[item_id]
+            if (item.parent_id, item.order_index) != (parent_id, order_index):
+                item.parent_id, item.order_index = parent_id, order_index
+                changed.append(item)
+
+        if changed:
+            MenuItem.objects.bulk_update(changed, ['parent', 'order_index'], batch_size=500)
+            rebuild_paths([menu])
+            record_changes(ConfigChange(resource='menu_item', action='update', object_id=item.pk,
+                                        location=menu.location) for item in changed)
+            invalidate_menus([menu])
+    return len(changed)
@@ -0,0 +1,112 @@
+# apps/navigation/services/menu_tree.py
+"""
+Tree builder untuk MenuItem.
+Load semua active items satu menu dalam 1 query, lalu susun index
+parent -> children di memory supaya serializer tidak query per node.
+
+Tree bisa difilter per audience (anonymous, authenticated, staff) sesuai
+requires_auth/requires_staff; item yang tersembunyi ikut menyembunyikan
+seluruh sub-itemnya.
+"""
+from collections import defaultdict
+
+# ============ AUDIENCE ============
+
+ANONYMOUS, AUTHENTICATED, STAFF = 'anonymous', 'authenticated', 'staff'
+AUDIENCES = (ANONYMOUS, AUTHENTICATED, STAFF)
+
+
+def audience_for(user):
+    """Audience untuk user (None/AnonymousUser -> anonymous)"""
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS
+    return STAFF if user.is_staff else AUTHENTICATED
+
+
+def is_visible(item, audience):
+    """Apakah item boleh tampil untuk audience (None = tanpa filter)"""
+    if audience is None or audience == STAFF:
+        return True
+    if item.requires_staff:
+        return False
+    return audience == AUTHENTICATED or not item.requires_auth
+
+
+class MenuTree:
+    """Index in-memory parent -> children untuk satu NavigationMenu"""
+
+    def __init__(self, items, audience=None):
+        self._children = defaultdict(list)
+        for item in items:
+            # Items sudah diurutkan oleh query, jadi urutan append = urutan tampil
+            if is_visible(item, audience):
+                self._children[item.parent_id].append(item)
+
+    @classmethod
+    def for_menu(cls, menu, audience=None):
+        """Build tree dari semua active items menu (single query)"""
+        items = menu.items.filter(is_active=True).order_by('order_index')
+        return cls(items, audience)
+
+    @classmethod
+    async def afor_menu(cls, menu, audience=None):
+        """Versi async for_menu (async ORM, untuk ASGI views)"""
+        items = menu.items.filter(is_active=True).order_by('order_index')
+        return cls([item async for item in items], audience)
+
+    def roots(self):
+        """Root items (tanpa parent)"""
+        return self._children.get(None, [])
+
+    def children_of(self, item):
+        """Active children untuk item tertentu"""
+        return self._children.get(item.pk, [])
+
+    def has_children(self, item):
+        return bool(self._children.get(item.pk))
+
+    def __len__(self):
+        return sum(len(children) for children in self._children.values())
+
+
+def rebuild_paths(menus=None):
+    """
+    Hitung ulang MenuItem.path/depth dari parent_id (backfill, atau setelah
+    bulk_create/QuerySet.update yang melewati save). Return jumlah row yang
+    diperbarui.
+    """
+    from ..models import MenuItem
+
+    items = MenuItem.objects.only('id', 'parent_id', 'path', 'depth')
+    if menus is not None:
+        items = items.filter(menu__in=menus)
+    items = list(items)
+    loaded = {item.pk for item in items}
+
+    # Parent di luar set (menu lain) dipakai path-nya dari DB
+    outside = {item.parent_id for item in items if item.parent_id and item.parent_id not in loaded}
+    paths = dict(MenuItem.objects.filter(pk__in=outside).values_list('pk', 'path')) if outside else {}
+    paths[None] = ''
+
+    children = defaultdict(list)
+    for item in items:
+        children[item.parent_id].append(item)
+
+    sep = MenuItem.PATH_SEPARATOR
+    changed = []
+    stack = [parent for parent in children if parent is None or parent not in loaded]
+    while stack:
+        parent_id = stack.pop()
+        parent_path = paths[parent_id]
+        for item in children.get(parent_id, []):
+            path = f'{parent_path}{item.pk}{sep}'
+            depth = parent_path.count(sep)
+            if (item.path, item.depth) != (path, depth):
+                item.path, item.depth = path, depth
+                changed.append(item)
+            paths[item.pk] = path
+            stack.append(item.pk)
+
+    # Item dalam siklus parent tidak terjangkau dari root dan dibiarkan
+    MenuItem.objects.bulk_update(changed, ['path', 'depth'], batch_size=500)
+    return len(changed)
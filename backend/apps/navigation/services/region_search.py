@@ -0,0 +1,226 @@
+# apps/navigation/services/region_search.py
+"""
+Typeahead search untuk nama kelurahan/desa dan kecamatan (plus parent
+chain-nya).
+
+Index dibangun sekali dari dataset wilayah lokal (regions.py), berisi
+entry desa dan kecamatan:
+- prefix index: sorted list nama lengkap (prefix kata pertama) dan sorted
+  list awal-kata berikutnya, dicari dengan bisect
+- trigram index: inverted index trigram -> id entry (numpy array),
+  skor dihitung dengan bincount sehingga toleran terhadap salah ketik
+
+Ranking per tier: exact > prefix kata pertama > prefix kata berikutnya >
+kemiripan (trigram + edit distance), ditambah bonus (tidak melewati tier)
+jika token query cocok dengan nama kecamatan/kabupaten/provinsi. Skor sama:
+kecamatan dulu, lalu nama terpendek.
+"""
+import bisect
+import re
+import threading
+
+import numpy as np
+
+from .regions import region_index
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+# Jumlah kandidat trigram yang di-rank ulang dengan bonus parent
+CANDIDATES = 200
+
+# Jumlah kandidat terbaik yang di-rank ulang dengan edit distance
+RERANK = 40
+
+# Skor dasar per tier; fuzzy <= 1.0 dan bonus parent <= 0.5 tidak melewati tier di atasnya
+EXACT_SCORE = 4.0
+FIRST_WORD_SCORE = 3.0
+LATER_WORD_SCORE = 2.0
+PARENT_BONUS = 0.5
+
+VILLAGE, DISTRICT = 'village', 'district'
+
+# Urutan tie-break (kecamatan lebih umum daripada desa dengan nama sama)
+_LEVEL_RANK = {DISTRICT: 0, VILLAGE: 1}
+
+
+def normalize(text):
+    return _NON_ALNUM.sub(' ', text.casefold()).strip()
+
+
+def edit_similarity(a, b):
+    """1 - (Damerau-Levenshtein OSA distance / panjang maksimum)"""
+    if a == b:
+        return 1.0
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            cost = 0 if char_a == char_b else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and char_a == b[j - 2] and a[i - 2] == char_b):
+                value = min(value, previous2[j - 2] + 1)
+            current.append(value)
+        previous2, previous = previous, current
+    return 1.0 - previous[-1] / max(len(a), len(b))
+
+
+def trigrams(text):
+    """Trigram dari tiap kata dengan padding, misal 'bogor' -> ' bo', 'bog', ..."""
+    grams = set()
+    for word in text.split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class RegionSearchIndex:
+    """Prefix + trigram index atas semua desa/kelurahan dan kecamatan"""
+
+    def __init__(self, index=None):
+        self.index = index or region_index
+        self._built = False
+        self._lock = threading.Lock()
+
+    def available(self):
+        return self._built or self.index.available()
+
+    def _ensure_built(self):
+        if self._built:
+            return
+        with self._lock:
+            if not self._built:
+                self._build()
+                self._built = True
+
+    def _chain_text(self, *region_ids):
+        return normalize(' '.join(self.index.name(region_id) or '' for region_id in region_ids))
+
+    def _build(self):
+        # Entry: (region_id, level, name, normalized, district_id, regency_id, province_id, chain_text)
+        entries = []
+        chain_texts = {}
+        for district_id, name, regency_id, province_id in self.index.iter_districts():
+            chain_text = chain_texts[district_id] = self._chain_text(district_id, regency_id, province_id)
+            entries.append((district_id, DISTRICT, name, normalize(name), district_id,
+                            regency_id, province_id, chain_text))
+        for village_id, name, district_id, regency_id, province_id in self.index.iter_villages():
+            chain_text = chain_texts.get(district_id)
+            if chain_text is None:
+                chain_text = chain_texts[district_id] = self._chain_text(district_id, regency_id, province_id)
+            entries.append((village_id, VILLAGE, name, normalize(name), district_id,
+                            regency_id, province_id, chain_text))
+        self._entries = entries
+
+        # Prefix index: nama lengkap (kata pertama) dan awal kata berikutnya
+        names, words = [], []
+        for i, entry in enumerate(entries):
+            tokens = entry[3].split()
+            names.append((entry[3], i))
+            for w in range(1, len(tokens)):
+                words.append((' '.join(tokens[w:]), i))
+        names.sort()
+        words.sort()
+        self._name_keys = [key for key, _ in names]
+        self._name_ids = [i for _, i in names]
+        self._word_keys = [key for key, _ in words]
+        self._word_ids = [i for _, i in words]
+
+        # Trigram inverted index
+        postings = {}
+        sizes = np.zeros(len(entries), dtype=np.int32)
+        for i, entry in enumerate(entries):
+            grams = trigrams(entry[3])
+            sizes[i] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self._sizes = sizes
+
+    @staticmethod
+    def _prefix_matches(keys, ids, query, limit):
+        start = bisect.bisect_left(keys, query)
+        matches = []
+        for pos in range(start, len(keys)):
+            if not keys[pos].startswith(query):
+                break
+            matches.append(ids[pos])
+            if len(matches) >= limit:
+                break
+        return matches
+
+    def _trigram_scores(self, query):
+        """
+        Skor fuzzy untuk kandidat teratas: {entry_id: score}.
+
+        Kandidat dipilih dari jumlah trigram yang sama (threshold dari
+        histogram, lebih murah dari argpartition yang banyak nilai kembar),
+        di-rank dengan Jaccard, lalu top RERANK dihaluskan dengan edit distance.
+        """
+        query_grams = trigrams(query)
+        grams = [self._postings[gram] for gram in query_grams if gram in self._postings]
+        if not grams:
+            return {}
+
+        shared = np.bincount(np.concatenate(grams), minlength=len(self._entries))
+        histogram = np.bincount(shared)
+        # Threshold terkecil (minimal 1 trigram) yang menyisakan <= CANDIDATES kandidat;
+        # jika skor tertinggi pun kembar lebih dari CANDIDATES, ambil semua yang tertinggi
+        at_least = np.cumsum(histogram[::-1])[::-1]
+        fits = at_least[1:] <= CANDIDATES
+        threshold = 1 + int(np.argmax(fits)) if fits.any() else len(histogram) - 1
+        candidates = np.flatnonzero(shared >= threshold)
+
+        jaccard = shared[candidates] / (len(query_grams) + self._sizes[candidates] - shared[candidates])
+        order = np.argsort(-jaccard, kind='stable')
+        scores = dict(zip(candidates[order].tolist(), jaccard[order].tolist()))
+
+        for entry_id in candidates[order[:RERANK]].tolist():
+            name = self._entries[entry_id][3]
+            scores[entry_id] = 0.5 * scores[entry_id] + 0.5 * edit_similarity(query, name)
+        return scores
+
+    def search(self, query, limit=10):
+        """Cari desa/kelurahan dan kecamatan; return list dict terurut berdasarkan score"""
+        query = normalize(query)
+        if len(query) < 2:
+            return []
+        self._ensure_built()
+
+        scores = self._trigram_scores(query) if len(query) >= 3 else {}
+        for entry_id in self._prefix_matches(self._word_keys, self._word_ids, query, CANDIDATES):
+            scores[entry_id] = max(scores.get(entry_id, 0.0), LATER_WORD_SCORE)
+        for entry_id in self._prefix_matches(self._name_keys, self._name_ids, query, CANDIDATES):
+            exact = self._entries[entry_id][3] == query
+            scores[entry_id] = EXACT_SCORE if exact else FIRST_WORD_SCORE
+
+        tokens = [token for token in query.split() if len(token) >= 3]
+        ranked = []
+        for entry_id, score in scores.items():
+            entry = self._entries[entry_id]
+            if tokens:
+                matched = sum(1 for token in tokens if token in entry[7])
+                score += PARENT_BONUS * matched / len(tokens)
+            ranked.append((-score, _LEVEL_RANK[entry[1]], len(entry[3]), entry[3], entry_id))
+        ranked.sort()
+
+        return [self._format(item[-1], -item[0]) for item in ranked[:limit]]
+
+    def _format(self, entry_id, score):
+        region_id, level, name, _, district_id, regency_id, province_id, _ = self._entries[entry_id]
+        return {
+            'id': region_id,
+            'type': level,
+            'name': name,
+            'district_id': district_id,
+            'district': self.index.name(district_id),
+            'regency_id': regency_id,
+            'regency': self.index.name(regency_id),
+            'province_id': province_id,
+            'province': self.index.name(province_id),
+            'score': round(score, 4),
+        }
+
+
+region_search = RegionSearchIndex()
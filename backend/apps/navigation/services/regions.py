@@ -0,0 +1,161 @@
+# apps/navigation/services/regions.py
+"""
+Dataset wilayah Indonesia lokal (provinsi -> kabupaten/kota -> kecamatan
+-> kelurahan/desa) dengan index in-memory.
+
+File dataset dibuat oleh management command `import_regions` (gzip JSON,
+default settings.REGIONS_DATA_FILE). Data di-load sekali per process dan
+di-index berdasarkan parent id, jadi lookup tidak perlu HTTP request.
+"""
+import gzip
+import json
+import threading
+
+from django.conf import settings
+
+DATASET_FORMAT = 1
+
+# Level -> (nama field parent, level parent)
+LEVELS = {
+    'provinces': (None, None),
+    'regencies': ('province_id', 'provinces'),
+    'districts': ('regency_id', 'regencies'),
+    'villages': ('district_id', 'districts'),
+}
+
+
+def dataset_path():
+    return getattr(settings, 'REGIONS_DATA_FILE', settings.BASE_DIR / 'data' / 'regions.json.gz')
+
+
+def write_dataset(path, provinces, regencies, districts, villages):
+    """
+    Tulis dataset compact: tiap row berupa list [id, (parent_id,) name].
+    Ditulis ke file sementara lalu di-rename supaya atomic.
+    """
+    data = {
+        'format': DATASET_FORMAT,
+        'provinces': [[row['id'], row['name']] for row in provinces],
+        'regencies': [[row['id'], row['province_id'], row['name']] for row in regencies],
+        'districts': [[row['id'], row['regency_id'], row['name']] for row in districts],
+        'villages': [[row['id'], row['district_id'], row['name']] for row in villages],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    tmp_path.replace(path)
+
+
+class RegionIndex:
+    """Index in-memory untuk dataset wilayah"""
+
+    def __init__(self, path=None):
+        self.path = path or dataset_path()
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._names = {}       # id -> name (semua level)
+        self._parents = {}     # id -> parent_id
+        self._children = {}    # level -> {parent_id: [(id, name), ...]}
+        self._provinces = []
+
+    def available(self):
+        return self._loaded or self.path.exists()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+
+            self._provinces = [{'id': id_, 'name': name} for id_, name in data['provinces']]
+            for id_, name in data['provinces']:
+                self._names[id_] = name
+
+            for level in ('regencies', 'districts', 'villages'):
+                grouped = {}
+                for id_, parent_id, name in data[level]:
+                    grouped.setdefault(parent_id, []).append((id_, name))
+                    self._names[id_] = name
+                    self._parents[id_] = parent_id
+                self._children[level] = grouped
+
+            self._loaded = True
+
+    def _rows(self, level, parent_id):
+        self._ensure_loaded()
+        parent_field = LEVELS[level][0]
+        parent_id = str(parent_id)
+        return [
+            {'id': id_, parent_field: parent_id, 'name': name}
+            for id_, name in self._children[level].get(parent_id, ())
+        ]
+
+    def provinces(self):
+        self._ensure_loaded()
+        return [dict(row) for row in self._provinces]
+
+    def regencies(self, province_id):
+        return self._rows('regencies', province_id)
+
+    def districts(self, regency_id):
+        return self._rows('districts', regency_id)
+
+    def villages(self, district_id):
+        return self._rows('villages', district_id)
+
+    def name(self, region_id):
+        self._ensure_loaded()
+        return self._names.get(str(region_id))
+
+    def iter_villages(self):
+        """Yield (village_id, name, district_id, regency_id, province_id) untuk semua desa"""
+        self._ensure_loaded()
+        for district_id, villages in self._children['villages'].items():
+            regency_id = self._parents.get(district_id)
+            province_id = self._parents.get(regency_id)
+            for village_id, name in villages:
+                yield village_id, name, district_id, regency_id, province_id
+
+    def iter_districts(self):
+        """Yield (district_id, name, regency_id, province_id) untuk semua kecamatan"""
+        self._ensure_loaded()
+        for regency_id, districts in self._children['districts'].items():
+            province_id = self._parents.get(regency_id)
+            for district_id, name in districts:
+                yield district_id, name, regency_id, province_id
+
+    def ancestors(self, region_id):
+        """Parent chain dari region (terdekat dulu), misal desa -> [kec, kab, prov]"""
+        self._ensure_loaded()
+        chain = []
+        parent_id = self._parents.get(str(region_id))
+        while parent_id is not None:
+            chain.append(parent_id)
+            parent_id = self._parents.get(parent_id)
+        return chain
+
+
+class LocalRegionService:
+    """Pengganti EmsifaService berbasis dataset lokal (signature method sama)"""
+
+    def __init__(self, index=None):
+        self.index = index or region_index
+
+    def get_provinces(self):
+        return self.index.provinces()
+
+    def get_regencies(self, province_id):
+        return self.index.regencies(province_id)
+
+    def get_districts(self, regency_id):
+        return self.index.districts(regency_id)
+
+    def get_villages(self, district_id):
+        return self.index.villages(district_id)
+
+
+region_index = RegionIndex()
@@ -0,0 +1,150 @@
+# apps/navigation/services/route_matrix.py
+"""
+Route matrix (distance/duration antar banyak titik) di atas TOMTOM routing.
+
+- Koordinat di-quantize (default 4 desimal, ~11 m) sehingga titik yang
+  praktis sama memakai cache entry yang sama
+- Cache key menyertakan time-of-day bucket (hari kerja/akhir pekan + jam),
+  karena durasi route bergantung traffic
+- Pasangan origin/destination duplikat hanya dihitung sekali; miss
+  di-request concurrent (tomtom_async.route_batch) per batch terbatas
+- Hasil berupa matrix NumPy dense (NaN jika route tidak tersedia)
+"""
+import logging
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .tomtom_async import route_batch
+
+logger = logging.getLogger(__name__)
+
+CACHE_TIMEOUT = getattr(settings, 'CACHE_TIMEOUT', {})
+
+ROUTE_MATRIX = {
+    'precision': 4,        # Desimal koordinat untuk cache key
+    'bucket_minutes': 60,  # Lebar time-of-day bucket
+    'batch_size': 100,     # Maksimum request routing per batch
+    'max_concurrency': 10,
+}
+ROUTE_MATRIX.update(getattr(settings, 'ROUTE_MATRIX', {}))
+
+
+def quantize(point, precision=None):
+    """(lat, lon) atau "lat,lon" -> "lat,lon" dengan presisi tetap"""
+    precision = ROUTE_MATRIX['precision'] if precision is None else precision
+    if isinstance(point, str):
+        lat, lon = (float(part) for part in point.split(','))
+    else:
+        lat, lon = (float(part) for part in point)
+    return f'{lat:.{precision}f},{lon:.{precision}f}'
+
+
+def time_bucket(when=None, minutes=None):
+    """Bucket waktu lokal, misal 'wd08' (hari kerja jam 08:xx) atau 'we17'"""
+    minutes = minutes or ROUTE_MATRIX['bucket_minutes']
+    local = timezone.localtime(when)
+    day_type = 'we' if local.weekday() >= 5 else 'wd'
+    return f'{day_type}{(local.hour * 60 + local.minute) // minutes:02d}'
+
+
+def route_cache_key(origin, destination, travel_mode, bucket):
+    return f'route_{travel_mode}_{bucket}_{origin}_{destination}'
+
+
+class RouteMatrix:
+    """
+    Hasil route matrix. Semua matrix shape (len(origins), len(destinations)):
+    - distance: meter
+    - duration: detik (termasuk traffic)
+    - traffic_delay: detik
+    Nilai NaN berarti route tidak tersedia/gagal.
+    """
+
+    def __init__(self, origins, destinations, distance, duration, traffic_delay):
+        self.origins = origins
+        self.destinations = destinations
+        self.distance = distance
+        self.duration = duration
+        self.traffic_delay = traffic_delay
+
+    @property
+    def missing(self):
+        """Mask pasangan yang tidak punya route"""
+        return np.isnan(self.duration)
+
+    def to_dict(self):
+        """Format JSON (NaN -> None)"""
+        def rows(matrix):
+            return [[None if np.isnan(value) else value for value in row] for row in matrix.tolist()]
+
+        return {
+            'origins': self.origins,
+            'destinations': self.destinations,
+            'distance': rows(self.distance),
+            'duration': rows(self.duration),
+            'traffic_delay': rows(self.traffic_delay),
+        }
+
+
+def route_matrix(origins, destinations=None, travel_mode='car', when=None,
+                 use_cache=True, batch_size=None, **client_kwargs):
+    """
+    Hitung route matrix origins x destinations.
+
+    origins/destinations: list (lat, lon) atau "lat,lon". Jika destinations
+    None, dihitung matrix persegi antar origins (diagonal = 0).
+    when: waktu keberangkatan untuk time-of-day bucket (default sekarang).
+    """
+    origin_keys = [quantize(point) for point in origins]
+    destination_keys = origin_keys if destinations is None else [quantize(point) for point in destinations]
+    bucket = time_bucket(when)
+    batch_size = batch_size or ROUTE_MATRIX['batch_size']
+    client_kwargs.setdefault('max_concurrency', ROUTE_MATRIX['max_concurrency'])
+
+    # Pasangan unik (titik yang sama -> jarak 0 tanpa request)
+    results = {}
+    pairs = []
+    for origin in dict.fromkeys(origin_keys):
+        for destination in dict.fromkeys(destination_keys):
+            if origin == destination:
+                results[(origin, destination)] = {'distance': 0, 'duration': 0, 'traffic_delay': 0}
+            else:
+                pairs.append((origin, destination))
+
+    if use_cache and pairs:
+        keys = {pair: route_cache_key(*pair, travel_mode, bucket) for pair in pairs}
+        cached = cache.get_many(list(keys.values()))
+        for pair, key in keys.items():
+            if key in cached:
+                results[pair] = cached[key]
+    misses = [pair for pair in pairs if pair not in results]
+
+    for start in range(0, len(misses), batch_size):
+        batch = misses[start:start + batch_size]
+        routes = route_batch(batch, travel_mode, **client_kwargs)
+        fetched = {}
+        for pair, route in zip(batch, routes):
+            # Route gagal tidak di-cache supaya dicoba lagi di request berikutnya
+            if route is not None:
+                results[pair] = route
+                fetched[route_cache_key(*pair, travel_mode, bucket)] = route
+        if use_cache and fetched:
+            cache.set_many(fetched, CACHE_TIMEOUT.get('routes', 86400))
+
+    failed = len(misses) - sum(1 for pair in misses if pair in results)
+    if failed:
+        logger.warning(f"Route matrix: {failed} dari {len(misses)} route gagal dihitung")
+
+    shape = (len(origin_keys), len(destination_keys))
+    matrices = {field: np.full(shape, np.nan) for field in ('distance', 'duration', 'traffic_delay')}
+    for i, origin in enumerate(origin_keys):
+        for j, destination in enumerate(destination_keys):
+            route = results.get((origin, destination))
+            if route is not None:
+                for field, matrix in matrices.items():
+                    matrix[i, j] = route[field]
+
+    return RouteMatrix(origin_keys, destination_keys, **matrices)
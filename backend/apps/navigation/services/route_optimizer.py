@@ -0,0 +1,356 @@
+# apps/navigation/services/route_optimizer.py
+"""
+Optimasi urutan stop pengiriman untuk satu truk (multi-trip).
+
+Langkah:
+1. Travel-time matrix depot + stops: jarak geodesic / kecepatan rata-rata
+   (metric='distance') atau durasi TOMTOM dengan traffic dari route matrix
+   yang di-cache (metric='route')
+2. Nearest-neighbour seed yang mematuhi kapasitas dan time window; jika
+   tidak ada stop yang feasible, truk kembali ke depot dan mulai trip baru
+3. Perbaikan per trip dengan 2-opt dan Or-opt (segmen 1-3 stop); delta
+   semua kandidat move dihitung vectorized dengan NumPy, move hanya
+   diterima jika time window tetap terpenuhi dan trip tidak selesai lebih
+   lambat
+
+Solver (solve) hanya butuh array NumPy sehingga bisa dijalankan di
+process pool (optimize_many) untuk batch besar.
+
+Satuan: waktu dalam detik relatif terhadap start_time, demand dan
+capacity bebas (kg, paket, dll).
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .geo_vector import as_coordinates, geodesic_matrix
+
+# Kecepatan rata-rata untuk estimasi waktu dari jarak (km/jam)
+DEFAULT_SPEED_KMH = 40
+
+# Batas waktu optimasi per problem (detik)
+DEFAULT_TIME_LIMIT = 10.0
+
+# Kandidat move terbaik yang dicek feasibility-nya (jika ada time window)
+FEASIBILITY_CHECKS = 5
+
+_EPSILON = 1e-9
+
+
+# ============ MATRIX ============
+
+def build_matrices(points, metric='distance', speed_kmh=DEFAULT_SPEED_KMH, when=None):
+    """
+    Return (travel_time_s, distance_km) untuk list koordinat (lat, lon).
+
+    metric='route' memakai TOMTOM route matrix; pasangan tanpa route
+    diisi estimasi garis lurus.
+    """
+    points = as_coordinates(points)
+    distance = geodesic_matrix(points, points)
+    travel_time = distance / speed_kmh * 3600
+
+    if metric == 'route':
+        from .route_matrix import route_matrix
+
+        routes = route_matrix([tuple(point) for point in points], when=when)
+        available = ~routes.missing
+        travel_time = np.where(available, routes.duration, travel_time)
+        distance = np.where(available, routes.distance / 1000, distance)
+    elif metric != 'distance':
+        raise ValueError(f'Metric tidak dikenal: {metric}')
+
+    return travel_time, distance
+
+
+# ============ SOLVER ============
+
+def _trip_end(travel_time, route, start, ready, due, service):
+    """Waktu kembali ke depot untuk route [0, ..., 0], None jika time window dilanggar"""
+    clock = start
+    for a, b in zip(route[:-1], route[1:]):
+        clock = max(clock + travel_time[a, b], ready[b])
+        if clock > due[b]:
+            return None
+        clock += service[b]
+    return clock
+
+
+def _arrivals(travel_time, route, start, ready, service):
+    clock, arrivals = start, []
+    for a, b in zip(route[:-1], route[1:]):
+        clock = max(clock + travel_time[a, b], ready[b])
+        arrivals.append(clock)
+        clock += service[b]
+    return arrivals[:-1]
+
+
+def _nearest_neighbour(travel_time, demand, ready, due, service, capacity, start):
+    """Seed trips; return (trips, unassigned) dalam index matrix (depot = 0)"""
+    n = len(travel_time)
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[0] = False
+    # Stop yang melebihi kapasitas truk tidak mungkin dilayani
+    unvisited &= demand <= capacity
+
+    trips, clock = [], start
+    while unvisited.any():
+        trip, load, current = [], 0.0, 0
+        while True:
+            arrival = np.maximum(clock + travel_time[current], ready)
+            feasible = unvisited & (arrival <= due) & (load + demand <= capacity)
+            if not feasible.any():
+                break
+            # Stop dengan waktu tiba (termasuk menunggu) paling awal
+            nearest = int(np.argmin(np.where(feasible, arrival, np.inf)))
+            clock = arrival[nearest] + service[nearest]
+            load += demand[nearest]
+            unvisited[nearest] = False
+            trip.append(nearest)
+            current = nearest
+        if not trip:
+            break
+        clock += travel_time[current, 0]
+        trips.append(trip)
+
+    unassigned = sorted(set(range(1, n)) - {stop for trip in trips for stop in trip})
+    return trips, unassigned
+
+
+class _TripImprover:
+    """2-opt + Or-opt untuk satu trip (route diawali dan diakhiri depot)"""
+
+    def __init__(self, travel_time, route, start, ready, due, service, deadline):
+        self.travel_time = travel_time
+        self.route = np.asarray(route, dtype=np.intp)
+        self.start = start
+        self.ready, self.due, self.service = ready, due, service
+        self.has_windows = bool(np.isfinite(due).any() or ready.any())
+        self.deadline = deadline
+        self.end = _trip_end(travel_time, self.route, start, ready, due, service)
+
+    def _accept(self, candidates, deltas, build):
+        """Terapkan move terbaik yang feasible; return True jika ada yang diterapkan"""
+        order = np.argsort(deltas[candidates])[:FEASIBILITY_CHECKS if self.has_windows else 1]
+        for k in candidates[order]:
+            route = build(int(k))
+            if self.has_windows:
+                end = _trip_end(self.travel_time, route, self.start, self.ready, self.due, self.service)
+                if end is None or end > self.end + _EPSILON:
+                    continue
+            else:
+                end = self.end + deltas[k]
+            self.route, self.end = route, end
+            return True
+        return False
+
+    def two_opt(self):
+        """Satu pass 2-opt; reverse segmen route[i+1..j]"""
+        T, improved, i = self.travel_time, False, 0
+        while i < len(self.route) - 3 and time.perf_counter() < self.deadline:
+            route = self.route
+            forward = np.concatenate(([0.0], np.cumsum(T[route[:-1], route[1:]])))
+            backward = np.concatenate(([0.0], np.cumsum(T[route[1:], route[:-1]])))
+
+            a, b = route[i], route[i + 1]
+            j = np.arange(i + 2, len(route) - 1)
+            c, d = route[j], route[j + 1]
+            # Matrix bisa asimetris (durasi TOMTOM), jadi biaya segmen yang dibalik ikut dihitung
+            deltas = (T[a, c] + T[b, d] - T[a, b] - T[c, d]
+                      + (backward[j] - backward[i + 1]) - (forward[j] - forward[i + 1]))
+            candidates = np.flatnonzero(deltas < -_EPSILON)
+
+            def build(k, route=route, i=i):
+                end = j[k]
+                return np.concatenate((route[:i + 1], route[end:i:-1], route[end + 1:]))
+
+            if candidates.size and self._accept(candidates, deltas, build):
+                improved = True
+            else:
+                i += 1
+        return improved
+
+    def or_opt(self, max_segment=3):
+        """Satu pass Or-opt; pindahkan segmen 1..max_segment stop ke posisi lain"""
+        T, improved, i = self.travel_time, False, 1
+        while i < len(self.route) - 1 and time.perf_counter() < self.deadline:
+            moved = False
+            for length in range(1, max_segment + 1):
+                route = self.route
+                if i + length >= len(route):
+                    break
+                first, last = route[i], route[i + length - 1]
+                prev, nxt = route[i - 1], route[i + length]
+                removal = T[prev, first] + T[last, nxt] - T[prev, nxt]
+
+                # Sisipkan di antara route[k] dan route[k+1], di luar segmen dan tetangganya
+                k = np.arange(len(route) - 1)
+                k = k[(k < i - 1) | (k > i + length - 1)]
+                p, q = route[k], route[k + 1]
+                deltas = T[p, first] + T[last, q] - T[p, q] - removal
+                candidates = np.flatnonzero(deltas < -_EPSILON)
+
+                def build(index, route=route, i=i, length=length, k=k):
+                    segment = route[i:i + length]
+                    rest = np.concatenate((route[:i], route[i + length:]))
+                    position = k[index] + 1 if k[index] < i else k[index] + 1 - length
+                    return np.concatenate((rest[:position], segment, rest[position:]))
+
+                if candidates.size and self._accept(candidates, deltas, build):
+                    improved = moved = True
+                    break
+            if not moved:
+                i += 1
+        return improved
+
+    def run(self):
+        while time.perf_counter() < self.deadline:
+            improved = self.two_opt()
+            improved = self.or_opt() or improved
+            if not improved:
+                break
+        return self.route, self.end
+
+
+def solve(travel_time, distance=None, demand=None, ready=None, due=None, service=None,
+          capacity=None, start_time=0.0, time_limit=DEFAULT_TIME_LIMIT):
+    """
+    Optimasi urutan stop dari matrix (index 0 = depot).
+
+    Semua array per node panjangnya sama dengan matrix (nilai depot
+    diabaikan). Return dict dengan trips berisi index node.
+    """
+    deadline = time.perf_counter() + time_limit
+    travel_time = np.asarray(travel_time, dtype=np.float64)
+    n = len(travel_time)
+    distance = travel_time if distance is None else np.asarray(distance, dtype=np.float64)
+    demand = np.zeros(n) if demand is None else np.asarray(demand, dtype=np.float64)
+    ready = np.zeros(n) if ready is None else np.asarray(ready, dtype=np.float64)
+    due = np.full(n, np.inf) if due is None else np.asarray(due, dtype=np.float64)
+    service = np.zeros(n) if service is None else np.asarray(service, dtype=np.float64)
+    capacity = np.inf if capacity is None else float(capacity)
+    ready[0], due[0], service[0], demand[0] = 0.0, np.inf, 0.0, 0.0
+
+    seed_trips, unassigned = _nearest_neighbour(travel_time, demand, ready, due, service,
+                                                capacity, start_time)
+
+    def edges(route):
+        return route[:-1], route[1:]
+
+    initial_time = sum(travel_time[edges(np.array([0, *trip, 0]))].sum() for trip in seed_trips)
+
+    trips, clock = [], start_time
+    for trip in seed_trips:
+        improver = _TripImprover(travel_time, [0, *trip, 0], clock, ready, due, service, deadline)
+        route, _ = improver.run()
+        # Hitung ulang dengan start aktual (trip sebelumnya bisa selesai lebih awal)
+        arrivals = _arrivals(travel_time, route, clock, ready, service)
+        clock = _trip_end(travel_time, route, clock, ready, due, service)
+        trips.append({
+            'stops': route[1:-1].tolist(),
+            'arrivals': [float(value) for value in arrivals],
+            'load': float(demand[route].sum()),
+            'travel_time_s': float(travel_time[edges(route)].sum()),
+            'distance_km': float(distance[edges(route)].sum()),
+        })
+
+    return {
+        'trips': trips,
+        'unassigned': unassigned,
+        'travel_time_s': sum(trip['travel_time_s'] for trip in trips),
+        'distance_km': sum(trip['distance_km'] for trip in trips),
+        'duration_s': float(clock - start_time),
+        'initial_travel_time_s': float(initial_time),
+    }
+
+
+# ============ PUBLIC API ============
+
+def _point(value):
+    if isinstance(value, dict):
+        return float(value['lat']), float(value['lon'])
+    return float(value[0]), float(value[1])
+
+
+def _prepare(depot, stops, metric, speed_kmh, when):
+    """Matrix + array constraint untuk satu problem (dijalankan di parent process)"""
+    points = [_point(depot)] + [_point(stop) for stop in stops]
+    travel_time, distance = build_matrices(points, metric=metric, speed_kmh=speed_kmh, when=when)
+
+    def column(field, default):
+        return np.array([default] + [
+            default if stop.get(field) is None else float(stop[field]) for stop in stops
+        ])
+
+    return {
+        'travel_time': travel_time,
+        'distance': distance,
+        'demand': column('demand', 0.0),
+        'ready': column('ready', 0.0),
+        'due': column('due', np.inf),
+        'service': column('service', 0.0),
+    }
+
+
+def _result(stops, solution):
+    """Ganti index node dengan id stop"""
+    def stop_id(index):
+        return stops[index - 1].get('id', index - 1)
+
+    for trip in solution['trips']:
+        trip['stops'] = [stop_id(index) for index in trip['stops']]
+    solution['unassigned'] = [stop_id(index) for index in solution['unassigned']]
+    return solution
+
+
+def optimize_route(depot, stops, capacity=None, metric='distance', speed_kmh=DEFAULT_SPEED_KMH,
+                   start_time=0.0, time_limit=DEFAULT_TIME_LIMIT, when=None):
+    """
+    Urutkan stop untuk satu truk.
+
+    depot: (lat, lon) atau {'lat', 'lon'}
+    stops: list dict {'id', 'lat', 'lon', 'demand', 'ready', 'due', 'service'}
+        (selain lat/lon optional; ready/due dalam detik sejak start)
+    capacity: kapasitas truk per trip (None = tanpa batas)
+
+    Returns dict trips (stop ids + waktu tiba), unassigned, travel_time_s,
+    distance_km, duration_s dan initial_travel_time_s (hasil seed).
+    """
+    arrays = _prepare(depot, stops, metric, speed_kmh, when)
+    solution = solve(**arrays, capacity=capacity, start_time=start_time, time_limit=time_limit)
+    return _result(stops, solution)
+
+
+def _solve_kwargs(kwargs):
+    return solve(**kwargs)
+
+
+def optimize_many(problems, workers=None, metric='distance', speed_kmh=DEFAULT_SPEED_KMH,
+                  time_limit=DEFAULT_TIME_LIMIT, when=None):
+    """
+    Optimasi banyak problem (misal satu per truk) secara paralel.
+
+    problems: list dict {'depot', 'stops', 'capacity', 'start_time'}
+    Matrix dibangun di process ini (memakai cache route), solver dijalankan
+    di ProcessPoolExecutor. Urutan hasil = urutan problems.
+    """
+    prepared = [
+        {
+            **_prepare(problem['depot'], problem['stops'], metric, speed_kmh, when),
+            'capacity': problem.get('capacity'),
+            'start_time': problem.get('start_time', 0.0),
+            'time_limit': time_limit,
+        }
+        for problem in problems
+    ]
+
+    workers = min(workers or os.cpu_count() or 1, len(prepared))
+    if workers <= 1:
+        solutions = [solve(**kwargs) for kwargs in prepared]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            solutions = list(pool.map(_solve_kwargs, prepared))
+
+    return [_result(problem['stops'], solution) for problem, solution in zip(problems, solutions)]
@@ -0,0 +1,124 @@
+# apps/navigation/services/settings_registry.py
+"""
+Registry in-process untuk SiteSetting.
+Semua rows di-load sekali, value sudah di-parse (get_value) dan di-index
+berdasarkan key dan category. Reload otomatis saat version stamp
+'site_settings' berubah (di-bump oleh signals setiap SiteSetting berubah).
+
+Stamp dibaca maksimal sekali per check_interval; builder yang hasilnya
+ditulis ke Redis memakai fresh=True supaya tidak men-cache settings lama
+selama TTL.
+"""
+import threading
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
+from ..caching import VersionStamp, LOCAL_TIER
+
+settings_version = VersionStamp('site_settings', LOCAL_TIER['version_check_interval'])
+
+_MISSING = object()
+
+
+class SettingsRegistry:
+    """Typed settings registry; read O(1) tanpa query dan tanpa parsing ulang"""
+
+    def __init__(self):
+        self._version = None
+        self._values = {}
+        self._public = {}
+        self._by_category = {}
+        self._public_by_category = {}
+        self._lock = threading.Lock()
+
+    def _load(self, version):
+        from ..models import SiteSetting
+
+        values, public = {}, {}
+        by_category, public_by_category = {}, {}
+        # Urutan mengikuti Meta.ordering (category, setting_key)
+        for setting in SiteSetting.objects.all():
+            value = setting.get_value()
+            values[setting.setting_key] = value
+            by_category.setdefault(setting.category, {})[setting.setting_key] = value
+            if setting.is_public:
+                public[setting.setting_key] = value
+                public_by_category.setdefault(setting.category, {})[setting.setting_key] = value
+
+        # Swap sekaligus supaya reader tidak melihat state setengah jadi
+        (self._values, self._public,
+         self._by_category, self._public_by_category) = values, public, by_category, public_by_category
+        self._version = version
+
+    def _ensure_loaded(self, fresh=False):
+        version = settings_version.current(force=fresh)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._load(version)
+
+    async def _aensure_loaded(self, fresh=False):
+        """Versi async; reload (jarang) dijalankan di thread lewat sync_to_async"""
+        version = await settings_version.acurrent(force=fresh)
+        if version != self._version:
+            await sync_to_async(self._reload_if_stale)(version)
+
+    def _reload_if_stale(self, version):
+        with self._lock:
+            if version != self._version:
+                self._load(version)
+
+    def get(self, key, default=None):
+        """
+        Get parsed value by key.
+
+        Value json dikembalikan sebagai object yang sama untuk semua caller,
+        jangan di-mutate.
+        """
+        self._ensure_loaded()
+        value = self._values.get(key, _MISSING)
+        return default if value is _MISSING else value
+
+    def public(self, fresh=False):
+        """Semua public settings: {key: value}"""
+        self._ensure_loaded(fresh)
+        return self._public
+
+    def category(self, category, public_only=True, fresh=False):
+        """Settings dalam satu category: {key: value}"""
+        self._ensure_loaded(fresh)
+        index = self._public_by_category if public_only else self._by_category
+        return index.get(category, {})
+
+    async def apublic(self, fresh=False):
+        await self._aensure_loaded(fresh)
+        return self._public
+
+    async def acategory(self, category, public_only=True, fresh=False):
+        await self._aensure_loaded(fresh)
+        index = self._public_by_category if public_only else self._by_category
+        return index.get(category, {})
+
+    def reload(self):
+        """
+        Load ulang dari DB sekarang, tanpa menunggu stamp di-bump (misal
+        publisher yang berjalan di on_commit sebelum callback _bump).
+        """
+        with self._lock:
+            self._load(settings_version.current(force=True))
+
+    def invalidate(self):
+        """
+        Reload di semua worker setelah transaction commit. Panggil sebelum
+        caching.invalidate() supaya stamp sudah baru saat navigation_version
+        di-bump (builder yang lolos cek version membaca settings baru).
+        """
+        transaction.on_commit(self._bump)
+
+    def _bump(self):
+        settings_version.bump()
+        self._version = None
+
+
+settings_registry = SettingsRegistry()
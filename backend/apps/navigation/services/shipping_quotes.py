@@ -0,0 +1,202 @@
+# apps/navigation/services/shipping_quotes.py
+"""
+Quote engine biaya pengiriman (batch, vectorized).
+
+Tarif diambil dari tabel ShippingRate dan disimpan in-process sebagai
+array NumPy; reload otomatis saat version stamp 'shipping_rates' berubah
+(di-bump oleh signals). Jika tabel kosong, dipakai DEFAULT_RATES yang
+sama dengan tarif hard-coded sebelumnya.
+
+Rumus per pengiriman:
+    max(min_charge, base_fee + distance_km * rate_per_km
+        + max(0, weight_kg - free_weight_kg) * rate_per_kg)
+"""
+import math
+import threading
+
+import numpy as np
+from django.db import transaction
+
+from ..caching import VersionStamp, LOCAL_TIER
+from .geo_vector import pairwise_distances
+
+shipping_rates_version = VersionStamp('shipping_rates', LOCAL_TIER['version_check_interval'])
+
+# Tarif default (Rupiah) jika belum ada ShippingRate di database
+DEFAULT_RATES = {
+    'regular': {'rate_per_km': 5000},
+    'express': {'rate_per_km': 8000},
+    'same_day': {'rate_per_km': 12000},
+}
+DEFAULT_SERVICE = 'regular'
+
+# Kolom tarif -> default jika tidak di-set
+RATE_FIELDS = {
+    'rate_per_km': 0,
+    'base_fee': 0,
+    'rate_per_kg': 2000,
+    'free_weight_kg': 1,
+    'min_charge': 0,
+}
+
+# Batas jumlah shipment per request quote
+MAX_BATCH = 10000
+
+
+class RateTable:
+    """Tarif semua service type dalam bentuk array (satu baris per service)"""
+
+    def __init__(self, rates, default_service):
+        self.services = list(rates)
+        self.index = {service: i for i, service in enumerate(self.services)}
+        self.default_index = self.index.get(default_service, 0)
+        self.columns = {
+            field: np.array([rates[service].get(field, default) for service in self.services],
+                            dtype=np.float64)
+            for field, default in RATE_FIELDS.items()
+        }
+
+    def lookup(self, service_types):
+        """Index baris tarif untuk setiap service type (tidak dikenal -> default)"""
+        return np.array([self.index.get(service, self.default_index) for service in service_types],
+                        dtype=np.intp)
+
+    def as_dict(self):
+        return {
+            service: {field: float(self.columns[field][i]) for field in RATE_FIELDS}
+            for service, i in self.index.items()
+        }
+
+
+class ShippingRateRegistry:
+    """Rate table in-process, di-load sekali per version"""
+
+    def __init__(self):
+        self._version = None
+        self._table = None
+        self._lock = threading.Lock()
+
+    def _load(self, version):
+        from ..models import ShippingRate
+
+        rates, default_service = {}, DEFAULT_SERVICE
+        for rate in ShippingRate.objects.filter(is_active=True):
+            rates[rate.service_type] = {field: getattr(rate, field) for field in RATE_FIELDS}
+            if rate.is_default:
+                default_service = rate.service_type
+        if not rates:
+            rates = DEFAULT_RATES
+        elif default_service not in rates:
+            # Default = tarif termurah (ordering ShippingRate)
+            default_service = next(iter(rates))
+
+        self._table = RateTable(rates, default_service)
+        self._version = version
+
+    def table(self):
+        version = shipping_rates_version.current()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._load(version)
+        return self._table
+
+    def invalidate(self):
+        """Reload di semua worker setelah transaction commit."""
+        transaction.on_commit(self._bump)
+
+    def _bump(self):
+        shipping_rates_version.bump()
+        self._version = None
+
+
+shipping_rates = ShippingRateRegistry()
+
+
+def quote_batch(distances_km, weights_kg, service_types, table=None):
+    """
+    Hitung biaya untuk banyak pengiriman sekaligus.
+
+    distances_km, weights_kg: array-like (N,)
+    service_types: list (N,) atau satu string untuk semua pengiriman
+    Returns array float64 (N,) dalam Rupiah.
+    """
+    table = table or shipping_rates.table()
+    distances = np.asarray(distances_km, dtype=np.float64)
+    weights = np.asarray(weights_kg, dtype=np.float64)
+    if isinstance(service_types, str):
+        rows = np.full(distances.shape, table.lookup([service_types])[0], dtype=np.intp)
+    else:
+        rows = table.lookup(service_types)
+
+    columns = table.columns
+    cost = (
+        columns['base_fee'][rows]
+        + distances * columns['rate_per_km'][rows]
+        + np.maximum(0.0, weights - columns['free_weight_kg'][rows]) * columns['rate_per_kg'][rows]
+    )
+    return np.maximum(cost, columns['min_charge'][rows])
+
+
+def quote_shipments(shipments, method='geodesic'):
+    """
+    Quote list shipment dict (dipakai endpoint shipping/quote/).
+
+    Tiap shipment berisi weight_kg, service_type (optional) dan salah satu:
+    - distance_km
+    - origin dan destination: {'lat': .., 'lon': ..}
+    Jarak dari koordinat dihitung vectorized dalam satu pass.
+
+    Returns list dict {distance_km, weight_kg, service_type, cost}.
+    Raise ValueError untuk input tidak valid (dengan index shipment).
+    """
+    if len(shipments) > MAX_BATCH:
+        raise ValueError(f'Maksimal {MAX_BATCH} shipment per request')
+
+    table = shipping_rates.table()
+    distances = np.empty(len(shipments), dtype=np.float64)
+    weights = np.empty(len(shipments), dtype=np.float64)
+    services = []
+    needs_distance, origins, destinations = [], [], []
+
+    for i, shipment in enumerate(shipments):
+        try:
+            weights[i] = float(shipment.get('weight_kg', 1))
+            services.append(str(shipment.get('service_type') or table.services[table.default_index]))
+            if shipment.get('distance_km') is not None:
+                distances[i] = float(shipment['distance_km'])
+                if not math.isfinite(distances[i]) or distances[i] < 0:
+                    raise ValueError
+            else:
+                origin, destination = shipment['origin'], shipment['destination']
+                coords = (float(origin['lat']), float(origin['lon']),
+                          float(destination['lat']), float(destination['lon']))
+                # inf/nan (juga 1e400 dari JSON) lolos float() tapi merusak hitungan cost
+                if not all(math.isfinite(value) for value in coords):
+                    raise ValueError
+                if abs(coords[0]) > 90 or abs(coords[2]) > 90 or abs(coords[1]) > 180 or abs(coords[3]) > 180:
+                    raise ValueError
+                origins.append(coords[:2])
+                destinations.append(coords[2:])
+                needs_distance.append(i)
+            if not math.isfinite(weights[i]) or weights[i] < 0:
+                raise ValueError
+        except (AttributeError, KeyError, TypeError, ValueError):
+            raise ValueError(
+                f'Shipment #{i}: butuh weight_kg dan distance_km (angka >= 0) '
+                f'atau origin/destination {{lat, lon}} (lat -90..90, lon -180..180)'
+            )
+
+    if needs_distance:
+        distances[needs_distance] = pairwise_distances(origins, destinations, method=method)
+
+    costs = quote_batch(distances, weights, services, table=table)
+    return [
+        {
+            'distance_km': round(float(distance), 3),
+            'weight_kg': float(weight),
+            'service_type': service if service in table.index else table.services[table.default_index],
+            'cost': round(float(cost)),
+        }
+        for distance, weight, service, cost in zip(distances, weights, services, costs)
+    ]
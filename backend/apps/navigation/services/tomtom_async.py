@@ -0,0 +1,261 @@
+# apps/navigation/services/tomtom_async.py
+"""
+Async client untuk TOMTOM Geocoding & Routing API (httpx).
+Satu AsyncClient dengan connection pool + keep-alive dipakai untuk semua
+request, concurrency dibatasi semaphore, dan error sementara (timeout,
+429, 5xx) di-retry dengan exponential backoff + jitter.
+
+Sync wrapper (geocode_batch, route_batch) menjalankan batch di satu event
+loop background per process dengan client bersama (shared_client), jadi
+connection pool dipakai ulang antar batch.
+
+Setiap attempt melewati circuit breaker 'tomtom' (sama dengan
+TomTomService); saat breaker open, request langsung gagal tanpa menunggu
+timeout.
+
+base_url dan transport bisa di-override supaya client bisa dites
+terhadap mock HTTP server lokal.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+from urllib.parse import quote
+
+import httpx
+from django.conf import settings
+
+from .circuit_breaker import CircuitOpenError, get_breaker
+from .geo_services import parse_geocode, parse_route
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class AsyncTomTomClient:
+    """Async TOMTOM client dengan pooled session dan bounded concurrency"""
+
+    def __init__(self, api_key=None, base_url=None, version=None,
+                 max_concurrency=10, max_connections=20, timeout=10.0,
+                 retries=3, backoff=0.5, transport=None, breaker=None):
+        self.api_key = api_key if api_key is not None else settings.TOMTOM_API_KEY
+        self.base_url = base_url or settings.TOMTOM_API_BASE_URL
+        self.version = version or settings.TOMTOM_VERSION_NUMBER
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or get_breaker('tomtom')
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            transport=transport,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    def _retry_delay(self, attempt, response=None):
+        """Full jitter backoff; Retry-After dari server diutamakan"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return float(retry_after)
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    async def _get_json(self, path, params):
+        params = {'key': self.api_key, **params}
+
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                if not self.breaker.allow():
+                    raise CircuitOpenError(self.breaker.name)
+
+                response = None
+                recorded = False
+                start = time.monotonic()
+                try:
+                    response = await self._client.get(path, params=params)
+                    if response.status_code not in RETRY_STATUSES:
+                        # 4xx (selain 429) adalah error request, bukan upstream bermasalah
+                        self.breaker.record(response.status_code < 500, time.monotonic() - start)
+                        recorded = True
+                        response.raise_for_status()
+                        return response.json()
+                    error = httpx.HTTPStatusError(
+                        f"TOMTOM status {response.status_code}",
+                        request=response.request, response=response,
+                    )
+                except httpx.TransportError as e:
+                    error = e
+                except BaseException as e:
+                    # Error lain (DecodingError, TooManyRedirects, CancelledError, ...)
+                    # tetap di-record supaya slot half-open tidak tertahan
+                    if not recorded:
+                        self.breaker.record(False, time.monotonic() - start, e)
+                    raise
+                self.breaker.record(False, time.monotonic() - start, error)
+
+                if attempt == self.retries:
+                    raise error
+                await asyncio.sleep(self._retry_delay(attempt, response))
+
+    async def geocode(self, address):
+        """Convert address to coordinates"""
+        ok, result = await self.try_geocode(address)
+        return result
+
+    async def try_geocode(self, address):
+        """Geocode dan return (ok, result); ok=False jika request gagal (jangan di-cache)"""
+        if not self.api_key:
+            logger.warning("TOMTOM_API_KEY tidak di-set")
+            return False, None
+
+        path = f"/search/{self.version}/geocode/{quote(address, safe='')}.json"
+        try:
+            data = await self._get_json(path, {'language': 'id-ID', 'limit': 1})
+            return True, parse_geocode(data)
+        except CircuitOpenError:
+            return False, None
+        except Exception as e:
+            logger.error(f"TOMTOM Geocoding error: {e}")
+            return False, None
+
+    async def calculate_route(self, origin, destination, travel_mode='car'):
+        """Calculate route between two points ("lat,lon")"""
+        if not self.api_key:
+            return None
+
+        path = f"/routing/{self.version}/calculateRoute/{origin}:{destination}/json"
+        params = {
+            'travelMode': travel_mode,
+            'routeType': 'fastest',
+            'traffic': 'true'
+        }
+        try:
+            data = await self._get_json(path, params)
+            return parse_route(data)
+        except CircuitOpenError:
+            return None
+        except Exception as e:
+            logger.error(f"TOMTOM Routing error: {e}")
+            return None
+
+    async def geocode_many(self, addresses):
+        """Geocode banyak address concurrent; address duplikat hanya di-request sekali"""
+        unique = list(dict.fromkeys(addresses))
+        results = await asyncio.gather(*(self.geocode(address) for address in unique))
+        by_address = dict(zip(unique, results))
+        return [by_address[address] for address in addresses]
+
+    async def calculate_routes(self, pairs, travel_mode='car'):
+        """Calculate route untuk list (origin, destination); pair duplikat di-request sekali"""
+        unique = list(dict.fromkeys(pairs))
+        results = await asyncio.gather(*(
+            self.calculate_route(origin, destination, travel_mode)
+            for origin, destination in unique
+        ))
+        by_pair = dict(zip(unique, results))
+        return [by_pair[pair] for pair in pairs]
+
+
+# event loop -> {client_kwargs: AsyncTomTomClient}
+_clients = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def shared_client(**client_kwargs):
+    """
+    AsyncTomTomClient bersama untuk event loop yang sedang berjalan (satu
+    per kombinasi client_kwargs). Jangan di-close oleh caller.
+    """
+    loop = asyncio.get_running_loop()
+    key = tuple(sorted(client_kwargs.items()))
+    with _clients_lock:
+        clients = _clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = clients[key] = AsyncTomTomClient(**client_kwargs)
+    return client
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _run(coro):
+    """
+    Jalankan coroutine di event loop background process ini dan tunggu
+    hasilnya. Loop (dan shared_client di dalamnya) bertahan antar
+    panggilan; async_to_sync membuat loop baru per panggilan di WSGI.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='tomtom-async', daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
+async def _geocode_batch(addresses, **client_kwargs):
+    """Return list (ok, result) untuk setiap address"""
+    client = shared_client(**client_kwargs)
+    return await asyncio.gather(*(client.try_geocode(address) for address in addresses))
+
+
+async def _route_batch(pairs, travel_mode='car', **client_kwargs):
+    return await shared_client(**client_kwargs).calculate_routes(pairs, travel_mode)
+
+
+def geocode_batch(addresses, use_cache=True, **client_kwargs):
+    """
+    Sync wrapper untuk dipakai dari views/management commands.
+
+    Address yang sudah ada di geocode cache (termasuk variasi penulisan
+    yang sama setelah normalisasi) tidak di-request ulang.
+    """
+    from .geocode_cache import geocode_cache, address_key
+
+    addresses = list(addresses)
+    found = geocode_cache.get_many(addresses) if use_cache else {}
+
+    # Satu request per normalized address
+    misses = {}
+    for address in addresses:
+        if address not in found:
+            misses.setdefault(address_key(address), address)
+
+    outcomes = []
+    if misses:
+        outcomes = _run(_geocode_batch(list(misses.values()), **client_kwargs))
+    fetched = {}
+    for key, (ok, result) in zip(misses, outcomes):
+        if ok:
+            fetched[key] = result
+            if use_cache:
+                geocode_cache.set(misses[key], result)
+        else:
+            # Request gagal / breaker open: pakai hasil terakhir yang diketahui
+            fetched[key] = geocode_cache.last_known(misses[key])
+
+    return [
+        found[address] if address in found else fetched.get(address_key(address))
+        for address in addresses
+    ]
+
+
+def route_batch(pairs, travel_mode='car', **client_kwargs):
+    """Sync wrapper untuk batch routing"""
+    return _run(_route_batch(list(pairs), travel_mode, **client_kwargs))
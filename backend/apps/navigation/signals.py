@@ -0,0 +1,148 @@
+"""
+Signals untuk aplikasi Navigation.
+File location: backend/apps/navigation/signals.py
+
+Setiap perubahan NavigationMenu, MenuItem, SiteSetting dan MediaFile
+menghapus cache keys yang bergantung pada row tersebut (lihat caching.py),
+lalu config frontend di-publish ulang (services/config_publisher.py).
+Perubahan NavigationMenu, MenuItem dan SiteSetting juga dicatat di change
+log untuk delta sync (services/config_changes.py).
+"""
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import NavigationMenu, MenuItem, SiteSetting, MediaFile, ShippingRate, Depot, ConfigChange
+from .caching import (
+    invalidate,
+    keys_for_menu_locations,
+    keys_for_setting_categories,
+    keys_for_logos,
+)
+from .services.settings_registry import settings_registry
+from .services.config_publisher import config_publisher
+from .services.config_changes import record_changes
+from .services.shipping_quotes import shipping_rates
+from .services.depot_index import depot_registry
+
+
+def _previous(instance, *fields):
+    """Ambil nilai lama dari DB sebelum save (None untuk row baru)."""
+    if not instance.pk:
+        return None
+    return type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+
+
+def _action(kwargs):
+    """Action change log dari kwargs receiver post_save/post_delete"""
+    if kwargs.get('signal') is post_delete:
+        return 'delete'
+    return 'create' if kwargs.get('created') else 'update'
+
+
+# ============ NAVIGATION MENU ============
+
+@receiver(pre_save, sender=NavigationMenu)
+def remember_menu_location(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._previous_values = _previous(instance, 'location')
+
+
+@receiver([post_save, post_delete], sender=NavigationMenu)
+def invalidate_menu_cache(sender, instance, **kwargs):
+    locations = {instance.location}
+    previous = getattr(instance, '_previous_values', None)
+    if previous:
+        locations.add(previous['location'])
+    invalidate(keys_for_menu_locations(locations))
+    action = _action(kwargs)
+    record_changes(ConfigChange(resource='menu', action=action, object_id=instance.pk, location=location)
+                   for location in locations)
+    config_publisher.schedule()
+
+
+# ============ MENU ITEM ============
+
+@receiver(pre_save, sender=MenuItem)
+def remember_item_menu(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._previous_values = _previous(instance, 'menu_id')
+
+
+@receiver([post_save, post_delete], sender=MenuItem)
+def invalidate_menu_item_cache(sender, instance, **kwargs):
+    menu_ids = {instance.menu_id}
+    previous = getattr(instance, '_previous_values', None)
+    if previous:
+        menu_ids.add(previous['menu_id'])
+
+    locations = set(
+        NavigationMenu.objects.filter(pk__in=[pk for pk in menu_ids if pk])
+        .values_list('location', flat=True)
+    )
+    invalidate(keys_for_menu_locations(locations))
+    # Item yang pindah menu tercatat di location lama (jadi removed) dan baru
+    action = _action(kwargs)
+    record_changes(ConfigChange(resource='menu_item', action=action, object_id=instance.pk, location=location)
+                   for location in locations)
+    config_publisher.schedule()
+
+
+# ============ SITE SETTING ============
+
+@receiver(pre_save, sender=SiteSetting)
+def remember_setting_category(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._previous_values = _previous(instance, 'category', 'setting_key')
+
+
+@receiver([post_save, post_delete], sender=SiteSetting)
+def invalidate_setting_cache(sender, instance, **kwargs):
+    categories = {instance.category}
+    setting_keys = {instance.setting_key}
+    previous = getattr(instance, '_previous_values', None)
+    if previous:
+        categories.add(previous['category'])
+        setting_keys.add(previous['setting_key'])
+    # Stamp registry di-bump sebelum purge cache (on_commit berjalan berurutan)
+    settings_registry.invalidate()
+    invalidate(keys_for_setting_categories(categories))
+    action = _action(kwargs)
+    record_changes(ConfigChange(resource='setting', action=action, object_key=key)
+                   for key in setting_keys)
+    config_publisher.schedule()
+
+
+# ============ MEDIA FILE ============
+
+@receiver(pre_save, sender=MediaFile)
+def remember_media_type(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._previous_values = _previous(instance, 'file_type')
+
+
+@receiver([post_save, post_delete], sender=MediaFile)
+def invalidate_media_cache(sender, instance, **kwargs):
+    file_types = {instance.file_type}
+    previous = getattr(instance, '_previous_values', None)
+    if previous:
+        file_types.add(previous['file_type'])
+
+    # Hanya logo yang di-cache (media_files_logos dan logo di frontend config)
+    if 'logo' in file_types:
+        invalidate(keys_for_logos())
+        config_publisher.schedule()
+
+
+# ============ SHIPPING RATE ============
+
+@receiver([post_save, post_delete], sender=ShippingRate)
+def invalidate_shipping_rates(sender, instance, **kwargs):
+    shipping_rates.invalidate()
+
+
+# ============ DEPOT ============
+
+@receiver([post_save, post_delete], sender=Depot)
+def invalidate_depot_index(sender, instance, **kwargs):
+    depot_registry.invalidate()
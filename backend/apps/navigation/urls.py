@@ -6,6 +6,7 @@ File location: backend/apps/navigation/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
+from . import views_async
 from django.http import JsonResponse
 
 # Helper function untuk JSON response
@@ -28,6 +29,8 @@ urlpatterns = [
          name='navigation-by-location'),
     path('all/', views.NavigationMenuViewSet.as_view({'get': 'all'}), 
          name='navigation-all'),
+    path('menus/<int:menu_id>/reorder/', views.MenuReorderView.as_view(), 
+         name='navigation-menu-reorder'),
     
     # Settings endpoints
     path('settings/', views.SiteSettingViewSet.as_view({'get': 'list'}), 
@@ -46,6 +49,26 @@ urlpatterns = [
     # Config endpoints
     path('config/', views.ConfigAPIView.as_view(), name='config'),
     path('config/compact/', views.CompactConfigAPIView.as_view(), name='config-compact'),
+    path('changes/', views.ConfigChangesView.as_view(), name='config-changes'),
+    
+    # Region search (typeahead)
+    path('regions/search/', views.RegionSearchView.as_view(), name='regions-search'),
+    
+    # Shipping quote (batch)
+    path('shipping/quote/', views.ShippingQuoteView.as_view(), name='shipping-quote'),
+    
+    # Depot (nearest & jangkauan pengiriman)
+    path('depots/nearest/', views.NearestDepotView.as_view(), name='depots-nearest'),
+    path('depots/coverage/', views.DepotCoverageView.as_view(), name='depots-coverage'),
+    
+    # Async (ASGI-native) versi endpoint utama; jalankan di bawah uvicorn/daphne
+    path('async/by_location/', views_async.AsyncNavigationByLocationView.as_view(),
+         name='async-navigation-by-location'),
+    path('async/config/', views_async.AsyncConfigView.as_view(), name='async-config'),
+    path('async/config/compact/', views_async.AsyncCompactConfigView.as_view(),
+         name='async-config-compact'),
+    path('async/events/', views_async.AsyncConfigEventsView.as_view(), name='async-config-events'),
+    path('async/health/', views_async.AsyncHealthCheckView.as_view(), name='async-health'),
     
     # Health check
     path('health/', views.HealthCheckView.as_view(), name='health'),
@@ -10,10 +10,29 @@ from django.db.models import Q
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.views import APIView
 
 from .models import NavigationMenu, MenuItem, SiteSetting, MediaFile
+from .caching import (
+    SITE_SETTINGS_PUBLIC_KEY,
+    MEDIA_LOGOS_KEY,
+    nav_menu_key,
+    nav_menu_all_key,
+    site_settings_category_key,
+    is_cacheable_location,
+    get_or_build,
+)
+from .renderers import prerender, prerendered_response, vary_by_audience
+from .services.settings_registry import settings_registry
+from .services.menu_tree import audience_for
+from .services.menu_reorder import reorder_menu
+from .services.config_changes import changes_since
+from .services.frontend_config import config_payload, parse_selectors, partial_config
+from .services.region_search import region_search
+from .services.shipping_quotes import quote_shipments, shipping_rates
+from .services.depot_index import depot_registry, format_depot
+from .services.circuit_breaker import all_breakers
 from .serializers import (
     NavigationMenuSerializer, 
     SiteSettingSerializer,
@@ -49,19 +68,17 @@ class NavigationMenuViewSet(viewsets.ViewSet):
         ?location=header (default: header)
         
         Returns:
-        - Navigation data dengan nested structure
+        - Navigation data dengan nested structure (item requires_auth /
+          requires_staff hanya untuk audience yang sesuai)
+        
+        Response berupa JSON bytes pre-rendered dengan ETag; request dengan
+        If-None-Match yang cocok dijawab 304. Tiap audience (anonymous,
+        authenticated, staff) punya cache entry sendiri.
         """
         location = request.query_params.get('location', 'header')
+        audience = audience_for(request.user)
         
-        # Cache key untuk location tertentu
-        cache_key = f'nav_menu_{location}'
-        
-        # Cek cache terlebih dahulu
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return Response(cached_data)
-        
-        try:
+        def build():
             # Get active menu untuk location tersebut
             menu = NavigationMenu.objects.filter(
                 location=location,
@@ -70,20 +87,24 @@ class NavigationMenuViewSet(viewsets.ViewSet):
             
             # Jika menu tidak ditemukan, return empty structure
             if not menu:
-                return Response({
+                return {
                     'location': location,
                     'items': []
-                })
+                }
             
             # Serialize data
-            serializer = NavigationMenuSerializer(menu)
-            data = serializer.data
+            return NavigationMenuSerializer(menu, context={'audience': audience}).data
+        
+        try:
+            # Location di luar LOCATION_CHOICES tidak di-cache
+            if not is_cacheable_location(location):
+                return vary_by_audience(prerendered_response(request, prerender(build())), audience)
             
-            # Cache data dengan timeout dari settings
+            # Cache bytes final dengan timeout dari settings (di-invalidate via signals)
             timeout = CACHE_TIMEOUT.get('navigation', 300)  # Default 5 menit
-            cache.set(cache_key, data, timeout)
+            payload = get_or_build(nav_menu_key(location, audience), lambda: prerender(build()), timeout)
             
-            return Response(data)
+            return vary_by_audience(prerendered_response(request, payload), audience)
             
         except Exception as e:
             # Error handling
@@ -103,13 +124,9 @@ class NavigationMenuViewSet(viewsets.ViewSet):
         Returns:
         - List semua active navigation menus dikelompokkan berdasarkan location
         """
-        cache_key = 'nav_menu_all'
-        cached_data = cache.get(cache_key)
+        audience = audience_for(request.user)
         
-        if cached_data:
-            return Response(cached_data)
-        
-        try:
+        def build():
             # Get semua active menus, diurutkan berdasarkan location dan name
             menus = NavigationMenu.objects.filter(is_active=True).order_by('location', 'name')
             
@@ -119,14 +136,15 @@ class NavigationMenuViewSet(viewsets.ViewSet):
                 if menu.location not in result:
                     result[menu.location] = []
                 
-                serializer = NavigationMenuSerializer(menu)
+                serializer = NavigationMenuSerializer(menu, context={'audience': audience})
                 result[menu.location].append(serializer.data)
-            
-            # Cache data
+            return result
+        
+        try:
             timeout = CACHE_TIMEOUT.get('navigation', 300)  # Default 5 menit
-            cache.set(cache_key, result, timeout)
+            result = get_or_build(nav_menu_all_key(audience), build, timeout)
             
-            return Response(result)
+            return vary_by_audience(Response(result), audience)
             
         except Exception as e:
             return Response({
@@ -155,13 +173,7 @@ class SiteSettingViewSet(viewsets.ViewSet):
         Returns:
         - Dictionary dengan setting_key sebagai key, dikelompokkan berdasarkan category
         """
-        cache_key = 'site_settings_public'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return Response(cached_data)
-        
-        try:
+        def build():
             # Get semua public settings, diurutkan berdasarkan category dan key
             settings_qs = SiteSetting.objects.filter(is_public=True).order_by('category', 'setting_key')
             
@@ -178,10 +190,11 @@ class SiteSettingViewSet(viewsets.ViewSet):
                     'type': setting.setting_type,
                     'description': setting.description
                 }
-            
-            # Cache data
+            return result
+        
+        try:
             timeout = CACHE_TIMEOUT.get('site_settings', 600)  # Default 10 menit
-            cache.set(cache_key, result, timeout)
+            result = get_or_build(SITE_SETTINGS_PUBLIC_KEY, build, timeout)
             
             return Response(result)
             
@@ -206,27 +219,13 @@ class SiteSettingViewSet(viewsets.ViewSet):
         """
         category = request.query_params.get('category', 'branding')
         
-        cache_key = f'site_settings_category_{category}'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return Response(cached_data)
+        def build():
+            # Get public settings untuk category tertentu (dari registry, tanpa query)
+            return dict(settings_registry.category(category, fresh=True))
         
         try:
-            # Get settings untuk category tertentu
-            settings_qs = SiteSetting.objects.filter(
-                category=category,
-                is_public=True
-            )
-            
-            # Format sebagai dictionary sederhana
-            result = {}
-            for setting in settings_qs:
-                result[setting.setting_key] = setting.get_value()
-            
-            # Cache data
             timeout = CACHE_TIMEOUT.get('site_settings', 600)  # Default 10 menit
-            cache.set(cache_key, result, timeout)
+            result = get_or_build(site_settings_category_key(category), build, timeout)
             
             return Response(result)
             
@@ -304,21 +303,17 @@ class MediaFileViewSet(viewsets.ReadOnlyModelViewSet):
         Returns:
         - List semua file dengan type='logo'
         """
-        cache_key = 'media_files_logos'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return Response(cached_data)
-        
-        try:
+        def build():
             # Get semua logo files
             logos = MediaFile.objects.filter(file_type='logo').order_by('-uploaded_at')
-            serializer = self.get_serializer(logos, many=True)
-            
-            # Cache data untuk 1 jam
-            cache.set(cache_key, serializer.data, 3600)
+            return self.get_serializer(logos, many=True).data
+        
+        try:
+            # Cache data (di-invalidate via signals saat logo berubah)
+            timeout = CACHE_TIMEOUT.get('media_files', 3600)  # Default 1 jam
+            data = get_or_build(MEDIA_LOGOS_KEY, build, timeout)
             
-            return Response(serializer.data)
+            return Response(data)
             
         except Exception as e:
             return Response({
@@ -343,56 +338,92 @@ class ConfigAPIView(APIView):
         
         Query Parameters:
         - nav_location: string (default: header)
+        - include: section yang diambil, dipisahkan koma (navigation,
+          settings, settings.<category>, logo). Contoh:
+          ?include=navigation,settings.branding
+        - fields: field menu item yang diambil, misal id,title,url
         
         Returns:
         - Navigation data
         - Site settings (semua public settings)
         - Logo data
-        - Timestamp
+        - Version & published_at snapshot config (hanya response lengkap)
+        - change_version: since awal untuk delta sync (/changes/)
+        
+        Response berupa JSON bytes pre-rendered dengan ETag; request dengan
+        If-None-Match yang cocok dijawab 304.
         """
         location = request.query_params.get('nav_location', 'header')
+        include = request.query_params.get('include')
+        fields = request.query_params.get('fields')
+        partial = include is not None or fields is not None
+        audience = audience_for(request.user)
         
-        # Cache key untuk combined config
-        cache_key = f'frontend_config_{location}'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return Response(cached_data)
+        if partial:
+            try:
+                selectors = parse_selectors(include, fields)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            # Get navigation data berdasarkan location
-            menu = NavigationMenu.objects.filter(
-                location=location,
-                is_active=True
-            ).first()
-            
-            # Serialize navigation data
-            nav_data = NavigationMenuSerializer(menu).data if menu else {'items': []}
-            
-            # Get semua public site settings
-            settings_qs = SiteSetting.objects.filter(is_public=True)
-            settings_data = {}
-            for setting in settings_qs:
-                # Format sederhana: key -> value
-                settings_data[setting.setting_key] = setting.get_value()
+            if partial:
+                # Response parsial dirakit dari fragment per section
+                payload = partial_config(location, *selectors, audience=audience)
+            else:
+                # Cold path: fragment nav/settings/logo di-fetch concurrent,
+                # cache bytes final di-invalidate via signals saat data berubah
+                payload = config_payload(location, audience)
             
-            # Get logo utama (yang pertama)
-            logos = MediaFile.objects.filter(file_type='logo').first()
-            logo_data = MediaFileSerializer(logos, context={'request': request}).data if logos else None
+            return vary_by_audience(prerendered_response(request, payload), audience)
             
-            # Combine semua data menjadi satu response
-            result = {
-                'navigation': nav_data,
-                'settings': settings_data,
-                'logo': logo_data,
-                'timestamp': cache.get('config_timestamp') or 'initial'
-            }
-            
-            # Cache data untuk 5 menit
-            cache.set(cache_key, result, 300)
-            cache.set('config_timestamp', 'updated', 300)
-            
-            return Response(result)
+        except Exception as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ConfigChangesView(APIView):
+    """
+    Delta sync config untuk client yang sudah memegang config.
+    
+    Endpoint: GET /api/v1/navigation/changes/?since=<version>&nav_location=header
+    """
+    
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        """
+        Perubahan navigation & public settings setelah version `since`.
+        
+        Query Parameters:
+        - since: change_version dari /config/ atau version dari response
+          /changes/ sebelumnya
+        - nav_location: string (default: header)
+        
+        Returns:
+        - version: since untuk polling berikutnya
+        - reset: true jika client harus fetch ulang /config/ (lalu pakai
+          change_version-nya)
+        - navigation: added/changed (item lengkap dengan children dan
+          parent id, perlakukan sebagai upsert) dan removed (id)
+        - settings: added/changed ({key: value}) dan removed (key)
+        
+        Response memakai ETag; polling tanpa perubahan dengan If-None-Match
+        dijawab 304.
+        """
+        location = request.query_params.get('nav_location', 'header')
+        since = request.query_params.get('since')
+        audience = audience_for(request.user)
+        
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                return Response({'error': 'since harus berupa integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            payload = prerender(changes_since(since, location, audience))
+            return vary_by_audience(prerendered_response(request, payload), audience)
             
         except Exception as e:
             return Response({
@@ -426,22 +457,19 @@ class CompactConfigAPIView(APIView):
             ).first()
             
             # Compact navigation serializer jika ada
-            nav_data = CompactNavigationSerializer(menu).data if menu else {'items': []}
-            
-            # Get essential settings
-            essential_settings = SiteSetting.objects.filter(
-                is_public=True,
-                category__in=['branding', 'general']
-            )
+            audience = audience_for(request.user)
+            nav_data = CompactNavigationSerializer(menu, context={'audience': audience}).data if menu else {'items': []}
             
-            settings_data = {}
-            for setting in essential_settings:
-                settings_data[setting.setting_key] = setting.get_value()
+            # Get essential settings dari registry
+            settings_data = {
+                **settings_registry.category('branding'),
+                **settings_registry.category('general'),
+            }
             
-            return Response({
+            return vary_by_audience(Response({
                 'navigation': nav_data,
                 'settings': settings_data
-            })
+            }), audience)
             
         except Exception as e:
             return Response({
@@ -449,6 +477,233 @@ class CompactConfigAPIView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class RegionSearchView(APIView):
+    """
+    Typeahead search kelurahan/desa dan kecamatan beserta parent chain-nya.
+    
+    Endpoint: GET /api/v1/navigation/regions/search/?q=sukamaju&limit=10
+    
+    Butuh dataset lokal (python manage.py import_regions).
+    """
+    
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        """
+        Cari desa/kecamatan berdasarkan nama (toleran terhadap salah ketik).
+        
+        Query Parameters:
+        - q: string (minimal 2 karakter)
+        - limit: int (default 10, maksimal 50)
+        
+        Returns:
+        - List desa/kecamatan (field type: village/district) terurut
+          berdasarkan relevansi
+        """
+        query = request.query_params.get('q', '')
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            limit = 10
+        
+        if not region_search.available():
+            return Response({
+                'error': 'Dataset wilayah belum di-import (manage.py import_regions)',
+                'results': []
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        
+        try:
+            return Response({
+                'query': query,
+                'results': region_search.search(query, limit=limit)
+            })
+            
+        except Exception as e:
+            return Response({
+                'error': str(e),
+                'results': []
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ShippingQuoteView(APIView):
+    """
+    Batch quote biaya pengiriman (dipakai halaman /simulasi-harga).
+    
+    Endpoint:
+    - GET  /api/v1/navigation/shipping/quote/  -> tarif per service type
+    - POST /api/v1/navigation/shipping/quote/  -> quote banyak shipment sekaligus
+    """
+    
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        """Tarif aktif per service type."""
+        table = shipping_rates.table()
+        return Response({
+            'default_service': table.services[table.default_index],
+            'rates': table.as_dict()
+        })
+    
+    def post(self, request):
+        """
+        Quote semua shipment dalam satu request.
+        
+        Body:
+        {
+            "shipments": [
+                {"distance_km": 12.5, "weight_kg": 3, "service_type": "express"},
+                {"origin": {"lat": -6.2, "lon": 106.8},
+                 "destination": {"lat": -6.9, "lon": 107.6}, "weight_kg": 1}
+            ]
+        }
+        
+        Returns:
+        - quotes: list {distance_km, weight_kg, service_type, cost} (urutan sama dengan input)
+        - total: jumlah cost
+        """
+        shipments = request.data.get('shipments') if isinstance(request.data, dict) else None
+        if not isinstance(shipments, list):
+            return Response({
+                'error': 'Body harus berisi list "shipments"'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            quotes = quote_shipments(shipments)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'count': len(quotes),
+            'total': sum(quote['cost'] for quote in quotes),
+            'quotes': quotes
+        })
+
+
+def _coordinate_params(request):
+    """Parse ?lat=&lon=; return (lat, lon) atau raise ValueError"""
+    lat = float(request.query_params['lat'])
+    lon = float(request.query_params['lon'])
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError
+    return lat, lon
+
+
+class NearestDepotView(APIView):
+    """
+    Depot terdekat dari sebuah koordinat.
+    
+    Endpoint: GET /api/v1/navigation/depots/nearest/?lat=-6.2&lon=106.8&k=3&max_km=50
+    """
+    
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        """
+        Query Parameters:
+        - lat, lon: koordinat (wajib)
+        - k: jumlah depot (default 1, maksimal 20)
+        - max_km: batas jarak (optional)
+        
+        Returns:
+        - List depot terurut berdasarkan jarak (km, garis lurus)
+        """
+        try:
+            lat, lon = _coordinate_params(request)
+            k = min(max(int(request.query_params.get('k', 1)), 1), 20)
+            max_km = request.query_params.get('max_km')
+            max_km = float(max_km) if max_km else None
+        except (KeyError, ValueError):
+            return Response({
+                'error': 'Parameter lat, lon (dan k, max_km) tidak valid'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        index = depot_registry.index()
+        return Response({
+            'depots': [
+                format_depot(index, i, distance)
+                for i, distance in index.nearest(lat, lon, k=k, max_distance_km=max_km)
+            ]
+        })
+
+
+class DepotCoverageView(APIView):
+    """
+    Cek apakah koordinat berada dalam jangkauan pengiriman (Jangkauan Pengiriman).
+    
+    Endpoint: GET /api/v1/navigation/depots/coverage/?lat=-6.2&lon=106.8
+    """
+    
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        """
+        Returns:
+        - covered: bool
+        - depots: depot yang melayani koordinat (polygon/radius), terdekat dulu
+        - nearest: depot terdekat (untuk info jika tidak terjangkau)
+        """
+        try:
+            lat, lon = _coordinate_params(request)
+        except (KeyError, ValueError):
+            return Response({
+                'error': 'Parameter lat dan lon tidak valid'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        index = depot_registry.index()
+        covering = index.covering(lat, lon)
+        nearest = index.nearest(lat, lon, k=1)
+        return Response({
+            'covered': bool(covering),
+            'depots': [format_depot(index, i, distance) for i, distance in covering],
+            'nearest': format_depot(index, *nearest[0]) if nearest else None
+        })
+
+
+class MenuReorderView(APIView):
+    """
+    Bulk reorder/move item satu menu (drag-and-drop).
+    
+    Endpoint: POST /api/v1/navigation/menus/<menu_id>/reorder/
+    
+    Hanya staff.
+    """
+    
+    permission_classes = [IsAdminUser]
+    
+    def post(self, request, menu_id):
+        """
+        Terapkan layout tree baru dalam satu transaction.
+        
+        Body (salah satu):
+        - {"layout": [{"id": 1, "children": [{"id": 5}, ...]}, ...]}
+          (urutan list = order_index, nesting = parent)
+        - {"moves": [{"id": 5, "parent": 1, "order_index": 0}, ...]}
+        
+        Returns:
+        - menu: id menu
+        - updated: jumlah item yang berubah
+        """
+        menu = NavigationMenu.objects.filter(pk=menu_id).first()
+        if menu is None:
+            return Response({'error': f'Menu {menu_id} tidak ditemukan'}, status=status.HTTP_404_NOT_FOUND)
+        
+        # Body JSON berupa list/scalar tidak punya .get()
+        data = request.data if isinstance(request.data, dict) else {}
+        layout = data.get('layout')
+        moves = data.get('moves')
+        if layout is None and moves is None:
+            return Response({'error': 'Body harus berisi layout atau moves'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(layout if layout is not None else moves, list):
+            return Response({'error': 'layout/moves harus berupa list'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            updated = reorder_menu(menu, layout=layout, moves=moves)
+            return Response({'menu': menu.pk, 'updated': updated})
+            
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
 # Health check endpoint
 class HealthCheckView(APIView):
     """
@@ -466,6 +721,7 @@ class HealthCheckView(APIView):
         Returns:
         - Status aplikasi
         - Database connection status
+        - State circuit breaker dan latency upstream (TOMTOM, EMSIFA)
         """
         try:
             # Cek koneksi database
@@ -477,10 +733,15 @@ class HealthCheckView(APIView):
             cache.set('health_check', 'ok', 10)
             cache_status = cache.get('health_check') == 'ok'
             
+            # Circuit breaker upstream (per worker process)
+            upstreams = {name: breaker.snapshot() for name, breaker in all_breakers().items()}
+            
             return Response({
                 'status': 'healthy',
                 'database': 'connected',
                 'cache': 'working' if cache_status else 'not_working',
+                'upstreams': upstreams,
+                'degraded': sorted(name for name, info in upstreams.items() if info['state'] != 'closed'),
                 'timestamp': 'server_time_here'
             })
             
@@ -0,0 +1,255 @@
+"""
+Async (ASGI-native) views untuk aplikasi Navigation.
+File location: backend/apps/navigation/views_async.py
+
+Versi async dari endpoint yang paling sering dipanggil frontend. Di bawah
+uvicorn/daphne view ini berjalan langsung di event loop (tanpa thread
+handoff per request seperti view DRF sync): cache hit dilayani dari local
+tier tanpa I/O, cache/ORM memakai API async Django (aget, afirst, async for).
+
+Response identik dengan versi sync (views.py) dan memakai cache key yang
+sama, jadi keduanya bisa di-deploy berdampingan. Audience menu diambil
+dari session user (request.auser); JWT hanya diproses oleh view DRF.
+
+AsyncConfigEventsView (Server-Sent Events) hanya tersedia di sini: koneksi
+long-lived butuh event loop, di bawah WSGI setiap client memegang satu
+thread.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+
+from .models import NavigationMenu, MenuItem, MediaFile
+from .caching import (
+    CONFIG_VERSION_KEY,
+    nav_menu_key,
+    frontend_config_key,
+    is_cacheable_location,
+    aget_or_build,
+)
+from .renderers import prerender, prerendered_response, vary_by_audience
+from .services.menu_tree import MenuTree, ANONYMOUS, audience_for
+from .services.settings_registry import settings_registry
+from .services.frontend_config import UNPUBLISHED
+from .services.circuit_breaker import all_breakers
+from .services.config_events import CONFIG_EVENTS, config_events, format_sse
+from .serializers import NavigationMenuSerializer, MediaFileSerializer, CompactNavigationSerializer
+
+# Get cache timeout dari settings
+CACHE_TIMEOUT = getattr(settings, 'CACHE_TIMEOUT', {})
+
+
+async def _audience(request):
+    """Audience dari user session (AuthenticationMiddleware menyediakan auser)"""
+    auser = getattr(request, 'auser', None)
+    return audience_for(await auser()) if auser else ANONYMOUS
+
+
+async def _menu_data(location, audience):
+    """Serialize active menu untuk location (None jika tidak ada)"""
+    menu = await NavigationMenu.objects.filter(location=location, is_active=True).afirst()
+    if not menu:
+        return None
+    tree = await MenuTree.afor_menu(menu, audience)
+    return NavigationMenuSerializer(menu, context={'menu_tree': tree, 'audience': audience}).data
+
+
+class AsyncNavigationByLocationView(View):
+    """
+    Async versi NavigationMenuViewSet.by_location.
+
+    Endpoint: GET /api/v1/navigation/async/by_location/?location=header
+    """
+
+    async def get(self, request):
+        location = request.GET.get('location', 'header')
+        audience = await _audience(request)
+
+        async def build():
+            data = await _menu_data(location, audience)
+            if data is None:
+                return prerender({'location': location, 'items': []})
+            return prerender(data)
+
+        try:
+            if not is_cacheable_location(location):
+                return vary_by_audience(prerendered_response(request, await build()), audience)
+
+            timeout = CACHE_TIMEOUT.get('navigation', 300)
+            payload = await aget_or_build(nav_menu_key(location, audience), build, timeout)
+            return vary_by_audience(prerendered_response(request, payload), audience)
+
+        except Exception as e:
+            return JsonResponse({
+                'error': str(e),
+                'location': location,
+                'items': []
+            }, status=500)
+
+
+class AsyncConfigView(View):
+    """
+    Async versi ConfigAPIView.
+
+    Endpoint: GET /api/v1/navigation/async/config/?nav_location=header
+    """
+
+    async def get(self, request):
+        location = request.GET.get('nav_location', 'header')
+        timeout = CACHE_TIMEOUT.get('config', 300)
+        audience = await _audience(request)
+
+        async def build():
+            nav_data = await _menu_data(location, audience) or {'items': []}
+            settings_data = dict(await settings_registry.apublic(fresh=True))
+
+            logo = await MediaFile.objects.filter(file_type='logo').afirst()
+            logo_data = MediaFileSerializer(logo).data if logo else None
+
+            meta = await cache.aget(CONFIG_VERSION_KEY) or UNPUBLISHED
+            result = {
+                'navigation': nav_data,
+                'settings': settings_data,
+                'logo': logo_data,
+                'version': meta['version'],
+                'published_at': meta['published_at'],
+                'change_version': meta.get('change_version'),
+            }
+            return prerender(result)
+
+        try:
+            if not is_cacheable_location(location):
+                return vary_by_audience(prerendered_response(request, await build()), audience)
+
+            payload = await aget_or_build(frontend_config_key(location, audience), build, timeout)
+            return vary_by_audience(prerendered_response(request, payload), audience)
+
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
+
+
+class AsyncCompactConfigView(View):
+    """
+    Async versi CompactConfigAPIView.
+
+    Endpoint: GET /api/v1/navigation/async/config/compact/
+    """
+
+    async def get(self, request):
+        try:
+            audience = await _audience(request)
+            menu = await NavigationMenu.objects.filter(location='header', is_active=True).afirst()
+
+            nav_data = {'items': []}
+            if menu:
+                root_items = [
+                    item async for item in MenuItem.objects.filter(
+                        menu=menu, parent=None, is_active=True
+                    ).order_by('order_index')
+                ]
+                nav_data = CompactNavigationSerializer(
+                    menu, context={'root_items': root_items, 'audience': audience}
+                ).data
+
+            settings_data = {
+                **await settings_registry.acategory('branding'),
+                **await settings_registry.acategory('general'),
+            }
+
+            # JSONRenderer (via prerender) supaya body sama dengan versi DRF
+            return vary_by_audience(prerendered_response(request, prerender({
+                'navigation': nav_data,
+                'settings': settings_data
+            })), audience)
+
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
+
+
+class AsyncConfigEventsView(View):
+    """
+    Push notifikasi version config (Server-Sent Events).
+    
+    Endpoint: GET /api/v1/navigation/async/events/
+    
+    Saat connect (termasuk reconnect otomatis EventSource) meta version
+    terakhir langsung dikirim, jadi client yang tertinggal resync tanpa
+    Last-Event-ID. Selanjutnya event `config` dikirim setiap publish, dan
+    komentar keepalive setiap CONFIG_EVENTS['keepalive'] detik.
+    """
+
+    async def get(self, request):
+        if config_events.connection_count() >= CONFIG_EVENTS['max_connections']:
+            response = JsonResponse({'error': 'Terlalu banyak koneksi event'}, status=503)
+            response['Retry-After'] = str(CONFIG_EVENTS['retry'] // 1000)
+            return response
+
+        response = StreamingHttpResponse(self._stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # nginx: jangan buffer stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def _stream(self):
+        # Django membatalkan generator (CancelledError) saat client disconnect
+        queue = config_events.subscribe()
+        try:
+            yield f"retry: {CONFIG_EVENTS['retry']}\n\n"
+            meta = await cache.aget(CONFIG_VERSION_KEY)
+            if meta:
+                yield format_sse(meta)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), CONFIG_EVENTS['keepalive'])
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield format_sse(event)
+        finally:
+            config_events.unsubscribe(queue)
+
+
+def _check_database():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+class AsyncHealthCheckView(View):
+    """
+    Async versi HealthCheckView.
+
+    Endpoint: GET /api/v1/navigation/async/health/
+    """
+
+    async def get(self, request):
+        try:
+            # Cursor DB belum punya API async
+            await sync_to_async(_check_database)()
+
+            await cache.aset('health_check', 'ok', 10)
+            cache_status = await cache.aget('health_check') == 'ok'
+
+            upstreams = {name: breaker.snapshot() for name, breaker in all_breakers().items()}
+
+            return JsonResponse({
+                'status': 'healthy',
+                'database': 'connected',
+                'cache': 'working' if cache_status else 'not_working',
+                'upstreams': upstreams,
+                'degraded': sorted(name for name, info in upstreams.items() if info['state'] != 'closed'),
+                'event_connections': config_events.connection_count(),
+                'timestamp': 'server_time_here'
+            })
+
+        except Exception as e:
+            return JsonResponse({
+                'status': 'unhealthy',
+                'error': str(e)
+            }, status=500)
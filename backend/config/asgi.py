@@ -8,6 +8,16 @@ Dibutuhkan jika menggunakan:
 - Django Channels (WebSockets)
 - Async views
 - Daphne/uvicorn sebagai server
+
+Endpoint async navigation ada di /api/v1/navigation/async/ (lihat
+apps/navigation/views_async.py), jalankan dengan `make run-asgi`.
+
+Push perubahan config ke browser memakai Server-Sent Events di
+/api/v1/navigation/async/events/ (view async Django biasa, tidak butuh
+Channels). Dengan lebih dari satu worker set CONFIG_EVENTS['backend'] =
+'redis' supaya publish dari worker mana pun sampai ke semua koneksi.
+Di belakang nginx: `proxy_buffering off` dan proxy_read_timeout lebih
+besar dari CONFIG_EVENTS['keepalive']. Load test: `make loadtest-sse`.
 """
 
 import os
@@ -170,6 +170,9 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# URL publik backend, untuk URL file absolut di luar request (config publish)
+BACKEND_URL = os.getenv('BACKEND_URL', 'http://localhost:8000').rstrip('/')
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # ============ REST FRAMEWORK CONFIGURATION ============
@@ -264,12 +267,71 @@ FILE_UPLOAD_PERMISSIONS = 0o644
 FILE_UPLOAD_DIRECTORY_PERMISSIONS = 0o755
 
 # ============ CACHE TIMEOUT CONFIGURATION ============
+# Navigation, settings, media dan config di-invalidate via signals
+# (apps/navigation/signals.py), jadi TTL bisa panjang
 CACHE_TIMEOUT = {
-    'navigation': 300,
-    'site_settings': 600,
-    'media_files': 3600,
-    'config': 300,
+    'navigation': 259200,    # 3 hari
+    'site_settings': 259200, # 3 hari
+    'media_files': 259200,   # 3 hari
+    'config': 259200,        # 3 hari
     'geo_data': 86400,
+    'geo_negative': 3600,    # Address tidak ditemukan, di-cache lebih singkat
+    'routes': 86400,         # Route matrix per time-of-day bucket
+}
+
+# Stampede protection untuk cached endpoints (apps/navigation/caching.py)
+CACHE_STAMPEDE = {
+    'lock_timeout': 30,   # Detik sebelum rebuild lock dilepas otomatis
+    'lock_wait': 5,       # Detik menunggu rebuild worker lain saat cache kosong
+    'stale_grace': 300,   # Detik stale data tetap dilayani setelah expiry
+    'beta': 1.0,          # Agresivitas early refresh
+}
+
+# Local LRU tier per worker di depan Redis untuk hot keys (nav, settings, config)
+CACHE_LOCAL_TIER = {
+    'max_entries': 256,
+    'max_bytes': 16 * 1024 * 1024,  # 16 MB per worker
+    'version_check_interval': 1.0,   # Detik; batas staleness antar worker
+}
+
+# Circuit breaker upstream API (apps/navigation/services/circuit_breaker.py)
+CIRCUIT_BREAKER = {
+    'failure_rate': 0.5,   # Rasio gagal dalam window untuk membuka breaker
+    'min_calls': 5,        # Minimum request dalam window sebelum rasio dihitung
+    'window': 60,          # Detik sliding window
+    'open_timeout': 30,    # Detik breaker open sebelum half-open
+    'half_open_calls': 1,  # Request percobaan saat half-open
+    'slow_call': 5.0,      # Detik; request lebih lambat dianggap gagal
+}
+
+# Config snapshot yang di-publish saat data berubah (apps/navigation/services/config_publisher.py)
+CONFIG_PUBLISH = {
+    'root': MEDIA_ROOT / 'config',  # config-<location>.json untuk nginx/CDN (MEDIA_URL + 'config/')
+    'write_files': True,
+}
+
+# Change log delta sync /changes/?since= (apps/navigation/services/config_changes.py)
+CONFIG_CHANGES = {
+    'retention_days': 7,  # Di-prune oleh `make prune-changes` (jadwalkan via cron)
+    'max_changes': 500,   # Lebih dari ini client diminta reset (fetch ulang /config/)
+}
+
+# Push notifikasi config via SSE /api/v1/navigation/async/events/ (apps/navigation/services/config_events.py)
+CONFIG_EVENTS = {
+    # 'redis' supaya publish dari worker mana pun (termasuk gunicorn/admin) sampai ke semua worker ASGI
+    'backend': 'local' if os.getenv('USE_MEMORY_CACHE', 'False') == 'True' else 'redis',
+    'redis_url': os.getenv('REDIS_URL', 'redis://localhost:6379/1'),
+    'channel': 'logistik_kita:config_events',
+    'keepalive': 15,          # Detik; harus lebih kecil dari proxy_read_timeout nginx
+    'max_connections': 10000, # Koneksi SSE per worker
+}
+
+# Route matrix TOMTOM (apps/navigation/services/route_matrix.py)
+ROUTE_MATRIX = {
+    'precision': 4,        # Desimal koordinat untuk cache key (~11 m)
+    'bucket_minutes': 60,  # Lebar time-of-day bucket untuk cache traffic
+    'batch_size': 100,     # Maksimum request routing per batch
+    'max_concurrency': 10,
 }
 
 # ============ LOGGING CONFIGURATION ============
@@ -349,6 +411,8 @@ TOMTOM_LANGUAGE = 'id-ID'
 
 EMSIFA_API_KEY = os.getenv('EMSIFA_API_KEY', '')
 EMSIFA_API_BASE_URL = 'https://emsifa.github.io/api-wilayah-indonesia/api'
+# Dataset wilayah lokal (dibuat via: python manage.py import_regions)
+REGIONS_DATA_FILE = BASE_DIR / 'data' / 'regions.json.gz'
 
 # ============ APPLICATION SETTINGS ============
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3000')